@@ -0,0 +1,120 @@
+"""asyncio 이벤트 루프 지연(loop lag) 벤치마크.
+
+여러 태스크가 로그를 대량으로 남기는 동안 1ms 주기로 깨어나는 감시 태스크가
+예정 시각보다 얼마나 늦게 깨어나는지(loop lag)를 잰다.
+
+sync-ainfo: 기본 설정 + await log.ainfo() (structlog 기본 동작: 이벤트마다 run_in_executor)
+sync-info: 기본 설정 + log.info() (이벤트 루프 스레드에서 렌더링/파일 쓰기)
+asyncio: asyncio=True + await log.ainfo() (태스크에서 큐에 넣기만 하고 리스너 스레드가 쓰기)
+
+events_per_sec: 모든 이벤트 호출이 끝나고 drain()까지 마친 시간 기준 처리량
+call_p50_us / call_p99_us: 코루틴에서 로그 호출 한 번이 걸린 시간
+lag_p50_ms / lag_p99_ms / lag_max_ms: 감시 태스크의 깨어남 지연
+
+Usage:
+    python benchmarks/bench_asyncio.py
+    python benchmarks/bench_asyncio.py --tasks 20 --events 2000 --output asyncio_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import structlog  # noqa: E402
+
+from monitoring import StructuredLogger  # noqa: E402
+
+TICK = 0.001
+
+SCENARIOS = {
+    "sync-ainfo": ({}, True),
+    "sync-info": ({}, False),
+    "asyncio": ({"asyncio": True, "queue_size": 100_000}, True),
+}
+
+
+async def monitor(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, time.perf_counter() - start - TICK))
+
+
+async def worker(log, events: int, use_async: bool, worker_id: int, calls: list[float]) -> None:
+    structlog.contextvars.bind_contextvars(worker=worker_id)
+    for i in range(events):
+        start = time.perf_counter()
+        if use_async:
+            await log.ainfo("request handled", path="/items", status=200, i=i)
+        else:
+            log.info("request handled", path="/items", status=200, i=i)
+        calls.append(time.perf_counter() - start)
+        # 요청 사이의 I/O 대기처럼 이벤트마다 루프에 제어를 넘긴다
+        await asyncio.sleep(0)
+
+
+async def run_scenario(name: str, tasks: int, events: int, log_dir: str) -> dict:
+    config, use_async = SCENARIOS[name]
+    logger = StructuredLogger(name="bench", config={"log_dir": log_dir, "outputs": ["file"], **config})
+    log = structlog.get_logger("bench")
+
+    stop, lags, calls = asyncio.Event(), [], []
+    watcher = asyncio.create_task(monitor(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(log, events, use_async, n, calls) for n in range(tasks)))
+    await logger.drain()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await watcher
+    logger.shutdown()
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    calls_us = sorted(call * 1e6 for call in calls)
+    return {
+        "events_per_sec": round(tasks * events / elapsed),
+        "call_p50_us": round(statistics.median(calls_us), 1),
+        "call_p99_us": round(_p99(calls_us), 1),
+        "lag_p50_ms": round(statistics.median(lags_ms), 3),
+        "lag_p99_ms": round(_p99(lags_ms), 3),
+        "lag_max_ms": round(lags_ms[-1], 3),
+    }
+
+
+def _p99(values: list[float]) -> float:
+    return values[min(len(values) - 1, int(len(values) * 0.99))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10, help="동시에 로그를 남기는 태스크 수")
+    parser.add_argument("--events", type=int, default=1000, help="태스크당 이벤트 수")
+    parser.add_argument("--output", type=Path, default=Path("asyncio_results.json"), help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in SCENARIOS:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = results[name] = asyncio.run(run_scenario(name, args.tasks, args.events, tmp))
+        print(
+            f"{name:<12} {result['events_per_sec']:>8} events/s  call p50 {result['call_p50_us']:>7.1f}us"
+            f"  p99 {result['call_p99_us']:>8.1f}us  lag p50 {result['lag_p50_ms']:>7.3f}ms"
+            f"  p99 {result['lag_p99_ms']:>7.3f}ms  max {result['lag_max_ms']:>8.3f}ms"
+        )
+
+    args.output.write_text(
+        json.dumps({"tasks": args.tasks, "events": args.events, "results": results}, indent=2), encoding="utf-8"
+    )
+    print(f"\n결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
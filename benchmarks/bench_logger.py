@@ -0,0 +1,271 @@
+"""StructuredLogger 처리량/지연 벤치마크.
+
+출력(console/file) x 포맷(json/text) x error_tracking x 바인딩된 contextvars x 예외 로깅
+조합마다 이벤트를 기록하고 다음 지표를 측정한다.
+
+events_per_sec: 초당 처리 이벤트 수 (async 모드는 큐 drain까지 포함)
+p50_us / p99_us: 호출 1회당 지연 (마이크로초)
+alloc_bytes_per_event: 호출 1회 동안 tracemalloc으로 측정한 메모리 할당 피크 (별도 샘플 패스)
+bytes_written / bytes_per_event: 파일과 콘솔에 기록된 바이트 수
+
+Usage:
+    python benchmarks/bench_logger.py --output bench_results.json
+    python benchmarks/bench_logger.py --save-baseline                  # 기준선 저장
+    python benchmarks/bench_logger.py --threshold 0.1                  # 기준선 대비 10% 넘게 느려지면 실패
+    python benchmarks/bench_logger.py --filter file-json --set serializer=orjson --set async=true
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import structlog  # noqa: E402
+
+from monitoring import StructuredLogger  # noqa: E402
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+
+# 기준선과 비교할 지표와 방향 (True면 클수록 좋음)
+COMPARED_METRICS = {"events_per_sec": True, "p99_us": False}
+
+
+class CountingStream(io.TextIOBase):
+    """콘솔 출력을 버리면서 기록된 바이트 수만 센다."""
+
+    def __init__(self):
+        self.bytes_written = 0
+
+    def write(self, s: str) -> int:
+        self.bytes_written += len(s.encode("utf-8"))
+        return len(s)
+
+
+def scenarios(name_filter: str | None) -> list[dict]:
+    result = []
+    for output, fmt, error_tracking, context, exc in itertools.product(
+        ("console", "file"), ("json", "text", "binary"), (True, False), (False, True), (False, True)
+    ):
+        name = "-".join(
+            [
+                output,
+                fmt,
+                "err_on" if error_tracking else "err_off",
+                "ctx_on" if context else "ctx_off",
+                "exc_on" if exc else "exc_off",
+            ]
+        )
+        if name_filter and name_filter not in name:
+            continue
+        if output == "console" and fmt == "binary":
+            # binary 형식은 파일 출력에만 적용된다
+            continue
+        if exc and (output == "console" or fmt == "text"):
+            # ConsoleRenderer는 dict_tracebacks가 만든 구조화 예외(list)를 렌더링하지 못한다
+            continue
+        result.append(
+            {
+                "name": name,
+                "config": {"outputs": [output], "format": fmt, "error_tracking": error_tracking},
+                "context": context,
+                "exc": exc,
+            }
+        )
+    return result
+
+
+def parse_overrides(pairs: list[str]) -> dict:
+    """--set key=value 인자를 config dict로 변환한다. 값은 JSON으로 해석하고 실패하면 문자열로 둔다."""
+    overrides = {}
+    for pair in pairs:
+        key, _, raw = pair.partition("=")
+        try:
+            overrides[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            overrides[key] = raw
+    return overrides
+
+
+def reset_logging() -> None:
+    structlog.reset_defaults()
+    structlog.contextvars.clear_contextvars()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        handler.close()
+        root.removeHandler(handler)
+
+
+def emit(log, i: int, exc: bool) -> None:
+    if exc:
+        try:
+            raise ValueError(f"boom {i}")
+        except ValueError:
+            log.exception("request failed", attempt=i)
+    else:
+        log.info("request completed", status=200, duration_ms=12.5, path="/api/items", attempt=i)
+
+
+def run_scenario(scenario: dict, events: int, overrides: dict, alloc_samples: int) -> dict:
+    with tempfile.TemporaryDirectory() as log_dir:
+        stream = CountingStream()
+        real_stdout, sys.stdout = sys.stdout, stream
+        try:
+            config = {**scenario["config"], **overrides, "log_dir": log_dir}
+            logger = StructuredLogger(name="bench", config=config)
+            log = structlog.get_logger("bench")
+
+            if scenario["context"]:
+                structlog.contextvars.bind_contextvars(
+                    service="bench", host="localhost", request_id="req-0001", user_id=42
+                )
+
+            for i in range(min(1000, events)):
+                emit(log, i, scenario["exc"])
+
+            # shutdown() 전에 재야 async 모드에서도 샘플 이벤트가 렌더링되고 기록된다.
+            # 측정 구간에 남지 않도록 큐를 비운 뒤 처리량을 잰다
+            alloc_bytes = measure_allocations(log, scenario["exc"], alloc_samples)
+            asyncio.run(logger.drain())
+
+            latencies = [0] * events
+            perf_counter_ns = time.perf_counter_ns
+            start = perf_counter_ns()
+            for i in range(events):
+                t0 = perf_counter_ns()
+                emit(log, i, scenario["exc"])
+                latencies[i] = perf_counter_ns() - t0
+            logger.shutdown()
+            elapsed = (perf_counter_ns() - start) / 1e9
+
+            for handler in logging.getLogger().handlers:
+                handler.flush()
+            file_bytes = sum(p.stat().st_size for p in Path(log_dir).iterdir() if p.is_file())
+        finally:
+            sys.stdout = real_stdout
+            reset_logging()
+
+    # 측정 구간 밖(warmup, 할당 샘플)에서 기록된 바이트도 포함되므로 이벤트 수로 나눠 정규화한다
+    total_events = min(1000, events) + events + alloc_samples
+    bytes_written = file_bytes + stream.bytes_written
+    latencies.sort()
+    return {
+        "events": events,
+        "events_per_sec": round(events / elapsed, 1),
+        "p50_us": round(latencies[len(latencies) // 2] / 1000, 3),
+        "p99_us": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000, 3),
+        "alloc_bytes_per_event": alloc_bytes,
+        "bytes_written": bytes_written,
+        "bytes_per_event": round(bytes_written / total_events, 1),
+    }
+
+
+def measure_allocations(log, exc: bool, samples: int) -> float:
+    if samples <= 0:
+        return 0.0
+    tracemalloc.start()
+    try:
+        total = 0
+        for i in range(samples):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            emit(log, i, exc)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - current
+    finally:
+        tracemalloc.stop()
+    return round(total / samples, 1)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """기준선 대비 threshold(비율)를 넘게 나빠진 지표를 찾아 메시지 목록으로 반환한다."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if not base.get(metric):
+                continue
+            change = (current[metric] - base[metric]) / base[metric]
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(
+                    f"{name}: {metric} {base[metric]} -> {current[metric]} ({worse:.1%} worse, limit {threshold:.0%})"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000, help="시나리오당 측정 이벤트 수")
+    parser.add_argument("--repeat", type=int, default=3, help="시나리오 반복 횟수 (가장 좋은 결과를 사용)")
+    parser.add_argument("--alloc-samples", type=int, default=200, help="할당 측정에 쓸 이벤트 수")
+    parser.add_argument("--filter", help="이름에 이 문자열이 포함된 시나리오만 실행")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], help="모든 시나리오에 적용할 config")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"), help="결과 JSON 경로")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="기준선 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.10, help="허용 회귀 비율 (0.10 = 10%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    args = parser.parse_args(argv)
+
+    overrides = parse_overrides(args.overrides)
+    results = {}
+    for scenario in scenarios(args.filter):
+        # 실행 환경의 노이즈를 줄이기 위해 여러 번 돌려 지표별로 가장 좋은 값을 사용한다
+        runs = [run_scenario(scenario, args.events, overrides, args.alloc_samples) for _ in range(args.repeat)]
+        result = {
+            **runs[0],
+            "events_per_sec": max(r["events_per_sec"] for r in runs),
+            "p50_us": min(r["p50_us"] for r in runs),
+            "p99_us": min(r["p99_us"] for r in runs),
+        }
+        results[scenario["name"]] = result
+        print(
+            f"{scenario['name']:<36} {result['events_per_sec']:>12,.0f} ev/s"
+            f"  p50 {result['p50_us']:>8.2f}us  p99 {result['p99_us']:>8.2f}us"
+            f"  alloc {result['alloc_bytes_per_event']:>8.0f}B  {result['bytes_per_event']:>6.0f}B/ev"
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "events": args.events,
+            "repeat": args.repeat,
+            "overrides": overrides,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n결과 저장: {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"기준선 저장: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("기준선이 없어 회귀 비교를 건너뜀 (--save-baseline으로 생성)")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8"))["results"], args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
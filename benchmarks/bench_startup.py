@@ -0,0 +1,119 @@
+"""import/초기화 시간 벤치마크 (cold start).
+
+src/main.py 형태의 진입점처럼 새 인터프리터에서 monitoring을 import하고 StructuredLogger를 만든 뒤
+이벤트를 0개 또는 1개 기록하고 종료하는 과정을 시나리오마다 여러 번 실행해 구간별 시간을 잰다.
+
+import_ms: import monitoring
+logger_import_ms: from monitoring import StructuredLogger (structlog 포함)
+init_ms: StructuredLogger(...) 생성
+first_event_ms: 첫 이벤트 기록 (lazy 모드는 이때 디렉토리/파일/렌더러를 만든다)
+process_ms: 인터프리터 시작부터 종료까지 전체 시간
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --output startup_results.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import monitoring
+t1 = time.perf_counter()
+from monitoring import StructuredLogger
+t2 = time.perf_counter()
+StructuredLogger(name="bench", config=json.loads(sys.argv[1]))
+t3 = time.perf_counter()
+if sys.argv[2] == "1":
+    import structlog
+    structlog.get_logger("bench").info("started", port=8080)
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "logger_import_ms": (t2 - t1) * 1000,
+    "init_ms": (t3 - t2) * 1000,
+    "first_event_ms": (t4 - t3) * 1000,
+}))
+"""
+
+METRICS = ("import_ms", "logger_import_ms", "init_ms", "first_event_ms", "process_ms")
+
+
+def scenarios() -> list[dict]:
+    return [
+        {"name": f"{mode}-{'one_event' if log else 'no_event'}", "lazy": mode == "lazy", "log": log}
+        for mode in ("eager", "lazy")
+        for log in (False, True)
+    ]
+
+
+def run_once(scenario: dict, log_dir: str) -> dict:
+    config = {"log_dir": log_dir, "outputs": ["console", "file"], "error_tracking": True, "lazy": scenario["lazy"]}
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src"), "PYTHONDONTWRITEBYTECODE": "1"}
+    start = time.perf_counter()
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", CHILD, json.dumps(config), "1" if scenario["log"] else "0"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    return {**json.loads(result.stdout.strip().splitlines()[-1]), "process_ms": process_ms}
+
+
+def run_scenario(scenario: dict, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            samples.append(run_once(scenario, os.path.join(tmp, "logs")))
+    # cold start는 잡음이 크므로 중앙값을 쓴다
+    return {metric: round(statistics.median(s[metric] for s in samples), 2) for metric in METRICS}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="시나리오당 실행 횟수 (중앙값 사용)")
+    parser.add_argument("--output", type=Path, default=Path("startup_results.json"), help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    # 첫 실행의 .pyc 생성과 디스크 캐시 영향을 없앤다
+    run_once(scenarios()[0], tempfile.mkdtemp())
+
+    results = {}
+    for scenario in scenarios():
+        result = results[scenario["name"]] = run_scenario(scenario, args.runs)
+        print(
+            f"{scenario['name']:<16} import {result['import_ms']:>7.2f}ms"
+            f"  logger import {result['logger_import_ms']:>7.2f}ms  init {result['init_ms']:>7.2f}ms"
+            f"  first event {result['first_event_ms']:>7.2f}ms  process {result['process_ms']:>8.2f}ms"
+        )
+
+    for log in ("no_event", "one_event"):
+        eager, lazy = results[f"eager-{log}"], results[f"lazy-{log}"]
+        startup_eager = eager["logger_import_ms"] + eager["init_ms"]
+        startup_lazy = lazy["logger_import_ms"] + lazy["init_ms"]
+        print(
+            f"lazy vs eager ({log}): init {eager['init_ms']:.2f} -> {lazy['init_ms']:.2f}ms, "
+            f"import+init {startup_eager:.2f} -> {startup_lazy:.2f}ms, "
+            f"process {eager['process_ms']:.2f} -> {lazy['process_ms']:.2f}ms"
+        )
+
+    args.output.write_text(json.dumps({"runs": args.runs, "results": results}, indent=2), encoding="utf-8")
+    print(f"\n결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,23 @@
-from .logger import StructuredLogger
+# import monitoring만으로 structlog와 핸들러 모듈을 불러오지 않도록 실제 사용 시점에 import한다
+_EXPORTS = {
+    "Lazy": ".lazy",
+    "StructuredLogger": ".logger",
+    "bind_context": ".context",
+    "bound_context": ".context",
+    "clear_context": ".context",
+    "get_context": ".context",
+    "reset_context": ".context",
+    "unbind_context": ".context",
+}
 
-__all__ = ["StructuredLogger"]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
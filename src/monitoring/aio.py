@@ -0,0 +1,35 @@
+"""asyncio 서비스용 바운드 로거.
+
+structlog의 ainfo() 같은 async 메서드는 이벤트마다 run_in_executor로 스레드 풀에 넘기는데,
+그 비용이 큐에 넣는 비용보다 훨씬 크다. asyncio 모드에서는 핸들러가 큐에 넣기만 하므로
+(렌더링과 쓰기는 리스너 스레드 하나가 처리) async 메서드도 호출한 태스크에서 바로 처리한다.
+processor 체인이 호출한 태스크에서 실행되므로 merge_contextvars는 그 태스크의 contextvars를 읽는다.
+"""
+
+from .levels import LevelCheckedBoundLogger
+
+_METHODS = ("debug", "info", "msg", "warning", "warn", "error", "exception", "critical", "fatal")
+
+
+def _make_asyncio_bound_logger() -> type:
+    namespace = {}
+
+    def inline(name: str):
+        method = getattr(LevelCheckedBoundLogger, name)
+
+        async def ameth(self, event=None, *args, **kw):
+            return method(self, event, *args, **kw)
+
+        return ameth
+
+    for name in _METHODS:
+        namespace[f"a{name}"] = inline(name)
+
+    async def alog(self, level: int, event=None, *args, **kw):
+        return LevelCheckedBoundLogger.log(self, level, event, *args, **kw)
+
+    namespace["alog"] = alog
+    return type("AsyncioBoundLogger", (LevelCheckedBoundLogger,), namespace)
+
+
+AsyncioBoundLogger = _make_asyncio_bound_logger()
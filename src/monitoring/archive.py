@@ -0,0 +1,266 @@
+import contextlib
+import glob
+import gzip
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable, Sequence
+from typing import BinaryIO
+
+COMPRESSIONS = ("gzip", "zstd", "auto")
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+# 압축 파일을 쓰기 모드로 여는 함수 (경로 → 바이너리 스트림)
+Opener = Callable[[str], BinaryIO]
+
+# 압축 대기 중인 세그먼트 이름: {name}.log.YYYYmmdd-HHMMSS[-N]
+_PENDING_SEGMENT = re.compile(r"\.\d{8}-\d{6}(-\d+)?$")
+
+# 세그먼트가 아닌 파일: 압축/인덱싱 중인 임시 파일, 검색 인덱스
+_NOT_SEGMENTS = (".tmp", ".idx")
+
+_STOP = object()
+
+
+def get_compressor(name: str) -> tuple[str, Opener]:
+    """압축 파일 확장자와 쓰기용 opener를 반환한다.
+
+    gzip: 표준 라이브러리 gzip — .gz
+    zstd: Python 3.14+의 compression.zstd 또는 zstandard 패키지 — .zst
+    auto: zstd를 쓸 수 있으면 zstd, 아니면 gzip
+    """
+    if name not in COMPRESSIONS:
+        raise ValueError(f"지원하지 않는 compression입니다: {name!r} (허용: {', '.join(COMPRESSIONS)})")
+
+    if name == "auto":
+        try:
+            return _zstd_compressor()
+        except ImportError:
+            return _gzip_compressor()
+
+    return _BACKENDS[name]()
+
+
+def _gzip_compressor() -> tuple[str, Opener]:
+    return ".gz", lambda path: gzip.open(path, "wb", compresslevel=6)
+
+
+def _zstd_compressor() -> tuple[str, Opener]:
+    try:
+        from compression import zstd
+
+        return ".zst", lambda path: zstd.open(path, "wb")
+    except ImportError:
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor()
+        return ".zst", lambda path: compressor.stream_writer(open(path, "wb"))
+
+
+_BACKENDS: dict[str, Callable[[], tuple[str, Opener]]] = {"gzip": _gzip_compressor, "zstd": _zstd_compressor}
+
+
+def open_segment(path: str) -> BinaryIO:
+    """세그먼트 파일을 읽기용으로 연다. 압축된 세그먼트(.gz, .zst)는 풀면서 읽는다."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            from compression import zstd
+
+            return zstd.open(path, "rb")
+        except ImportError:
+            import zstandard
+
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    return open(path, "rb")
+
+
+def index_path(segment: str) -> str:
+    """세그먼트의 검색 인덱스 경로. 압축 전후가 같은 인덱스를 쓰도록 .gz/.zst는 떼고 .idx를 붙인다."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if segment.endswith(suffix):
+            return segment[: -len(suffix)] + ".idx"
+    return segment + ".idx"
+
+
+def shift_numbered_indexes(base_filename: str, backup_count: int) -> None:
+    """stdlib 로테이션이 {name}.log.N을 N+1로 밀어내기 직전에 호출해 인덱스도 같이 옮긴다."""
+    for i in range(backup_count - 1, 0, -1):
+        if not os.path.exists(f"{base_filename}.{i}"):
+            continue
+        source, target = index_path(f"{base_filename}.{i}"), index_path(f"{base_filename}.{i + 1}")
+        if os.path.exists(source):
+            os.replace(source, target)
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(target)
+    # {name}.log.1은 활성 파일에서 새로 만들어지므로 archiver가 인덱스를 다시 만든다
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(index_path(f"{base_filename}.1"))
+
+
+def segment_name(base_filename: str) -> str:
+    """로테이션된 세그먼트 이름 {name}.log.YYYYmmdd-HHMMSS를 만든다. 이미 있으면 -N을 붙인다."""
+    stem = f"{base_filename}.{time.strftime('%Y%m%d-%H%M%S')}"
+    name, n = stem, 0
+    # 압축이 끝난 {name}.gz, 압축 중인 {name}.gz.tmp도 같은 세그먼트로 본다
+    while os.path.exists(name) or glob.glob(f"{glob.escape(name)}.*"):
+        n += 1
+        name = f"{stem}-{n}"
+    return name
+
+
+class SegmentArchiver:
+    """로테이션으로 닫힌 세그먼트를 백그라운드 스레드에서 압축하고 보존 정책에 따라 지운다.
+
+    세그먼트는 활성 파일({name}.log) 옆의 {name}.log.* 파일이다. 활성 파일은 건드리지 않는다.
+
+    compression: 타임스탬프 이름의 세그먼트를 압축한다 (None이면 압축하지 않음)
+    backup_count: 최신 세그먼트를 이 개수만큼만 남긴다 (0이면 제한 없음)
+    retention_bytes: 활성 파일을 포함한 전체 크기가 넘으면 오래된 세그먼트부터 지운다 (0이면 제한 없음)
+    retention_age: 마지막 기록 후 이 시간(초)이 지난 세그먼트를 지운다 (0이면 제한 없음)
+    index_keys: None이 아니면 압축하기 전에 세그먼트마다 검색 인덱스({segment}.idx)를 만든다.
+        지정한 필드는 bloom filter로 인덱싱한다 (monitoring.logindex 참고)
+    """
+
+    def __init__(
+        self,
+        compression: str | None = None,
+        backup_count: int = 0,
+        retention_bytes: int = 0,
+        retention_age: float = 0,
+        index_keys: Sequence[str] | None = None,
+    ):
+        self.suffix, self._open_compressed = get_compressor(compression) if compression else ("", None)
+        self.backup_count = backup_count
+        self.retention_bytes = retention_bytes
+        self.retention_age = retention_age
+        self.index_keys = index_keys
+        self._reset()
+
+    @property
+    def compresses(self) -> bool:
+        return self._open_compressed is not None
+
+    @property
+    def indexes(self) -> bool:
+        return self.index_keys is not None
+
+    def _reset(self) -> None:
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, base_filename: str) -> None:
+        """base_filename의 세그먼트를 압축하고 보존 정책을 적용하는 작업을 백그라운드 스레드에 넘긴다."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-archiver", daemon=True)
+                self._thread.start()
+        self._queue.put(base_filename)
+
+    def _run(self) -> None:
+        while True:
+            base_filename = self._queue.get()
+            try:
+                if base_filename is _STOP:
+                    return
+                self.process(base_filename)
+            except Exception:
+                # 압축/삭제 실패가 스레드를 죽이지 않도록 stderr에 남기고 다음 작업을 계속한다
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+    def process(self, base_filename: str) -> None:
+        """현재 스레드에서 인덱스가 없는 세그먼트를 인덱싱하고, 아직 압축되지 않은 세그먼트를 압축한 뒤 보존 정책을 적용한다."""
+        if self.indexes:
+            from .logindex import build_index, has_index
+
+            for path in self.segments(base_filename):
+                if not has_index(path):
+                    build_index(path, self.index_keys)
+        if self.compresses:
+            for path in self.segments(base_filename):
+                if _PENDING_SEGMENT.search(path):
+                    self.compress(path)
+        self.apply_retention(base_filename)
+
+    def compress(self, path: str) -> str:
+        target = path + self.suffix
+        tmp = target + ".tmp"
+        with open(path, "rb") as src, self._open_compressed(tmp) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        # 보존 기간 판단에 쓰도록 원본의 수정 시각을 유지한다
+        stat = os.stat(path)
+        os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp, target)
+        os.unlink(path)
+        return target
+
+    @staticmethod
+    def segments(base_filename: str) -> list[str]:
+        """base_filename의 세그먼트 경로를 최신순으로 반환한다 (압축 중인 .tmp 파일과 인덱스 .idx 파일은 제외)."""
+        directory = os.path.dirname(base_filename) or "."
+        prefix = os.path.basename(base_filename) + "."
+        paths = []
+        for entry in os.scandir(directory):
+            if entry.name.startswith(prefix) and not entry.name.endswith(_NOT_SEGMENTS) and entry.is_file():
+                paths.append((entry.stat().st_mtime, entry.path))
+        return [path for _, path in sorted(paths, reverse=True)]
+
+    def retained_files(self, base_filename: str) -> list[str]:
+        """보존 정책을 적용할 파일 경로를 최신순으로 반환한다 (기본은 base_filename의 세그먼트)."""
+        return self.segments(base_filename)
+
+    def apply_retention(self, base_filename: str) -> list[str]:
+        """보존 정책을 넘는 세그먼트를 지우고, 지운 경로 목록을 반환한다."""
+        if not (self.backup_count or self.retention_bytes or self.retention_age):
+            return []
+        now = time.time()
+        total = os.path.getsize(base_filename) if os.path.exists(base_filename) else 0
+        removed = []
+        for i, path in enumerate(self.retained_files(base_filename)):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            total += stat.st_size
+            if (
+                (self.backup_count and i >= self.backup_count)
+                or (self.retention_bytes and total > self.retention_bytes)
+                or (self.retention_age and now - stat.st_mtime > self.retention_age)
+            ):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                removed.append(path)
+                # 세그먼트와 함께 검색 인덱스도 지운다
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(index_path(path))
+        return removed
+
+    def join(self) -> None:
+        """넘겨받은 작업이 모두 끝날 때까지 기다린다."""
+        self._queue.join()
+
+    def stop(self, timeout: float | None = 10.0) -> None:
+        """남은 작업을 처리한 뒤 백그라운드 스레드를 멈춘다 (최대 timeout초 대기)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def reset_after_fork(self) -> None:
+        # 부모의 스레드는 자식에 없으므로 대기열을 비우고 다음 submit()에서 새로 띄운다
+        self._reset()
@@ -0,0 +1,542 @@
+"""format="binary"용 길이 접두사 바이너리 로그 세그먼트 형식과 JSON lines 변환기.
+
+세그먼트는 프레임의 연속이다. 프레임 = varint(본문 길이) + 본문, 본문의 첫 바이트가 종류다.
+
+헤더(0x01): MAGIC + 버전 + zigzag varint(작성 시점의 UTC 오프셋, 초)
+    파일을 열 때마다 쓴다. 읽는 쪽은 헤더를 만나면 문자열 표와 키 목록 표를 비운다.
+이벤트(0x02): varint(키 목록 id) [+ 새 키 목록 정의] + 값들
+    id가 처음 나오면 바로 뒤에 varint(키 수)와 키 문자열들이 이어진다. id 0은 키 목록 없이 map 하나가 온다.
+
+값은 msgpack 인코딩(nil, bool, int, float64, str, array, map)을 따르고, 다음 태그를 더 쓴다.
+    0xc4 DEF  varint(길이) + UTF-8 — 문자열을 표에 추가하고 값으로도 쓴다
+    0xc1 REF  varint(id) — 표의 문자열
+    0xc5 TS   zigzag varint — 직전 timestamp와의 차이(µs). timestamp는 TimeStamper(fmt="iso")의
+              로컬 시각을 그대로(타임존 없이) 1970-01-01 기준 µs로 저장해 같은 문자열로 되돌린다
+    0xc6 BIG  varint(길이) + 10진수 문자열 — int64를 넘는 정수
+
+map의 키와 logger/level/event 값은 세그먼트마다 문자열 표에 올려 두 번째부터 id로 쓴다.
+
+Usage:
+    python -m monitoring.binlog logs/app.logb > app.jsonl
+    python -m monitoring.binlog logs/app.logb.20260101-000000.gz logs/app.logb -o app.jsonl
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO
+
+from .archive import open_segment
+
+SUFFIX = ".logb"
+MAGIC = b"SLB"
+VERSION = 1
+
+FRAME_HEADER = 0x01
+FRAME_EVENT = 0x02
+
+# 세그먼트 하나에 올리는 문자열/키 목록 상한. 넘으면 표에 올리지 않고 그대로 쓴다
+MAX_STRINGS = 4096
+MAX_SHAPES = 1024
+
+# 값을 문자열 표에 올리는 필드 (키는 항상 올린다)
+INTERNED_FIELDS = frozenset({"logger", "level", "event"})
+
+_NIL, _FALSE, _TRUE = 0xC0, 0xC2, 0xC3
+_REF, _DEF, _TS, _BIG = 0xC1, 0xC4, 0xC5, 0xC6
+_FLOAT64, _INT64 = 0xCB, 0xD3
+_STR8, _STR16, _STR32 = 0xD9, 0xDA, 0xDB
+_ARRAY16, _ARRAY32 = 0xDC, 0xDD
+_MAP16, _MAP32 = 0xDE, 0xDF
+
+# 키 목록의 값 종류
+_INTERNED, _TIMESTAMP = 1, 2
+
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_pack_float = struct.Struct(">d").pack
+_pack_int64 = struct.Struct(">q").pack
+_unpack_float = struct.Struct(">d").unpack_from
+_unpack_int64 = struct.Struct(">q").unpack_from
+_unpack_u16 = struct.Struct(">H").unpack_from
+_unpack_u32 = struct.Struct(">I").unpack_from
+
+
+def _varint(value: int, out: bytearray) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _json_key(key: Any) -> str:
+    # json.dumps와 같은 규칙으로 map 키를 문자열로 바꾼다
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, (int, float)):
+        return repr(key) if isinstance(key, float) else int.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _fallback(obj: Any) -> Any:
+    # JSONRenderer의 기본 fallback과 같다: __structlog__()이 있으면 그 결과, 없으면 repr()
+    try:
+        return obj.__structlog__()
+    except AttributeError:
+        return repr(obj)
+
+
+def _iso_micros(value: str) -> int | None:
+    """TimeStamper(fmt="iso", utc=False)가 만든 문자열이면 1970-01-01 기준 µs, 아니면 None."""
+    if len(value) == 26:
+        if value[19] != ".":
+            return None
+    elif len(value) != 19:
+        return None
+    if value[10] != "T":
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    # isoformat()으로 되돌렸을 때 같은 문자열이 나오는 경우만 정수로 저장한다
+    if dt.tzinfo is not None or (len(value) == 26) != bool(dt.microsecond):
+        return None
+    return (dt - _EPOCH) // _MICROSECOND
+
+
+class SegmentEncoder:
+    """event_dict를 프레임으로 인코딩한다. 문자열 표와 키 목록 표는 세그먼트(파일)마다 새로 만든다.
+
+    파일 핸들러는 파일을 열 때 reset()을 호출한다. 인코딩 중 예외가 나면 표가 파일과 어긋나지 않도록
+    스스로 reset()해 다음 프레임 앞에 헤더를 다시 쓴다.
+    """
+
+    def __init__(self, max_strings: int = MAX_STRINGS, max_shapes: int = MAX_SHAPES):
+        self.max_strings = max_strings
+        self.max_shapes = max_shapes
+        self.reset()
+
+    def reset(self) -> None:
+        self._strings: dict[str, bytes] = {}
+        self._shapes: dict[tuple, tuple[bytes, tuple[int, ...]]] = {}
+        self._last_ts = 0
+        self._minute, self._minute_base = "", 0
+        self._header_pending = True
+
+    def encode(self, event: dict) -> bytes:
+        try:
+            out = bytearray()
+            if self._header_pending:
+                header = bytearray((FRAME_HEADER,))
+                header += MAGIC
+                header.append(VERSION)
+                _varint(_zigzag(time.localtime().tm_gmtoff), header)
+                _varint(len(header), out)
+                out += header
+            body = bytearray((FRAME_EVENT,))
+            self._event(event, body)
+            _varint(len(body), out)
+            out += body
+        except Exception:
+            self.reset()
+            raise
+        self._header_pending = False
+        return bytes(out)
+
+    def _event(self, event: dict, out: bytearray) -> None:
+        keys = tuple(event)
+        cached = self._shapes.get(keys)
+        if cached is None:
+            if len(self._shapes) >= self.max_shapes or not all(type(k) is str for k in keys):
+                out.append(0)
+                self._value(event, out)
+                return
+            shape = bytearray()
+            _varint(len(self._shapes) + 1, shape)
+            out += shape
+            _varint(len(keys), out)
+            for key in keys:
+                self._string(key, out)
+            # 키마다 값을 어떻게 쓸지(일반/문자열 표/timestamp)를 키 목록과 함께 기억해 둔다
+            kinds = tuple(_INTERNED if k in INTERNED_FIELDS else _TIMESTAMP if k == "timestamp" else 0 for k in keys)
+            self._shapes[keys] = (bytes(shape), kinds)
+        else:
+            shape, kinds = cached
+            out += shape
+
+        # 자주 나오는 값(짧은 문자열, 작은 정수, float)은 메서드 호출 없이 바로 쓴다
+        for kind, value in zip(kinds, event.values(), strict=True):
+            t = type(value)
+            if t is str:
+                if kind:
+                    if kind == _INTERNED:
+                        self._string(value, out)
+                        continue
+                    micros = self._timestamp(value)
+                    if micros is not None:
+                        delta = micros - self._last_ts
+                        self._last_ts = micros
+                        out.append(_TS)
+                        _varint(delta << 1 if delta >= 0 else (-delta << 1) - 1, out)
+                        continue
+                data = value.encode("utf-8")
+                if len(data) < 32:
+                    out.append(0xA0 | len(data))
+                    out += data
+                else:
+                    self._str(value, out)
+            elif t is int and 0 <= value < 0x80:
+                out.append(value)
+            elif t is float:
+                out.append(_FLOAT64)
+                out += _pack_float(value)
+            else:
+                self._value(value, out)
+
+    def _timestamp(self, value: str) -> int | None:
+        # 분 단위 앞부분(YYYY-mm-ddTHH:MM)의 µs 값을 캐시해 두고 초와 소수부만 더한다
+        if len(value) == 26:
+            if value[19] != "." or not value[20:].isdigit():
+                return None
+            fraction = int(value[20:])
+            if not fraction:
+                return None
+        elif len(value) == 19:
+            fraction = 0
+        else:
+            return None
+        if value[16] != ":" or not value[17:19].isdigit() or value[17] > "5":
+            return None
+        minute = value[:16]
+        if minute != self._minute:
+            base = _iso_micros(minute + ":00")
+            if base is None:
+                return None
+            self._minute, self._minute_base = minute, base
+        return self._minute_base + int(value[17:19]) * 1_000_000 + fraction
+
+    def _string(self, value: str, out: bytearray) -> None:
+        ref = self._strings.get(value)
+        if ref is not None:
+            out += ref
+            return
+        if len(self._strings) >= self.max_strings:
+            self._str(value, out)
+            return
+        ref = bytearray((_REF,))
+        _varint(len(self._strings), ref)
+        self._strings[value] = bytes(ref)
+        data = value.encode("utf-8")
+        out.append(_DEF)
+        _varint(len(data), out)
+        out += data
+
+    @staticmethod
+    def _str(value: str, out: bytearray) -> None:
+        data = value.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += bytes((_STR8, n))
+        elif n < 0x10000:
+            out.append(_STR16)
+            out += n.to_bytes(2, "big")
+        else:
+            out.append(_STR32)
+            out += n.to_bytes(4, "big")
+        out += data
+
+    def _value(self, value: Any, out: bytearray) -> None:
+        # json.dumps와 같은 순서로 타입을 판단한다 (bool은 int보다 먼저)
+        t = type(value)
+        if t is str:
+            self._str(value, out)
+        elif value is None:
+            out.append(_NIL)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif t is int:
+            self._int(value, out)
+        elif t is float:
+            out.append(_FLOAT64)
+            out += _pack_float(value)
+        elif t is dict:
+            self._map(value, out)
+        elif t is list or t is tuple:
+            self._array(value, out)
+        elif isinstance(value, str):
+            self._str(str.__str__(value), out)
+        elif isinstance(value, int):
+            self._int(int(value), out)
+        elif isinstance(value, float):
+            out.append(_FLOAT64)
+            out += _pack_float(value)
+        elif isinstance(value, (list, tuple)):
+            self._array(value, out)
+        elif isinstance(value, dict):
+            self._map(value, out)
+        else:
+            self._value(_fallback(value), out)
+
+    @staticmethod
+    def _int(value: int, out: bytearray) -> None:
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -32 <= value < 0:
+            out.append(value & 0xFF)
+        elif _INT64_MIN <= value <= _INT64_MAX:
+            out.append(_INT64)
+            out += _pack_int64(value)
+        else:
+            data = str(value).encode("ascii")
+            out.append(_BIG)
+            _varint(len(data), out)
+            out += data
+
+    def _array(self, value: list | tuple, out: bytearray) -> None:
+        n = len(value)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out.append(_ARRAY16)
+            out += n.to_bytes(2, "big")
+        else:
+            out.append(_ARRAY32)
+            out += n.to_bytes(4, "big")
+        for item in value:
+            self._value(item, out)
+
+    def _map(self, value: dict, out: bytearray) -> None:
+        n = len(value)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n < 0x10000:
+            out.append(_MAP16)
+            out += n.to_bytes(2, "big")
+        else:
+            out.append(_MAP32)
+            out += n.to_bytes(4, "big")
+        for key, item in value.items():
+            self._string(_json_key(key), out)
+            self._value(item, out)
+
+
+def keep_event_dict(_, __, event_dict: dict) -> dict:
+    """binary 형식의 렌더러. 인코딩은 파일마다 문자열 표를 가진 SegmentEncoder가 하므로 event_dict를 그대로 넘긴다."""
+    return event_dict
+
+
+class SegmentReader:
+    """바이너리 세그먼트 스트림에서 event_dict를 하나씩 읽는다.
+
+    마지막 프레임이 잘려 있으면(쓰는 중이거나 비정상 종료) 그 앞까지만 읽는다.
+    utc_offset은 마지막으로 읽은 헤더의 UTC 오프셋(초)이다.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.utc_offset: int | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._strings: list[str] = []
+        self._shapes: list[tuple[str, ...]] = []
+        self._last_ts = 0
+
+    def __iter__(self) -> Iterator[dict]:
+        while True:
+            length = self._read_length()
+            if length is None:
+                return
+            body = self.stream.read(length)
+            if len(body) < length:
+                return
+            if body[0] == FRAME_EVENT:
+                yield self._event(body)
+            elif body[0] == FRAME_HEADER:
+                self._header(body)
+            else:
+                raise ValueError(f"알 수 없는 프레임 종류입니다: {body[0]:#x}")
+
+    def _read_length(self) -> int | None:
+        result = shift = 0
+        while True:
+            byte = self.stream.read(1)
+            if not byte:
+                return None
+            result |= (byte[0] & 0x7F) << shift
+            if not byte[0] & 0x80:
+                return result
+            shift += 7
+
+    def _header(self, body: bytes) -> None:
+        if body[1 : 1 + len(MAGIC)] != MAGIC:
+            raise ValueError("바이너리 로그 세그먼트가 아닙니다")
+        pos = 1 + len(MAGIC)
+        if body[pos] != VERSION:
+            raise ValueError(f"지원하지 않는 세그먼트 버전입니다: {body[pos]}")
+        offset, _ = _read_varint(body, pos + 1)
+        self.utc_offset = _unzigzag(offset)
+        self._reset()
+
+    def _event(self, body: bytes) -> dict:
+        shape_id, pos = _read_varint(body, 1)
+        if shape_id == 0:
+            event, _ = self._value(body, pos)
+            return event
+        if shape_id > len(self._shapes):
+            n, pos = _read_varint(body, pos)
+            keys = []
+            for _ in range(n):
+                key, pos = self._value(body, pos)
+                keys.append(key)
+            self._shapes.append(tuple(keys))
+        event = {}
+        for key in self._shapes[shape_id - 1]:
+            event[key], pos = self._value(body, pos)
+        return event
+
+    def _value(self, data: bytes, pos: int) -> tuple[Any, int]:
+        tag = data[pos]
+        pos += 1
+        if tag < 0x80:
+            return tag, pos
+        if tag >= 0xE0:
+            return tag - 0x100, pos
+        if 0xA0 <= tag <= 0xBF:
+            end = pos + (tag & 0x1F)
+            return data[pos:end].decode("utf-8"), end
+        if 0x80 <= tag <= 0x8F:
+            return self._map(data, pos, tag & 0x0F)
+        if 0x90 <= tag <= 0x9F:
+            return self._array(data, pos, tag & 0x0F)
+        if tag == _REF:
+            index, pos = _read_varint(data, pos)
+            return self._strings[index], pos
+        if tag == _DEF:
+            n, pos = _read_varint(data, pos)
+            value = data[pos : pos + n].decode("utf-8")
+            self._strings.append(value)
+            return value, pos + n
+        if tag == _TS:
+            delta, pos = _read_varint(data, pos)
+            self._last_ts += _unzigzag(delta)
+            return (_EPOCH + timedelta(microseconds=self._last_ts)).isoformat(), pos
+        if tag == _NIL:
+            return None, pos
+        if tag == _TRUE:
+            return True, pos
+        if tag == _FALSE:
+            return False, pos
+        if tag == _INT64:
+            return _unpack_int64(data, pos)[0], pos + 8
+        if tag == _FLOAT64:
+            return _unpack_float(data, pos)[0], pos + 8
+        if tag == _STR8:
+            n = data[pos]
+            return data[pos + 1 : pos + 1 + n].decode("utf-8"), pos + 1 + n
+        if tag == _STR16:
+            n = _unpack_u16(data, pos)[0]
+            return data[pos + 2 : pos + 2 + n].decode("utf-8"), pos + 2 + n
+        if tag == _STR32:
+            n = _unpack_u32(data, pos)[0]
+            return data[pos + 4 : pos + 4 + n].decode("utf-8"), pos + 4 + n
+        if tag == _BIG:
+            n, pos = _read_varint(data, pos)
+            return int(data[pos : pos + n]), pos + n
+        if tag == _ARRAY16:
+            return self._array(data, pos + 2, _unpack_u16(data, pos)[0])
+        if tag == _ARRAY32:
+            return self._array(data, pos + 4, _unpack_u32(data, pos)[0])
+        if tag == _MAP16:
+            return self._map(data, pos + 2, _unpack_u16(data, pos)[0])
+        if tag == _MAP32:
+            return self._map(data, pos + 4, _unpack_u32(data, pos)[0])
+        raise ValueError(f"알 수 없는 값 태그입니다: {tag:#x}")
+
+    def _array(self, data: bytes, pos: int, n: int) -> tuple[list, int]:
+        items = []
+        for _ in range(n):
+            item, pos = self._value(data, pos)
+            items.append(item)
+        return items, pos
+
+    def _map(self, data: bytes, pos: int, n: int) -> tuple[dict, int]:
+        result = {}
+        for _ in range(n):
+            key, pos = self._value(data, pos)
+            result[key], pos = self._value(data, pos)
+        return result, pos
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def read_segment(path: str) -> Iterator[dict]:
+    """세그먼트 파일의 이벤트를 순서대로 하나씩 돌려준다."""
+    with open_segment(path) as stream:
+        yield from SegmentReader(stream)
+
+
+def to_json_lines(paths: Iterable[str], out) -> int:
+    """세그먼트들을 format="json" 파일과 같은 JSON lines로 out에 쓰고, 쓴 이벤트 수를 반환한다."""
+    count = 0
+    for path in paths:
+        for event in read_segment(path):
+            out.write(json.dumps(event, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="바이너리 로그 세그먼트를 JSON lines로 변환한다")
+    parser.add_argument("paths", nargs="+", help="세그먼트 파일 ({name}.logb, 로테이션된 .gz/.zst 포함)")
+    parser.add_argument("-o", "--output", help="출력 파일 (기본값: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.output is None:
+        try:
+            to_json_lines(args.paths, sys.stdout)
+        except BrokenPipeError:
+            # head 등으로 파이프가 먼저 닫혀도 종료 시 flush에서 다시 오류가 나지 않도록 stdout을 /dev/null로 돌린다
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    with open(args.output, "w", encoding="utf-8") as out:
+        to_json_lines(args.paths, out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""setup_logging의 고정 processor 구간을 함수 호출 한 번으로 합친 processor.
+
+기준 체인(reference_chain)은 아래 순서이고, FusedProcessor는 같은 결과를 같은 키 순서로 만든다.
+
+    merge_contextvars → merge_context → add_logger_name → add_log_level → [early] →
+    PositionalArgumentsFormatter → TimeStamper(iso, local) → StackInfoRenderer →
+    set_exc_info → [exception_hook] → dict_tracebacks
+
+processor마다 드는 호출 비용을 없애고, timestamp는 초 단위 문자열을 캐시해 마이크로초만 붙이며,
+stack_info/exc_info가 없는 이벤트는 stack 수집과 traceback 단계를 건너뛴다.
+"""
+
+import contextvars
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime
+
+import structlog
+
+from .context import current_context, merge_context
+
+_CONTEXTVAR_PREFIX = "structlog_"
+_LEVEL_ALIASES = {"warn": "warning", "exception": "error"}
+
+# mark_context=True일 때 bind_context()로 묶은 BoundContext를 담는 키. 필드는 렌더러 단계에서 합쳐진다
+CONTEXT_KEY = "_bound_context"
+
+# 로거가 직접 남기는 요약 이벤트(repeated=N 등) 표시. 샘플링/속도 제한과 flight recorder 덤프를 건너뛰고 렌더링 전에 지운다
+SUMMARY_KEY = "_summary"
+
+
+def reference_chain(early: Sequence[Callable] = ()) -> list[Callable]:
+    """FusedProcessor와 같은 결과를 내는 structlog processor 목록 (flight recorder 덤프와 비교 테스트에 쓴다)."""
+    return [
+        structlog.contextvars.merge_contextvars,
+        merge_context,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        *early,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.TimeStamper(fmt="iso", utc=False),
+        structlog.processors.StackInfoRenderer(),
+        structlog.dev.set_exc_info,
+        structlog.processors.dict_tracebacks,
+    ]
+
+
+class FusedProcessor:
+    """reference_chain(early)과 바이트 단위로 같은 event_dict를 만드는 단일 processor.
+
+    early: add_log_level 바로 뒤에 실행할 processor (샘플링, Lazy 값 계산 등). DropEvent는 그대로 전파된다
+    exception_hook: 예외가 있는 이벤트에만 set_exc_info와 dict_tracebacks 사이에서 실행할 processor
+    clock: time.time_ns와 같은 형태의 시계 (테스트용)
+    mark_context: bind_context()로 묶은 필드를 합치는 대신 BoundContext를 CONTEXT_KEY에 남긴다
+                  (ContextFragmentRenderer가 필드 부분의 직렬화를 재사용한다). 이벤트 인자와 이름이 겹치면 합친다
+    """
+
+    def __init__(
+        self,
+        early: Sequence[Callable] = (),
+        exception_hook: Callable | None = None,
+        clock: Callable[[], int] = time.time_ns,
+        mark_context: bool = False,
+    ):
+        self.early = tuple(early)
+        self.mark_context = mark_context
+        self.exception_hook = exception_hook
+        self._clock = clock
+        # (초, 그 초의 isoformat 문자열). 튜플 하나로 바꿔 끼우므로 여러 스레드에서 읽어도 안전하다
+        self._second: tuple[int, str] = (-1, "")
+        # 이 모듈의 프레임도 건너뛰어야 기준 체인과 같은 호출 위치부터 stack을 기록한다
+        self._stack = structlog.processors.StackInfoRenderer(additional_ignores=[__name__])
+
+    def timestamp(self, micros: int | None = None) -> str:
+        """datetime.now().isoformat()과 같은 문자열 (micros: 지금 대신 쓸 epoch 마이크로초).
+
+        초 부분은 초가 바뀔 때만 다시 만든다.
+        """
+        # datetime.now()도 ns 시각을 마이크로초 단위로 내림한다
+        second, micro = divmod(self._clock() // 1000 if micros is None else micros, 1_000_000)
+        cached, prefix = self._second
+        if cached != second:
+            prefix = datetime.fromtimestamp(second).isoformat()
+            self._second = (second, prefix)
+        # isoformat은 마이크로초가 0이면 소수부를 생략한다
+        return f"{prefix}.{micro:06d}" if micro else prefix
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        for var, value in contextvars.copy_context().items():
+            if value is not Ellipsis and var.name.startswith(_CONTEXTVAR_PREFIX):
+                event_dict.setdefault(var.name[len(_CONTEXTVAR_PREFIX) :], value)
+        context = current_context()
+        if context is not None:
+            if self.mark_context and event_dict.keys().isdisjoint(context.fields):
+                # 필드는 합치지 않고 BoundContext만 남긴다. JSON 렌더러는 직렬화해 둔 조각을 붙이고,
+                # 다른 렌더러 앞에서는 expand_context가 합친다
+                event_dict[CONTEXT_KEY] = context
+            else:
+                # 이벤트 인자와 이름이 겹치면 이벤트 값이 우선한다 (merge_context와 같다)
+                for key, value in context.fields.items():
+                    event_dict.setdefault(key, value)
+        record = event_dict.get("_record")
+        event_dict["logger"] = logger.name if record is None else record.name
+        event_dict["level"] = _LEVEL_ALIASES.get(method_name, method_name)
+
+        for processor in self.early:
+            event_dict = processor(logger, method_name, event_dict)
+
+        if "positional_args" in event_dict:
+            args = event_dict["positional_args"]
+            if args:
+                # stdlib LogRecord와 같이 비어 있지 않은 dict 하나만 받으면 이름으로 치환한다
+                if len(args) == 1 and isinstance(args[0], dict) and args[0]:
+                    args = args[0]
+                event_dict["event"] %= args
+            if args is not None:
+                del event_dict["positional_args"]
+
+        # stdlib 레코드는 async 모드에서 리스너 스레드가 나중에 처리하므로 레코드를 만든 시각을 쓴다
+        event_dict["timestamp"] = self.timestamp() if record is None else self.timestamp(round(record.created * 1e6))
+
+        if "stack_info" in event_dict:
+            event_dict = self._stack(logger, method_name, event_dict)
+
+        if method_name == "exception" or "exc_info" in event_dict:
+            if method_name == "exception" and "exc_info" not in event_dict:
+                event_dict["exc_info"] = True
+            if self.exception_hook is not None:
+                event_dict = self.exception_hook(logger, method_name, event_dict)
+            event_dict = structlog.processors.dict_tracebacks(logger, method_name, event_dict)
+        return event_dict
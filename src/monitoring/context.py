@@ -0,0 +1,100 @@
+"""요청 단위 필드를 한 객체로 묶어 두고 JSON 조각을 컨텍스트마다 한 번만 만드는 bind API.
+
+structlog.contextvars.bind_contextvars()로 묶은 필드는 필드마다 ContextVar에 있어 이벤트마다 하나씩 합쳐지고
+렌더러가 매번 직렬화한다. bind_context()로 묶으면 필드 전체를 바꾸지 않는 BoundContext 하나로 ContextVar에 두므로,
+context_cache=True일 때 JSON 렌더러는 BoundContext마다 직렬화한 조각을 재사용하고 이벤트 필드만 직렬화한다.
+
+    with bound_context(service="checkout", request_id=request_id, user_id=user.id):
+        log.info("request completed", status=200, duration_ms=12.5)
+
+context_cache=True면 FusedProcessor는 필드를 event_dict에 합치지 않고 BoundContext만 남기고, 필드는 렌더러 단계
+(JSON은 조각, 콘솔/텍스트/binary는 expand_context)에서 합쳐진다. 지표 규칙과 flight recorder 키도 이 필드를 본다.
+이벤트 인자와 이름이 같은 필드는 이벤트 값이 우선한다.
+"""
+
+import contextlib
+import contextvars
+from collections.abc import Callable, Iterator
+
+from .lazy import resolve_lazy_fields
+
+
+class BoundContext:
+    """bind_context()가 만든 필드 묶음. 만든 뒤에는 바꾸지 않는다."""
+
+    __slots__ = ("_fragments", "_resolved", "fields")
+
+    def __init__(self, fields: dict):
+        self.fields = fields
+        self._resolved: dict | None = None
+        # 렌더러 → "{...}"에서 중괄호를 뗀 조각 (출력 형식별 formatter마다 하나)
+        self._fragments: dict[Callable, str | bytes] = {}
+
+    def resolved(self) -> dict:
+        """Lazy 값을 계산한 필드. 처음 렌더링할 때 한 번만 계산한다 (Lazy도 인스턴스에 memoize된다)."""
+        if self._resolved is None:
+            self._resolved = resolve_lazy_fields(None, "info", dict(self.fields))
+        return self._resolved
+
+    def fragment(self, renderer: Callable) -> str | bytes:
+        """renderer로 필드만 직렬화한 조각. 처음 한 번만 직렬화한다."""
+        fragment = self._fragments.get(renderer)
+        if fragment is None:
+            fragment = self._fragments[renderer] = renderer(None, "info", dict(self.resolved()))[1:-1]
+        return fragment
+
+
+_CONTEXT: contextvars.ContextVar[BoundContext | None] = contextvars.ContextVar("monitoring_context", default=None)
+
+
+def current_context() -> BoundContext | None:
+    """현재 컨텍스트에 묶인 BoundContext (없으면 None)."""
+    return _CONTEXT.get()
+
+
+def get_context() -> dict:
+    """현재 컨텍스트에 묶인 필드의 복사본."""
+    context = _CONTEXT.get()
+    return dict(context.fields) if context is not None else {}
+
+
+def bind_context(**fields) -> contextvars.Token:
+    """현재 컨텍스트의 필드에 fields를 더한 새 BoundContext를 묶는다. reset_context()에 넘길 token을 돌려준다."""
+    context = _CONTEXT.get()
+    return _CONTEXT.set(BoundContext({**context.fields, **fields} if context is not None else fields))
+
+
+def unbind_context(*keys: str) -> contextvars.Token:
+    """keys를 뺀 새 BoundContext를 묶는다."""
+    context = _CONTEXT.get()
+    fields = {k: v for k, v in context.fields.items() if k not in keys} if context is not None else {}
+    return _CONTEXT.set(BoundContext(fields) if fields else None)
+
+
+def reset_context(token: contextvars.Token) -> None:
+    """bind_context()/unbind_context() 이전 상태로 되돌린다."""
+    _CONTEXT.reset(token)
+
+
+def clear_context() -> None:
+    """묶인 필드를 모두 지운다."""
+    _CONTEXT.set(None)
+
+
+@contextlib.contextmanager
+def bound_context(**fields) -> Iterator[None]:
+    """with 블록 안에서만 fields를 묶는다."""
+    token = bind_context(**fields)
+    try:
+        yield
+    finally:
+        reset_context(token)
+
+
+def merge_context(_, __, event_dict: dict) -> dict:
+    """bind_context()로 묶은 필드를 event_dict에 합치는 structlog processor (reference_chain용)."""
+    context = _CONTEXT.get()
+    if context is not None:
+        for key, value in context.fields.items():
+            event_dict.setdefault(key, value)
+    return event_dict
@@ -0,0 +1,281 @@
+"""이벤트에서 counter/histogram을 뽑아 프로세스 안에서 집계하는 log-derived metrics.
+
+규칙은 dict(또는 MetricRule)로 선언한다.
+
+    {"name": "http_requests", "event": "request completed", "labels": ["method", "status"]}
+    {"name": "http_request_duration_ms", "type": "histogram", "event": "request completed",
+     "field": "duration_ms", "buckets": [5, 10, 25, 50, 100, 250, 500, 1000], "sample": 0.01}
+
+event(포맷 전 문자열)가 같은 이벤트 중 logger(이름 또는 상위 로거)와 where(필드 값)가 맞는 것만 집계한다.
+counter는 이벤트 수(field가 있으면 그 값의 합)를, histogram은 field 값을 고정 버킷에 센다.
+sample을 주면 집계한 뒤 그 비율만 기록하고 나머지는 버린다 (0이면 지표만 남기고 줄은 모두 버린다).
+
+누적값은 snapshot()/prometheus_text()로 읽고, start()는 interval초마다 직전 구간의 증가분을
+"derived metric" 이벤트로 기록하는 스레드를 띄운다.
+"""
+
+import itertools
+import logging
+import random
+import threading
+from collections.abc import Iterable, Mapping, Sequence
+
+import structlog
+
+from .chain import CONTEXT_KEY
+from .metrics import Histogram, _labels
+
+# histogram 기본 버킷 상한 (필드 단위, 밀리초 기준 5ms ~ 10s)
+DEFAULT_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 구간 집계 이벤트를 기록하는 로거 이름
+LOGGER_NAME = "monitoring.derived"
+
+_TYPES = ("counter", "histogram")
+_NUMBERS = frozenset({int, float})
+
+
+class MetricRule:
+    """이벤트 하나에서 값을 뽑는 규칙.
+
+    name: 지표 이름 (Prometheus에서는 counter는 {name}_total, histogram은 {name}_bucket 등)
+    event: 집계할 이벤트 이름. 포맷 전 문자열과 비교한다
+    type: "counter" 또는 "histogram"
+    field: histogram에 넣을 값, counter에서는 1 대신 더할 값 (int/float가 아니면 집계하지 않는다)
+    labels: 레이블로 쓸 필드 이름. 없는 필드는 빈 문자열이 된다
+    buckets: histogram 버킷 상한 (오름차순)
+    logger: 이 로거와 하위 로거의 이벤트만 집계한다
+    where: 필드 값이 모두 같은 이벤트만 집계한다 (예: {"level": "info"})
+    sample: 집계한 이벤트 중 기록할 비율 (None이면 모두 기록)
+    """
+
+    __slots__ = ("buckets", "event", "field", "filtered", "labels", "logger", "name", "sample", "type", "where")
+
+    def __init__(
+        self,
+        name: str,
+        event: str,
+        type: str = "counter",
+        field: str | None = None,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] | None = None,
+        logger: str | None = None,
+        where: Mapping[str, object] | None = None,
+        sample: float | None = None,
+    ):
+        if type not in _TYPES:
+            raise ValueError(f"지원하지 않는 지표 종류입니다: {type!r} (허용: {', '.join(_TYPES)})")
+        if type == "histogram" and field is None:
+            raise ValueError(f"histogram 규칙에는 field가 필요합니다: {name!r}")
+        if sample is not None and not 0 <= sample <= 1:
+            raise ValueError(f"sample은 0 이상 1 이하여야 합니다: {sample!r}")
+        buckets = tuple(buckets) if buckets is not None else DEFAULT_BUCKETS
+        if any(a >= b for a, b in itertools.pairwise(buckets)):
+            raise ValueError(f"buckets는 오름차순이어야 합니다: {buckets!r}")
+
+        self.name = name
+        self.event = event
+        self.type = type
+        self.field = field
+        self.labels = tuple(labels)
+        self.buckets = buckets
+        self.logger = logger
+        self.where = tuple((where or {}).items())
+        self.sample = sample
+        self.filtered = logger is not None or bool(self.where)
+
+    def matches(self, event_dict: dict) -> bool:
+        if self.logger is not None:
+            name = event_dict.get("logger") or ""
+            if name != self.logger and not name.startswith(self.logger + "."):
+                return False
+        return all(event_dict.get(key) == value for key, value in self.where)
+
+
+def _label_value(value) -> str | int | float:
+    # 레이블 값은 이벤트 값 그대로 키로 쓰고, 내보낼 때만 None은 빈 문자열, 그 밖의 타입은 문자열로 바꾼다
+    if value is None:
+        return ""
+    if isinstance(value, str | int | float):
+        return value
+    return str(value)
+
+
+class DerivedMetrics:
+    """규칙에 맞는 이벤트를 집계하는 structlog processor.
+
+    샘플링/속도 제한보다 먼저 두어 기록되지 않는 이벤트도 센다. 규칙은 이벤트 이름으로 찾으므로
+    규칙에 없는 이벤트는 dict 조회 한 번만 한다.
+
+    max_series: 규칙마다 레이블 조합 수 상한. 넘는 조합은 집계하지 않고 overflowed에 센다
+    downsampled: sample 때문에 기록하지 않은 이벤트 수
+    """
+
+    def __init__(self, rules: Iterable[MetricRule | Mapping], interval: float = 0, max_series: int = 10_000):
+        self.rules = [rule if isinstance(rule, MetricRule) else MetricRule(**rule) for rule in rules]
+        names = [rule.name for rule in self.rules]
+        duplicated = sorted({name for name in names if names.count(name) > 1})
+        if duplicated:
+            raise ValueError(f"지표 이름이 중복됩니다: {', '.join(duplicated)}")
+
+        self.interval = interval
+        self.max_series = max_series
+        self.downsampled = 0
+        self.overflowed = 0
+        # 규칙 이름 → {레이블 값 튜플: 누적값(counter는 숫자, histogram은 Histogram)}
+        self._series: dict[str, dict[tuple, object]] = {rule.name: {} for rule in self.rules}
+        by_event: dict[str, list[tuple[MetricRule, dict]]] = {}
+        for rule in self.rules:
+            by_event.setdefault(rule.event, []).append((rule, self._series[rule.name]))
+        self._by_event = {event: tuple(rules) for event, rules in by_event.items()}
+        # drain()이 마지막으로 보고한 누적값 (구간 증가분 계산용)
+        self._drained: dict[str, dict[tuple, object]] = {rule.name: {} for rule in self.rules}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __call__(self, _, __, event_dict: dict) -> dict:
+        event = event_dict.get("event")
+        rules = self._by_event.get(event) if isinstance(event, str) else None
+        if rules is None:
+            return event_dict
+
+        # context_cache=True면 bind_context() 필드가 아직 합쳐지지 않았으므로 합친 사본에서 값을 읽는다
+        context = event_dict.get(CONTEXT_KEY)
+        fields = event_dict if context is None else {**context.fields, **event_dict}
+
+        # 초당 수십만 건을 처리해야 하므로 메서드 호출과 제너레이터를 피하고 잠금은 이벤트당 한 번만 잡는다
+        sample = None
+        with self._lock:
+            for rule, series in rules:
+                if rule.filtered and not rule.matches(fields):
+                    continue
+                if rule.sample is not None and (sample is None or rule.sample < sample):
+                    sample = rule.sample
+
+                value = 1 if rule.field is None else fields.get(rule.field)
+                # bool과 숫자가 아닌 값은 집계하지 않는다
+                if value.__class__ not in _NUMBERS:
+                    continue
+                key = tuple([fields.get(label) for label in rule.labels]) if rule.labels else ()
+                try:
+                    current = series.get(key)
+                except TypeError:
+                    key = tuple(map(_label_value, key))
+                    current = series.get(key)
+                if current is None:
+                    if len(series) >= self.max_series:
+                        self.overflowed += 1
+                        continue
+                    current = series[key] = Histogram(rule.buckets, scale=1) if rule.type == "histogram" else 0
+                if rule.type == "histogram":
+                    current.observe(value)
+                else:
+                    series[key] = current + value
+
+        # 여러 규칙에 맞으면 가장 낮은 비율을 따른다
+        if sample is not None and random.random() >= sample:  # nosec B311 - 보안 용도가 아닌 로그 샘플링
+            self.downsampled += 1
+            raise structlog.DropEvent
+        return event_dict
+
+    def snapshot(self) -> dict:
+        """{지표 이름: [{"labels": {...}, "value": N} 또는 {"labels": {...}, "count", "sum", "buckets"}]} 누적값."""
+        snapshot = {}
+        with self._lock:
+            for rule in self.rules:
+                snapshot[rule.name] = [
+                    {"labels": dict(zip(rule.labels, map(_label_value, key), strict=True)), **_value(current)}
+                    for key, current in self._series[rule.name].items()
+                ]
+        return snapshot
+
+    def drain(self) -> list[tuple[str, dict, dict]]:
+        """직전 drain() 이후 증가분을 (지표 이름, 레이블, 값) 목록으로 돌려준다. 변화가 없는 조합은 빠진다."""
+        pending = []
+        with self._lock:
+            for rule in self.rules:
+                drained = self._drained[rule.name]
+                for key, current in self._series[rule.name].items():
+                    delta = _delta(current, drained.get(key))
+                    if delta is None:
+                        continue
+                    drained[key] = _copy(current)
+                    pending.append((rule.name, dict(zip(rule.labels, map(_label_value, key), strict=True)), delta))
+        return pending
+
+    def emit(self) -> None:
+        """drain() 결과를 지표·레이블 조합마다 "derived metric" 이벤트 하나로 기록한다."""
+        logger = structlog.get_logger(LOGGER_NAME)
+        for name, labels, value in self.drain():
+            logger.log(logging.INFO, "derived metric", metric=name, labels=labels, interval=self.interval, **value)
+
+    def prometheus_text(self) -> str:
+        """누적값을 Prometheus text exposition 형식으로 변환한다."""
+        snapshot = self.snapshot()
+        lines: list[str] = []
+        for rule in self.rules:
+            help_text = f"Derived from {rule.event!r} events."
+            if rule.type == "counter":
+                name = rule.name if rule.name.endswith("_total") else f"{rule.name}_total"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f"{name}{_labels(s['labels'])} {s['value']}" for s in snapshot[rule.name])
+                continue
+            lines.append(f"# HELP {rule.name} {help_text}")
+            lines.append(f"# TYPE {rule.name} histogram")
+            for s in snapshot[rule.name]:
+                for le, count in s["buckets"].items():
+                    lines.append(f"{rule.name}_bucket{_labels({**s['labels'], 'le': str(le)})} {count}")
+                lines.append(f"{rule.name}_sum{_labels(s['labels'])} {s['sum']}")
+                lines.append(f"{rule.name}_count{_labels(s['labels'])} {s['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def start(self) -> None:
+        """interval초마다 구간 집계를 기록하는 데몬 스레드를 띄운다."""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="derived-metrics", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.emit()
+
+    def stop(self) -> None:
+        """기록 스레드를 멈추고 남은 구간 집계를 기록한다."""
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is None:
+            return
+        if thread is not threading.current_thread():
+            thread.join()
+        self.emit()
+
+
+def _value(current) -> dict:
+    if isinstance(current, Histogram):
+        return current.snapshot()
+    return {"value": current}
+
+
+def _copy(current):
+    if isinstance(current, Histogram):
+        return (current.count, current.total, tuple(current.counts))
+    return current
+
+
+def _delta(current, drained) -> dict | None:
+    if not isinstance(current, Histogram):
+        delta = current - (drained or 0)
+        return {"value": delta} if delta else None
+    count, total, counts = drained or (0, 0, (0,) * len(current.counts))
+    if current.count == count:
+        return None
+    cumulative, buckets = 0, {}
+    for bound, n, before in zip((*current.bounds, None), current.counts, counts, strict=True):
+        cumulative += n - before
+        # orjson 등은 문자열이 아닌 키를 직렬화하지 못하므로 상한은 문자열로 둔다
+        buckets["+Inf" if bound is None else str(bound)] = cumulative
+    return {"count": current.count - count, "sum": current.total - total, "buckets": buckets}
@@ -0,0 +1,113 @@
+import logging
+import weakref
+
+import structlog
+
+from .chain import CONTEXT_KEY, SUMMARY_KEY
+
+
+class SharedProcessorFormatter(structlog.stdlib.ProcessorFormatter):
+    """같은 출력 형식을 쓰는 핸들러들이 공유하는 ProcessorFormatter.
+
+    logging은 하나의 레코드를 핸들러 순서대로 연달아 포맷하므로, 직전에 렌더링한 레코드를
+    기억해 두었다가 같은 레코드가 다시 들어오면 foreign_pre_chain과 렌더러를 건너뛰고 결과를 재사용한다.
+    ERROR 이벤트가 {name}.log와 {name}.error.log에 모두 기록될 때 직렬화가 한 번만 일어난다.
+
+    렌더러가 bytes를 반환하면(orjson, msgspec) str로 바꾸지 않고 그대로 돌려준다.
+    keep_exc_info/keep_stack_info는 지원하지 않는다 — 예외와 스택은 processor 체인이 이벤트에 담는다.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (record 약한 참조, rendered) 튜플을 통째로 교체하므로 여러 스레드가 동시에 접근해도 짝이 어긋나지 않는다.
+        # 레코드는 약한 참조로만 들고 있어 exc_info의 traceback(프레임과 지역 변수)을 붙잡지 않는다
+        self._last: tuple[weakref.ref | None, str | bytes] = (None, "")
+
+    def format(self, record: logging.LogRecord) -> str | bytes:  # type: ignore[override]
+        last_ref, rendered = self._last
+        if last_ref is not None and last_ref() is record:
+            return rendered
+
+        rendered = self._render(record)
+        self._last = (weakref.ref(record), rendered)
+        return rendered
+
+    def _render(self, record: logging.LogRecord) -> str | bytes:
+        # ProcessorFormatter.format과 같은 순서로 이벤트를 처리하되, 원본 레코드를 바꾸지 않으므로
+        # 레코드 복사와 logging.Formatter.format 단계를 생략한다
+        logger = getattr(record, "_logger", None)
+        meth_name = getattr(record, "_name", None)
+
+        if logger is not None and meth_name is not None:
+            if self.logger is not None:
+                logger = self.logger
+            event_dict = {**record.msg, "_record": record, "_from_structlog": True}
+            event_dict.pop(SUMMARY_KEY, None)
+        else:
+            logger = self.logger
+            meth_name = record.levelname.lower()
+            event_dict = {
+                "event": record.getMessage() if self.use_get_message else str(record.msg),
+                "_record": record,
+                "_from_structlog": False,
+            }
+            if self.pass_foreign_args:
+                event_dict["positional_args"] = record.args
+            if record.exc_info:
+                event_dict["exc_info"] = record.exc_info
+            if record.stack_info:
+                event_dict["stack_info"] = record.stack_info
+
+            # async 모드에서는 OverflowQueueHandler.prepare()가 남긴 호출 스레드의 contextvars 안에서 실행한다
+            context = getattr(record, "_context", None)
+            if context is not None:
+                event_dict = context.run(self._pre_chain, logger, meth_name, event_dict)
+            else:
+                event_dict = self._pre_chain(logger, meth_name, event_dict)
+
+        for proc in self.processors:
+            event_dict = proc(logger, meth_name, event_dict)
+
+        return event_dict
+
+    def _pre_chain(self, logger, meth_name: str, event_dict: dict) -> dict:
+        for proc in self.foreign_pre_chain or ():
+            event_dict = proc(logger, meth_name, event_dict)
+        return event_dict
+
+
+class ContextFragmentRenderer:
+    """bind_context()로 묶은 필드의 JSON 조각을 BoundContext마다 한 번만 만들어 재사용하는 JSON 렌더러.
+
+    FusedProcessor(mark_context=True)가 CONTEXT_KEY에 남긴 BoundContext는 필드가 event_dict에 합쳐지지 않은
+    상태이므로, 이벤트 필드만 renderer로 직렬화한 뒤 끝에 조각을 이어 붙인다. 키와 값은 renderer만 쓸 때와 같고,
+    컨텍스트 필드가 줄 끝에 놓이는 것만 다르다. 그 뒤 processor가 더한 키(timestamp, level 등)와 이름이 겹치면
+    조각을 쓰지 않고 필드를 합쳐 렌더링한다.
+    """
+
+    def __init__(self, renderer):
+        self._renderer = renderer
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> str | bytes:
+        context = event_dict.pop(CONTEXT_KEY, None)
+        if context is not None and not event_dict.keys().isdisjoint(context.fields):
+            # 중복 키가 생기지 않도록 합치고, 이벤트 값이 우선한다 (expand_context와 같다)
+            for key, value in context.resolved().items():
+                event_dict.setdefault(key, value)
+            context = None
+        rendered = self._renderer(logger, method_name, event_dict)
+        if context is None or not context.fields:
+            return rendered
+        fragment = context.fragment(self._renderer)
+        if isinstance(rendered, str):
+            return f"{rendered[:-1]}, {fragment}}}" if len(rendered) > 2 else f"{{{fragment}}}"
+        return rendered[:-1] + b"," + fragment + b"}" if len(rendered) > 2 else b"{" + fragment + b"}"
+
+
+def expand_context(_, __, event_dict: dict) -> dict:
+    """JSON이 아닌 렌더러 앞에서 CONTEXT_KEY의 필드를 event_dict에 합친다."""
+    context = event_dict.pop(CONTEXT_KEY, None)
+    if context is not None:
+        for key, value in context.resolved().items():
+            event_dict.setdefault(key, value)
+    return event_dict
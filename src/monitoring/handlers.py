@@ -0,0 +1,436 @@
+import contextlib
+import contextvars
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections.abc import Sequence
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .archive import SegmentArchiver
+    from .binlog import SegmentEncoder
+    from .metrics import LoggerMetrics
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+# 쓰기가 계속 실패할 때(디스크가 가득 참 등) 버퍼에 붙잡아 둘 최대 바이트 수. 넘으면 버리고 dropped에 센다
+MAX_PENDING_BYTES = 4 * 1024 * 1024
+
+
+class OverflowQueueHandler(QueueHandler):
+    """레코드를 포맷하지 않은 채 bounded queue에 넣는 핸들러.
+
+    렌더링과 파일 쓰기는 BackgroundQueueListener 스레드가 담당한다.
+    큐가 가득 찼을 때의 동작은 overflow 정책으로 결정한다.
+
+    block: 빈 자리가 생길 때까지 호출 스레드가 대기한다
+    drop_newest: 새로 들어온 레코드를 버린다
+    drop_oldest: 가장 오래된 레코드를 버리고 새 레코드를 넣는다
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"지원하지 않는 overflow 정책입니다: {overflow!r} (허용: {', '.join(OVERFLOW_POLICIES)})")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        # 이 큐를 비우는 리스너 (핸들러를 교체할 때 함께 멈추고 닫는다)
+        self.listener: BackgroundQueueListener | None = None
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 기본 구현은 호출 스레드에서 format()을 실행한다. 렌더링은 리스너 스레드로 넘긴다.
+        # stdlib 레코드는 foreign_pre_chain이 리스너 스레드에서 실행되므로 호출 스레드의 contextvars를 남긴다
+        if not hasattr(record, "_logger"):
+            record._context = contextvars.copy_context()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == "drop_newest":
+                self._count_dropped()
+                return
+            self._put_dropping_oldest(record)
+
+    def _put_dropping_oldest(self, record: logging.LogRecord) -> None:
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                self.queue.task_done()
+                self._count_dropped()
+
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                continue
+
+    def _count_dropped(self) -> None:
+        with self._drop_lock:
+            self.dropped += 1
+
+
+class BackgroundQueueListener(QueueListener):
+    """큐에서 레코드를 꺼내 실제 핸들러(파일, 콘솔)로 전달하는 백그라운드 리스너.
+
+    종료 신호는 Event로 전달한다. 큐에 넣은 sentinel은 drop_oldest 정책에서 새 레코드에 밀려 버려질 수 있다.
+    """
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, respect_handler_level: bool = False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        super().start()
+
+    def _monitor(self) -> None:
+        log_queue = self.queue
+        while not self._stopping.is_set():
+            try:
+                record = log_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            self._dispatch(record)
+        # stop() 전에 들어온 레코드를 기록한다. 호출 스레드가 계속 넣어도 끝나도록 그때의 개수만큼만 꺼낸다
+        for _ in range(log_queue.qsize()):
+            try:
+                record = log_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._dispatch(record)
+
+    def _dispatch(self, record) -> None:
+        if record is not self._sentinel:
+            self.handle(record)
+        self.queue.task_done()
+
+    def enqueue_sentinel(self) -> None:
+        # get()에서 대기 중인 스레드를 깨우기만 한다. 큐가 가득 차 있으면 다음 레코드를 꺼낼 때 Event를 본다
+        with contextlib.suppress(queue.Full):
+            self.queue.put_nowait(self._sentinel)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """남은 레코드를 기록하고 스레드를 멈춘다. 핸들러가 멈춰 있어도 timeout초 뒤에는 돌아온다."""
+        # 핸들러를 교체할 때와 shutdown() 양쪽에서 불릴 수 있다
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self.enqueue_sentinel()
+        self._thread.join(timeout)
+        self._thread = None
+        for handler in self.handlers:
+            handler.flush()
+
+
+# fork 이후 자식 프로세스에서 상태를 정리해야 하는 핸들러 목록 (pre-fork 워커 대응)
+_fork_aware_handlers: weakref.WeakSet = weakref.WeakSet()
+
+
+def register_after_fork(handler) -> None:
+    """fork된 자식 프로세스에서 handler._after_fork_in_child()가 호출되도록 등록한다."""
+    _fork_aware_handlers.add(handler)
+
+
+def unregister_after_fork(handler) -> None:
+    _fork_aware_handlers.discard(handler)
+
+
+def _reinit_handlers_after_fork() -> None:
+    for handler in list(_fork_aware_handlers):
+        handler._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_handlers_after_fork)
+
+
+def encode_line(msg: str | bytes, encoding: str = "utf-8") -> bytes:
+    """포맷 결과를 개행으로 끝나는 bytes 한 줄로 만든다."""
+    if isinstance(msg, str):
+        msg = msg.encode(encoding)
+    return msg + b"\n"
+
+
+class PeriodicFlushMixin:
+    """flush_interval초마다 flush()를 호출하는 백그라운드 스레드를 관리한다.
+
+    fork된 자식 프로세스에서는 스레드가 복제되지 않으므로 _after_fork_in_child에서 다시 시작하고,
+    부모가 쓸 예정인 버퍼 내용은 버린다(_discard_pending).
+    """
+
+    flush_interval: float
+    lock: threading.RLock
+
+    def _start_flusher(self) -> None:
+        self._stop_flusher = threading.Event()
+        self._flusher: threading.Thread | None = None
+        register_after_fork(self)
+        if self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="log-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop_flusher.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # 백그라운드 flush 실패가 스레드를 죽이지 않도록 stderr에 남기고 다음 주기에 다시 시도한다
+                traceback.print_exc(file=sys.stderr)
+
+    def _stop_flusher_thread(self) -> None:
+        self._stop_flusher.set()
+        unregister_after_fork(self)
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=self.flush_interval + 1)
+
+    def _after_fork_in_child(self) -> None:
+        self._discard_pending()
+        if self._flusher is not None and not self._stop_flusher.is_set():
+            self._start_flusher()
+
+    def _discard_pending(self) -> None:
+        """fork된 자식에서 부모가 쓸 예정인 버퍼 내용을 버린다. 버퍼가 없는 핸들러는 할 일이 없다."""
+
+
+class BufferedRotatingFileHandler(PeriodicFlushMixin, RotatingFileHandler):
+    """바이트 단위로 버퍼링하고 묶어서 쓰는 RotatingFileHandler.
+
+    - 파일을 바이너리 모드로 열고, 렌더러가 bytes를 반환하면(orjson, msgspec) 그대로, str이면 인코딩해서 쓴다
+    - 기록한 바이트 수를 직접 누적하므로 로테이션 판단을 위해 레코드를 미리 포맷하지 않는다
+    - buffer_size 바이트가 쌓이거나 flush_interval초가 지나면 모아 둔 레코드를 한 번에 쓴다 (group commit)
+    - fsync_on_error=True면 ERROR 이상 레코드는 즉시 디스크까지 fsync한다
+
+    - rotate_interval초가 지나면 크기와 상관없이 로테이션한다
+    - compression을 지정하면 닫힌 세그먼트를 {name}.log.YYYYmmdd-HHMMSS로 옮기고 백그라운드 스레드에서 압축한다
+    - retention_bytes/retention_age를 넘는 세그먼트는 백그라운드 스레드에서 오래된 것부터 지운다
+    - index_keys를 지정하면(빈 목록 포함) 로테이션된 세그먼트마다 백그라운드 스레드에서 검색 인덱스를 만든다
+    - encoder를 지정하면(format="binary") 렌더러가 넘긴 event_dict를 encoder로 인코딩한다.
+      encoder의 문자열 표는 파일을 열 때마다 새로 시작한다
+
+    compression이 없으면 maxBytes/backupCount와 {name}.log → {name}.log.1 … 백업 이름 규칙은
+    stdlib RotatingFileHandler와 같다. 활성 파일 {name}.log의 이름과 형식은 항상 그대로다.
+    buffer_size=0이면 레코드마다 바로 쓴다. 쓰기가 실패하면 버퍼를 남겨 다음에 다시 쓰되,
+    MAX_PENDING_BYTES를 넘으면 버리고 dropped에 레코드 수를 센다.
+    """
+
+    def __init__(
+        self,
+        filename,
+        maxBytes: int = 0,  # noqa: N803
+        backupCount: int = 0,  # noqa: N803
+        encoding: str = "utf-8",
+        delay: bool = False,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        fsync_on_error: bool = False,
+        rotate_interval: float = 0,
+        compression: str | None = None,
+        retention_bytes: int = 0,
+        retention_age: float = 0,
+        metrics: "LoggerMetrics | None" = None,
+        encoder: "SegmentEncoder | None" = None,
+        index_keys: Sequence[str] | None = None,
+    ):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval if buffer_size > 0 else 0
+        self.fsync_on_error = fsync_on_error
+        self.rotate_interval = rotate_interval
+        self.metrics = metrics
+        self.encoder = encoder
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+        self.dropped = 0
+        self._size = 0
+        self._rollover_at = 0.0
+        self._archiver: SegmentArchiver | None = None
+        self._cleanup_pending = True
+        if compression or retention_bytes or retention_age or index_keys is not None:
+            self._archiver = self._make_archiver(
+                compression,
+                # 타임스탬프 이름의 세그먼트는 stdlib가 개수를 관리하지 않으므로 archiver가 backupCount를 지킨다
+                backup_count=backupCount if compression else 0,
+                retention_bytes=retention_bytes,
+                retention_age=retention_age,
+                index_keys=index_keys,
+            )
+        super().__init__(filename, mode="a", maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=delay)
+        self._start_flusher()
+
+    def _make_archiver(self, compression: str | None, **options) -> "SegmentArchiver":
+        from .archive import SegmentArchiver
+
+        return SegmentArchiver(compression, **options)
+
+    def _open(self):
+        stream = open(self.baseFilename, "ab")  # noqa: SIM115
+        # append 모드는 파일 끝에서 열리므로 현재 위치가 곧 기존 파일 크기다
+        self._size = stream.tell()
+        self._rollover_at = time.time() + self.rotate_interval
+        if self.encoder is not None:
+            # 새 파일(또는 이어 쓰는 파일)은 헤더부터 다시 쓰고 문자열 표를 새로 시작한다
+            self.encoder.reset()
+        if self._archiver is not None and self._cleanup_pending:
+            # 처음 열 때 이전 실행이 압축하지 못한 세그먼트와 보존 기간이 지난 세그먼트를 정리한다
+            self._cleanup_pending = False
+            self._archiver.submit(self.baseFilename)
+        return stream
+
+    def _encode(self, record: logging.LogRecord) -> bytes:
+        if self.encoder is not None:
+            return self.encoder.encode(self.format(record))
+        return encode_line(self.format(record), self.encoding)
+
+    def _needs_rollover(self, incoming: int) -> bool:
+        if self._size <= 0:
+            return False
+        by_size = self.maxBytes > 0 and self._size + incoming >= self.maxBytes
+        by_time = self.rotate_interval > 0 and time.time() >= self._rollover_at
+        if not (by_size or by_time):
+            return False
+        # 일반 파일이 아니면(/dev/null 등) 로테이션하지 않는다
+        return not (os.path.exists(self.baseFilename) and not os.path.isfile(self.baseFilename))
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:  # noqa: N802
+        # emit()은 인코딩한 줄의 크기로 판단한다. 여기서는 레코드를 포맷하지 않고 현재 크기와 시각만 본다
+        if self.stream is None:
+            self.stream = self._open()
+        return self._needs_rollover(0)
+
+    def doRollover(self) -> None:  # noqa: N802
+        self._write_buffer()
+        if self._archiver is not None and self._archiver.compresses:
+            # 닫힌 세그먼트를 이름만 바꿔 두고 압축은 archiver 스레드에 맡긴다
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            from .archive import segment_name
+
+            if os.path.exists(self.baseFilename):
+                os.rename(self.baseFilename, segment_name(self.baseFilename))
+            if not self.delay:
+                self.stream = self._open()
+        else:
+            if self._archiver is not None and self._archiver.indexes and self.backupCount > 0:
+                from .archive import shift_numbered_indexes
+
+                # stdlib가 {name}.log.N을 N+1로 밀어내므로 인덱스도 같이 옮긴다
+                shift_numbered_indexes(self.baseFilename, self.backupCount)
+            super().doRollover()
+        if self._archiver is not None:
+            self._archiver.submit(self.baseFilename)
+        if self.metrics is not None:
+            self.metrics.record_rotation(os.path.basename(self.baseFilename))
+        if self.stream is None:
+            self._size = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.encoder is None:
+                self._append(self._encode(record), record.levelno)
+            else:
+                self._append_event(self.format(record), record.levelno)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def write_raw(self, data: bytes, levelno: int = logging.INFO) -> None:
+        """이미 렌더링된 줄(개행 포함, 여러 줄 가능)을 버퍼에 추가한다. 로테이션과 버퍼링 규칙은 emit과 같다."""
+        with self.lock:
+            self._append(data, levelno)
+
+    def _append_event(self, event: dict, levelno: int) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        data = self.encoder.encode(event)
+        if self._needs_rollover(len(data)):
+            # 새 파일의 문자열 표는 비어 있으므로 로테이션한 뒤 다시 인코딩한다
+            self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            data = self.encoder.encode(event)
+        self._append(data, levelno)
+
+    def _append(self, data: bytes, levelno: int) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        if self._needs_rollover(len(data)):
+            self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+
+        self._buffer.append(data)
+        self._buffered += len(data)
+        self._size += len(data)
+
+        if self.fsync_on_error and levelno >= logging.ERROR:
+            self._write_buffer()
+            os.fsync(self.stream.fileno())
+        elif self._buffered >= self.buffer_size:
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        if not self._buffer or self.stream is None:
+            return
+        data = b"".join(self._buffer)
+        start = time.perf_counter_ns()
+        try:
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            # 쓰기가 계속 실패해도 버퍼가 끝없이 자라지 않도록 상한을 넘으면 버린다
+            if self._buffered >= max(self.buffer_size, MAX_PENDING_BYTES):
+                dropped = len(self._buffer)
+                self.dropped += dropped
+                self._discard_pending()
+                if self.metrics is not None:
+                    self.metrics.record_write_dropped(os.path.basename(self.baseFilename), dropped)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_write(os.path.basename(self.baseFilename), len(data), time.perf_counter_ns() - start)
+        self._buffer.clear()
+        self._buffered = 0
+
+    def _discard_pending(self) -> None:
+        self._buffer.clear()
+        self._buffered = 0
+        if self.encoder is not None:
+            # 버린 버퍼에 들어 있던 문자열 정의를 다시 쓰도록 표를 비운다
+            self.encoder.reset()
+
+    def _after_fork_in_child(self) -> None:
+        super()._after_fork_in_child()
+        if self._archiver is not None:
+            self._archiver.reset_after_fork()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._write_buffer()
+            if self.stream is not None and hasattr(self.stream, "flush"):
+                self.stream.flush()
+
+    def close(self) -> None:
+        self._stop_flusher_thread()
+        with self.lock:
+            try:
+                self._write_buffer()
+            finally:
+                super().close()
+        if self._archiver is not None:
+            self._archiver.stop()
@@ -0,0 +1,58 @@
+import functools
+import threading
+import types
+from collections.abc import Callable
+from typing import Any
+
+# 인자 없는 함수로 보고 호출하는 값의 타입. 클래스나 __call__을 가진 객체는 값 그대로 기록한다
+_LAZY_CALLABLES = (types.FunctionType, types.MethodType, functools.partial)
+
+_UNSET = object()
+
+
+class Lazy:
+    """이벤트가 레벨 필터와 샘플링을 통과한 뒤에만 계산되는 값.
+
+    log.debug("state", snapshot=Lazy(big_obj.dump)) 처럼 쓰면 DEBUG가 꺼져 있을 때 dump()가 호출되지 않는다.
+    결과는 인스턴스에 memoize되므로 bind()로 묶어 두면 처음 한 번만 계산된다.
+    """
+
+    __slots__ = ("_args", "_func", "_kwargs", "_lock", "_value")
+
+    def __init__(self, func: Callable[..., Any], /, *args: Any, **kwargs: Any):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._value: Any = _UNSET
+
+    @property
+    def value(self) -> Any:
+        if self._value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    self._value = self._func(*self._args, **self._kwargs)
+        return self._value
+
+    def __repr__(self) -> str:
+        if self._value is _UNSET:
+            return f"Lazy({self._func!r})"
+        return repr(self._value)
+
+
+def _evaluate(value: Any) -> Any:
+    try:
+        if isinstance(value, Lazy):
+            return value.value
+        return value()
+    except Exception as e:
+        # 계산 실패로 이벤트 자체를 잃지 않도록 실패 내용을 값으로 남긴다
+        return f"<lazy evaluation failed: {e!r}>"
+
+
+def resolve_lazy_fields(_, __, event_dict: dict) -> dict:
+    """Lazy 값과 인자 없는 함수(lambda, 함수, 메서드, partial)를 호출 결과로 바꾸는 structlog processor."""
+    for key, value in event_dict.items():
+        if isinstance(value, (Lazy, *_LAZY_CALLABLES)):
+            event_dict[key] = _evaluate(value)
+    return event_dict
@@ -0,0 +1,228 @@
+"""로거 이름별 레벨을 실행 중에 바꾸는 레벨 표.
+
+레벨은 stdlib logger 계층에 setLevel로 적용한다. stdlib은 로거마다 isEnabledFor 결과를 캐시하고
+setLevel 때 캐시를 비우므로, 확인은 dict 조회 한 번(O(1))이고 바뀐 레벨은 이미 만들어진(캐시된)
+structlog 로거에도 바로 반영된다. 핸들러는 건드리지 않는다.
+
+레벨 지정 형식은 "이름=레벨"이며, 이름이 root이거나 비어 있으면 기본 레벨을 뜻한다.
+    LOG_LEVELS="app.db=DEBUG,urllib3=WARNING"
+    levels.json: {"root": "INFO", "app.db": "DEBUG"}
+"""
+
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import traceback
+from pathlib import Path
+
+import structlog
+
+ENV_VAR = "LOG_LEVELS"
+
+_ROOT_NAMES = ("", "root")
+
+# LevelTable이 레벨을 지정한 로거 이름. stdlib logger 계층은 프로세스 전역이므로,
+# setup_logging()이 표를 새로 만들어도 이전 표가 지정한 로거를 되돌릴 수 있도록 표끼리 공유한다
+_applied: set[str] = set()
+_apply_lock = threading.Lock()
+
+
+def parse_level(value: int | str) -> int:
+    """logging.DEBUG 같은 정수나 "debug"/"DEBUG" 같은 이름을 레벨 번호로 바꾼다."""
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"알 수 없는 로그 레벨입니다: {value!r}")
+    return level
+
+
+def parse_level_spec(spec: str) -> dict[str, int]:
+    """ "app.db=DEBUG,urllib3=WARNING" 형식의 문자열을 {로거 이름: 레벨}로 바꾼다."""
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, sep, level = item.partition("=")
+        if not sep:
+            raise ValueError(f"로그 레벨 지정은 이름=레벨 형식이어야 합니다: {item!r}")
+        levels[name.strip()] = parse_level(level)
+    return levels
+
+
+class LevelTable:
+    """기본 레벨과 로거 이름별 레벨을 관리하고 stdlib logger 계층에 적용한다.
+
+    reload()는 overrides(config) → file → 환경 변수 순서로 합친 결과를 적용한다 (뒤의 것이 우선).
+    이전에 (다른 LevelTable이라도) 적용했지만 새 표에 없는 로거는 NOTSET으로 되돌려 부모 레벨을 따르게 한다.
+    """
+
+    def __init__(
+        self,
+        default: int | str = logging.INFO,
+        overrides: dict[str, int | str] | None = None,
+        file: str | os.PathLike | None = None,
+        env_var: str | None = ENV_VAR,
+    ):
+        self.default = parse_level(default)
+        self.overrides = {name: parse_level(level) for name, level in (overrides or {}).items()}
+        self.file = Path(file) if file is not None else None
+        self.env_var = env_var
+        self.levels: dict[str, int] = {}
+        self._stop_watch = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._file_mtime: float | None = None
+        self._signal: int | None = None
+        self._previous_handler = None
+
+    def _read_file(self) -> dict[str, int]:
+        if self.file is None or not self.file.exists():
+            return {}
+        self._file_mtime = self.file.stat().st_mtime
+        data = json.loads(self.file.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError(f"레벨 파일은 {{로거 이름: 레벨}} 형식의 JSON 객체여야 합니다: {self.file}")
+        return {name: parse_level(level) for name, level in data.items()}
+
+    def _read_env(self) -> dict[str, int]:
+        if not self.env_var:
+            return {}
+        return parse_level_spec(os.environ.get(self.env_var, ""))
+
+    def reload(self) -> dict[str, int]:
+        """config, 파일, 환경 변수를 다시 읽어 적용하고 적용한 표를 반환한다."""
+        levels = {**self.overrides, **self._read_file(), **self._read_env()}
+        self.apply(levels)
+        return levels
+
+    def apply(self, levels: dict[str, int]) -> None:
+        """{로거 이름: 레벨} 표로 교체한다. root/빈 이름은 기본 레벨이다."""
+        with _apply_lock:
+            default = self.default
+            named = {}
+            for name, level in levels.items():
+                if name in _ROOT_NAMES:
+                    default = level
+                else:
+                    named[name] = level
+
+            logging.getLogger().setLevel(default)
+            for name in _applied - named.keys():
+                logging.getLogger(name).setLevel(logging.NOTSET)
+            for name, level in named.items():
+                logging.getLogger(name).setLevel(level)
+            _applied.clear()
+            _applied.update(named)
+            self.levels = {"root": default, **named}
+
+    def set_level(self, name: str, level: int | str | None) -> None:
+        """로거 하나의 레벨을 바꾼다. level이 None이면 지정을 지워 부모 레벨을 따른다."""
+        levels = {k: v for k, v in self.levels.items() if k != name}
+        if level is not None:
+            levels[name] = parse_level(level)
+        self.apply(levels)
+
+    def watch(self, interval: float = 2.0) -> None:
+        """interval초마다 레벨 파일의 수정 시각을 확인해 바뀌면 다시 읽는다."""
+        if self.file is None or self._watcher is not None:
+            return
+        self._stop_watch.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="log-level-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop_watch.wait(interval):
+            try:
+                mtime = self.file.stat().st_mtime if self.file.exists() else None
+                if mtime != self._file_mtime:
+                    self._file_mtime = mtime
+                    self.reload()
+            except Exception:
+                # 잘못 저장된 파일 때문에 감시가 멈추지 않도록 stderr에 남기고 이전 레벨을 유지한다
+                traceback.print_exc(file=sys.stderr)
+
+    def install_signal(self, signum: int | str = "SIGHUP") -> bool:
+        """signum을 받으면 reload()하도록 시그널 핸들러를 등록한다. 메인 스레드가 아니면 등록하지 않는다."""
+        if isinstance(signum, str):
+            signum = getattr(signal, signum)
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        self._previous_handler = signal.signal(signum, self._on_signal)
+        self._signal = signum
+        return True
+
+    def _on_signal(self, signum, frame) -> None:
+        try:
+            self.reload()
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+    def stop(self) -> None:
+        """파일 감시를 멈추고 시그널 핸들러를 이전 것으로 되돌린다."""
+        self._stop_watch.set()
+        if self._watcher is not None and self._watcher is not threading.current_thread():
+            self._watcher.join()
+        self._watcher = None
+        if self._signal is not None and threading.current_thread() is threading.main_thread():
+            signal.signal(self._signal, self._previous_handler or signal.SIG_DFL)
+            self._signal = None
+
+
+def _make_level_checked_bound_logger() -> type:
+    """호출마다 stdlib logger의 isEnabledFor로 레벨을 확인하는 FilteringBoundLogger를 만든다.
+
+    make_filtering_bound_logger(level)는 레벨을 클래스에 고정하므로 캐시된 로거는 레벨 변경을 보지 못한다.
+    """
+    base = structlog.make_filtering_bound_logger(logging.NOTSET)
+    namespace = {}
+
+    def checked(name: str, levelno: int):
+        method = getattr(base, name)
+        amethod = getattr(base, f"a{name}")
+
+        def meth(self, event=None, *args, **kw):
+            if not self._logger.isEnabledFor(levelno):
+                return None
+            return method(self, event, *args, **kw)
+
+        async def ameth(self, event=None, *args, **kw):
+            if not self._logger.isEnabledFor(levelno):
+                return None
+            return await amethod(self, event, *args, **kw)
+
+        return meth, ameth
+
+    for name, levelno in (
+        ("debug", logging.DEBUG),
+        ("info", logging.INFO),
+        ("msg", logging.INFO),
+        ("warning", logging.WARNING),
+        ("warn", logging.WARNING),
+        ("error", logging.ERROR),
+        ("exception", logging.ERROR),
+        ("critical", logging.CRITICAL),
+        ("fatal", logging.CRITICAL),
+    ):
+        namespace[name], namespace[f"a{name}"] = checked(name, levelno)
+
+    def log(self, level: int, event=None, *args, **kw):
+        if not self._logger.isEnabledFor(level):
+            return None
+        return base.log(self, level, event, *args, **kw)
+
+    async def alog(self, level: int, event=None, *args, **kw):
+        if not self._logger.isEnabledFor(level):
+            return None
+        return await base.alog(self, level, event, *args, **kw)
+
+    namespace["log"] = log
+    namespace["alog"] = alog
+    namespace["is_enabled_for"] = lambda self, level: self._logger.isEnabledFor(level)
+    namespace["get_effective_level"] = lambda self: self._logger.getEffectiveLevel()
+    return type("LevelCheckedBoundLogger", (base,), namespace)
+
+
+LevelCheckedBoundLogger = _make_level_checked_bound_logger()
@@ -1,16 +1,110 @@
-import json
+import atexit
 import logging
 import sys
-from functools import partial
-from logging.handlers import RotatingFileHandler
+import weakref
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import structlog
 
+from .aio import AsyncioBoundLogger
+from .chain import FusedProcessor, reference_chain
+from .lazy import resolve_lazy_fields
+from .levels import ENV_VAR, LevelCheckedBoundLogger, LevelTable, parse_level
+from .sampling import EventThrottler
+
+if TYPE_CHECKING:
+    # 아래 모듈은 해당 기능을 켰을 때만 import한다 (logging.handlers, http, socket 등 import 비용 절감)
+    from .derived import DerivedMetrics
+    from .handlers import BackgroundQueueListener, OverflowQueueHandler
+    from .metrics import LoggerMetrics
+    from .recorder import FlightRecorder
+    from .tracebacks import TracebackDeduplicator
+
+MULTIPROCESS_MODES = (None, "shard", "central")
+
+
+class _DeferredHandler(logging.Handler):
+    """lazy 모드에서 root logger에 대신 붙는 핸들러.
+
+    첫 레코드가 들어오면 attach()로 실제 핸들러를 만들어 자신의 자리에 끼워 넣는다.
+    로그를 남기지 않는 프로세스는 파일을 열거나 디렉토리를 만들지 않는다.
+    """
+
+    def __init__(self, attach: Callable[[], None]):
+        super().__init__()
+        self._attach = attach
+        self._attached = False
+        # 교체 뒤 자기 자리에 놓인 핸들러 (Logger.callHandlers() 루프가 건너뛰므로 직접 전달한다)
+        self._slot: logging.Handler | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # emit()은 핸들러 lock 안에서 불리므로, 동시에 첫 레코드를 남긴 스레드는 교체가 끝난 뒤 들어와
+        # 아래 _forward()만 한다
+        if not self._attached:
+            self._attached = True
+            handlers = logging.getLogger().handlers
+            try:
+                index = handlers.index(self)
+                count = len(handlers)
+                self._attach()
+            except Exception:
+                logging.getLogger().removeHandler(self)
+                self.handleError(record)
+                return
+            # Logger.callHandlers()는 이 목록을 그대로 돌고 있으므로 다음 자리부터 나머지 핸들러에 전달한다.
+            # 새 핸들러를 자기 자리에 끼워 넣고, 그 루프가 건너뛸 자기 자리의 핸들러에만 직접 전달한다
+            handlers[index:] = handlers[count:] + handlers[index + 1 : count]
+            self._slot = handlers[index] if index < len(handlers) else None
+        self._forward(record)
+
+    def _forward(self, record: logging.LogRecord) -> None:
+        if self._slot is not None and record.levelno >= self._slot.level:
+            self._slot.handle(record)
+
+
+# StructuredLogger가 root logger에 붙인 핸들러. setup_logging()이 다시 불리면 떼면서 닫는다
+_attached_handlers: weakref.WeakSet = weakref.WeakSet()
+
+
+def _release_root_handlers(root_logger: logging.Logger) -> None:
+    """root logger의 핸들러를 모두 떼고, StructuredLogger가 붙인 것은 flush한 뒤 닫는다.
+
+    파일 핸들러는 flush/압축 스레드와 fd를 가지고 있으므로 떼기만 하면 프로세스가 끝날 때까지 남는다.
+    async 모드의 큐 핸들러는 리스너를 멈추고 리스너가 가진 핸들러를 닫는다.
+    """
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        if handler not in _attached_handlers:
+            continue
+        listener = getattr(handler, "listener", None)
+        targets = [handler]
+        if listener is not None:
+            listener.stop()
+            targets.extend(listener.handlers)
+        for target in targets:
+            target.flush()
+            target.close()
+
+
+def _flush_all(handlers) -> None:
+    for handler in handlers:
+        handler.flush()
+
 
 class StructuredLogger:
     def __init__(self, name: str = "root", config: dict | None = None):
         self.name = name
+        self._queue_handler: OverflowQueueHandler | None = None
+        self._listener: BackgroundQueueListener | None = None
+        self._throttler: EventThrottler | None = None
+        self._tracebacks: TracebackDeduplicator | None = None
+        self.derived: DerivedMetrics | None = None
+        self.metrics: LoggerMetrics | None = None
+        self._metrics_server = None
+        self.levels: LevelTable | None = None
+        self.recorder: FlightRecorder | None = None
 
         default_config = self._default_config()
 
@@ -23,103 +117,418 @@ class StructuredLogger:
     def _default_config() -> dict:
         return {
             "log_level": "INFO",
+            "log_levels": {},  # 로거 이름별 레벨, 예: {"app.db": "DEBUG"} (하위 로거에도 적용)
+            "log_levels_file": None,  # 로거 이름별 레벨 JSON 파일 (바뀌면 다시 읽는다)
+            "log_levels_env": ENV_VAR,  # "app.db=DEBUG,urllib3=WARNING" 형식의 환경 변수 이름 (None이면 읽지 않음)
+            "log_levels_poll_interval": 2.0,  # 레벨 파일 확인 주기(초) (0이면 감시하지 않음)
+            "log_levels_signal": None,  # 이 시그널(예: "SIGHUP")을 받으면 파일과 환경 변수를 다시 읽는다
             "log_dir": "logs",
             "outputs": ["console", "file"],
             "max_file_size": 10 * 1024 * 1024,  # 10MB
             "backup_count": 10,
-            "format": "json",  # json or text
+            "format": "json",  # json, text, binary ({name}.logb, python -m monitoring.binlog로 JSON lines 변환)
+            "serializer": "json",  # json, orjson, msgspec, auto (orjson/msgspec는 UTF-8 bytes를 바로 쓴다)
+            "context_cache": False,  # True면 bind_context() 필드의 JSON 조각을 묶음마다 한 번만 만든다 (줄 끝에 놓인다)
             "error_tracking": True,
+            "flight_recorder": 0,  # N>0이면 로거별 최근 N개 이벤트를 메모리에 두었다가 ERROR 때 {name}.error.log에 함께 기록
+            "flight_recorder_level": "DEBUG",  # 이 레벨 이상(ERROR 미만) 이벤트를 log_level과 상관없이 보관
+            "flight_recorder_key": None,  # 지정하면(예: "request_id") 로거 대신 이 컨텍스트 값별로 보관
+            "buffer_size": 64 * 1024,  # 파일 쓰기 버퍼 (0이면 레코드마다 바로 쓴다)
+            "flush_interval": 1.0,  # 버퍼가 덜 찼어도 이 주기(초)마다 파일에 쓴다
+            "fsync_on_error": False,  # True면 ERROR 이상은 즉시 fsync
+            "rotate_interval": 0,  # 이 시간(초)이 지나면 크기와 상관없이 로테이션 (0이면 끔)
+            "compression": None,  # 로테이션된 파일 압축: "gzip", "zstd", "auto" (None이면 압축하지 않음)
+            "retention_bytes": 0,  # 로거별 로그 파일 전체 크기 상한 (0이면 제한 없음)
+            "retention_age": 0,  # 로테이션된 파일 보존 기간(초) (0이면 제한 없음)
+            "index": False,  # True면 로테이션된 파일마다 검색 인덱스(.idx)를 만든다 (python -m monitoring.logindex)
+            "index_keys": [],  # 인덱스에 추가할 필드, 예: ["request_id"] (level/logger/timestamp는 항상 포함)
+            "multiprocess": None,  # None, shard({name}.{pid}.log), central(중앙 writer로 전송)
+            "central_address": None,  # central 모드 writer의 Unix 소켓 경로 (기본값: {log_dir}/{name}.sock)
+            "loki_url": "http://localhost:3100/loki/api/v1/push",  # outputs에 loki가 있을 때 push 대상
+            "loki_labels": {},  # level/logger 외에 모든 스트림에 붙일 고정 레이블
+            "loki_batch_size": 1000,
+            "loki_batch_wait": 1.0,  # 배치가 덜 찼어도 이 주기(초)마다 전송
+            "loki_spill_max_bytes": 50 * 1024 * 1024,  # 전송 실패 배치를 {log_dir}/{name}.loki-spill에 보관할 최대 용량
+            "rate_limit": 0,  # 이벤트 키(logger, level, event)별 초당 허용 개수 (0이면 끔)
+            "rate_limit_burst": None,  # 토큰 버킷 크기 (기본값: rate_limit)
+            "sampling": {},  # 레벨별 기록 확률, 예: {"debug": 0.1} (ERROR 이상은 지정 불가)
+            "traceback_window": 0,  # 이 창(초) 안의 같은 traceback은 처음만 전체를 기록하고 이후는 exception_id만 (0이면 끔)
+            "derived_metrics": [],  # 이벤트에서 counter/histogram을 뽑아 집계하는 규칙 목록 (monitoring.derived 참고)
+            "derived_metrics_interval": 60,  # 이 주기(초)마다 구간 증가분을 "derived metric" 이벤트로 기록 (0이면 끔)
+            "collapse_window": 0,  # 이 창(초) 안의 같은 이벤트는 한 줄 + repeated=N으로 합친다 (0이면 끔)
+            "async": False,  # True면 bounded queue + 백그라운드 스레드에서 렌더링/쓰기
+            "queue_size": 10000,
+            "overflow": None,  # block, drop_newest, drop_oldest (기본값: block, asyncio 모드는 drop_newest)
+            "asyncio": False,  # True면 async 모드에 더해 ainfo() 등도 스레드 풀 없이 호출한 태스크에서 큐에 넣는다
+            "lazy": False,  # True면 첫 이벤트가 기록될 때 디렉토리/파일/렌더러를 만든다 (CLI, 짧은 작업용)
+            "metrics": False,  # True면 로깅 파이프라인 자체의 지표를 self.metrics에 기록
+            "metrics_port": None,  # 지정하면 이 포트의 /metrics에서 Prometheus 형식으로 제공
+            "metrics_host": "127.0.0.1",
         }
 
+    @property
+    def dropped_events(self) -> int:
+        """async 모드에서 큐가 가득 차 버려진 이벤트 수."""
+        if self._queue_handler is None:
+            return 0
+        return self._queue_handler.dropped
+
+    @property
+    def suppressed_events(self) -> dict[str, int]:
+        """sampling/rate_limit/collapse_window로 버려진 이벤트 수 (사유별)."""
+        if self._throttler is None:
+            return {"sampled": 0, "rate_limited": 0, "collapsed": 0}
+        return dict(self._throttler.suppressed)
+
+    @property
+    def _queued(self) -> bool:
+        return bool(self.config.get("async") or self.config.get("asyncio"))
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """큐에 쌓인 이벤트가 모두 기록되고 flush될 때까지 이벤트 루프를 막지 않고 기다린다.
+
+        종료 시 await logger.drain() 후 shutdown()을 호출한다. timeout초가 지나면 TimeoutError를 던진다.
+        """
+        import asyncio
+
+        if self._listener is not None:
+            await asyncio.wait_for(asyncio.to_thread(self._queue_handler.queue.join), timeout)
+            handlers = self._listener.handlers
+        else:
+            handlers = tuple(logging.getLogger().handlers)
+        await asyncio.to_thread(_flush_all, handlers)
+
+    def set_level(self, name: str, level: int | str | None) -> None:
+        """로거 name(과 하위 로거)의 레벨을 핸들러를 다시 만들지 않고 바꾼다. None이면 지정을 지운다."""
+        self.levels.set_level(name, level)
+
+    def reload_levels(self) -> dict[str, int]:
+        """log_levels, 레벨 파일, 환경 변수를 다시 읽어 적용한다."""
+        return self.levels.reload()
+
+    def shutdown(self):
+        """합쳐 둔 중복 이벤트의 요약을 기록하고, async 리스너를 멈춰 큐에 남은 이벤트를 모두 기록한다.
+
+        async 모드에서는 큐 핸들러를 떼고 리스너가 쓰던 핸들러를 root logger에 붙여, 그 뒤의 이벤트는 바로 기록한다.
+        """
+        atexit.unregister(self.shutdown)
+        if self.levels is not None:
+            self.levels.stop()
+        if self._throttler is not None:
+            self._throttler.stop()
+        if self._tracebacks is not None:
+            self._tracebacks.stop()
+            self._tracebacks = None
+        if self.derived is not None:
+            self.derived.stop()
+        if self._listener is not None:
+            self._listener.stop()
+            root_logger = logging.getLogger()
+            if self._queue_handler in root_logger.handlers:
+                # 멈춘 큐에 넣은 레코드는 기록되지 않고 block 정책이면 호출 스레드가 멈추므로,
+                # shutdown() 이후의 이벤트는 리스너가 쓰던 핸들러가 직접 기록한다
+                root_logger.removeHandler(self._queue_handler)
+                self._queue_handler.close()
+                for handler in self._listener.handlers:
+                    root_logger.addHandler(handler)
+                    _attached_handlers.add(handler)
+            self._listener = None
+        if self._metrics_server is not None:
+            self._metrics_server.shutdown()
+            self._metrics_server.server_close()
+            self._metrics_server = None
+
     def _get_renderer(self, output_type: str):
         """출력 유형과 format 설정에 따라 적절한 렌더러를 반환한다.
 
         console: ConsoleRenderer(colors=True) — format 설정과 무관하게 컬러 출력
-        file (format=json): JSONRenderer — PLG 스택 수집에 적합한 구조화 JSON
+        file (format=json): JSONRenderer — PLG 스택 수집에 적합한 구조화 JSON (serializer 설정으로 백엔드 선택)
         file (format=text): ConsoleRenderer(colors=False) — 사람이 읽기 쉬운 텍스트
+        file (format=binary): event_dict를 그대로 넘기고 파일 핸들러의 SegmentEncoder가 인코딩한다
+        loki: JSONRenderer — format 설정과 무관하게 LogQL | json으로 파싱할 수 있는 JSON
         """
         if output_type == "console":
             return structlog.dev.ConsoleRenderer(colors=True)
-        if self.config.get("format") == "json":
-            return structlog.processors.JSONRenderer(serializer=partial(json.dumps, ensure_ascii=False))
+        if output_type == "file" and self.config.get("format") == "binary":
+            from .binlog import keep_event_dict
+
+            return keep_event_dict
+        if output_type == "loki" or self.config.get("format") == "json":
+            from .serializers import get_serializer
+
+            return structlog.processors.JSONRenderer(serializer=get_serializer(self.config.get("serializer", "json")))
         return structlog.dev.ConsoleRenderer(colors=False)
 
     def setup_logging(self):
-        log_dir = Path(self.config.get("log_dir", "logs"))
-        log_dir.mkdir(parents=True, exist_ok=True)
+        self.shutdown()
+
+        mode = self.config.get("multiprocess")
+        if mode not in MULTIPROCESS_MODES:
+            raise ValueError(f"지원하지 않는 multiprocess 모드입니다: {mode!r} (허용: shard, central)")
+        if mode == "central" and self.config.get("format") == "binary":
+            # 중앙 writer는 워커가 렌더링한 줄을 그대로 이어 쓰므로 파일별 문자열 표를 유지할 수 없다
+            raise ValueError("binary 형식은 multiprocess='central'과 함께 쓸 수 없습니다 (shard를 쓰세요)")
+        if self.config.get("flight_recorder") and not (
+            self.config.get("error_tracking") and "file" in self.config.get("outputs", [])
+        ):
+            # 보관한 이벤트는 error 파일 핸들러가 ERROR를 쓸 때 함께 쓴다
+            raise ValueError("flight_recorder는 file 출력과 error_tracking=True가 필요합니다")
+        if self.config.get("index") and self.config.get("format", "json") != "json":
+            # 인덱스와 검색은 JSON lines 파일만 읽는다
+            raise ValueError("index는 format='json'에서만 쓸 수 있습니다")
 
         level = getattr(logging, self.config.get("log_level", "INFO").upper(), logging.INFO)
 
-        shared_processors = [
-            structlog.contextvars.merge_contextvars,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso", utc=False),
-            structlog.processors.StackInfoRenderer(),
-            structlog.dev.set_exc_info,
-            structlog.processors.dict_tracebacks,
-        ]
+        throttler = EventThrottler(
+            rate=self.config.get("rate_limit", 0),
+            burst=self.config.get("rate_limit_burst"),
+            sampling=self.config.get("sampling"),
+            collapse_window=self.config.get("collapse_window", 0),
+        )
+        self._throttler = throttler if throttler.enabled else None
+        if self._throttler is not None:
+            self._throttler.start()
+
+        # logger/level이 채워진 직후, 렌더링 비용이 드는 processor보다 먼저 걸러낸 뒤 Lazy 값을 계산한다.
+        # foreign_pre_chain(stdlib 로거)에는 넣지 않는다 — ProcessorFormatter는 DropEvent를 처리하지 못한다
+        early = [self._throttler, resolve_lazy_fields] if self._throttler is not None else [resolve_lazy_fields]
+
+        self.derived = None
+        if self.config.get("derived_metrics"):
+            from .derived import DerivedMetrics
+
+            # 샘플링/속도 제한보다 먼저 집계해 기록되지 않는 이벤트도 지표에는 반영한다
+            self.derived = DerivedMetrics(
+                self.config["derived_metrics"], interval=self.config.get("derived_metrics_interval", 60)
+            )
+            early.insert(0, self.derived)
+            self.derived.start()
+
+        if self.config.get("traceback_window", 0) > 0:
+            from .tracebacks import TracebackDeduplicator
+
+            # 반복되는 traceback은 dict_tracebacks가 수집/직렬화하기 전에 exc_info를 지운다 (stdlib 로거는 제외)
+            self._tracebacks = TracebackDeduplicator(self.config["traceback_window"])
+            self._tracebacks.start()
+
+        # 고정 구간(contextvars ~ dict_tracebacks)은 reference_chain과 같은 결과를 내는 processor 하나로 합친다
+        mark_context = bool(self.config.get("context_cache"))
+        processors = [FusedProcessor(early, exception_hook=self._tracebacks, mark_context=mark_context)]
+        foreign_pre_chain = [FusedProcessor(mark_context=mark_context)]
+
+        self.metrics = None
+        if self.config.get("metrics"):
+            from .metrics import LoggerMetrics
+
+            self.metrics = LoggerMetrics()
+            # 체인 전체 처리 시간을 재고, 통과한 이벤트를 로거/레벨별로 센다
+            processors = [self.metrics.start_timer, *processors, self.metrics.stop_timer]
+            self.metrics.register("dropped", lambda: self.dropped_events)
+            self.metrics.register("suppressed", lambda: self.suppressed_events)
+            if self._tracebacks is not None:
+                tracebacks = self._tracebacks
+                self.metrics.register("tracebacks_deduplicated", lambda: tracebacks.suppressed)
+            if self.derived is not None:
+                derived = self.derived
+                self.metrics.register("derived_downsampled", lambda: derived.downsampled)
+                self.metrics.add_text_source(derived.prometheus_text)
+
+        # 레벨은 stdlib logger 계층에서 확인하므로 캐시된 로거도 set_level/reload_levels를 바로 따른다
+        wrapper_class = AsyncioBoundLogger if self.config.get("asyncio") else LevelCheckedBoundLogger
+        self.recorder = None
+        if self.config.get("flight_recorder"):
+            from .recorder import FlightRecorder, make_recording_bound_logger
+
+            self.recorder = FlightRecorder(
+                self.config["flight_recorder"],
+                level=parse_level(self.config.get("flight_recorder_level", "DEBUG")),
+                key=self.config.get("flight_recorder_key"),
+            )
+            # 보관한 이벤트는 덤프할 때 샘플링/속도 제한 없이 processor 체인을 거친다
+            self.recorder.set_processors(reference_chain([resolve_lazy_fields]))
+            wrapper_class = make_recording_bound_logger(wrapper_class, self.recorder)
+            if self.metrics is not None:
+                recorder = self.recorder
+                self.metrics.register("flight_recorder_dumped", lambda: recorder.dumped)
 
         structlog.configure(
-            processors=[*shared_processors, structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
-            wrapper_class=structlog.make_filtering_bound_logger(level),
+            processors=[*processors, structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+            wrapper_class=wrapper_class,
             logger_factory=structlog.stdlib.LoggerFactory(),
             cache_logger_on_first_use=True,
         )
 
+        self.levels = LevelTable(
+            level,
+            overrides=self.config.get("log_levels"),
+            file=self.config.get("log_levels_file"),
+            env_var=self.config.get("log_levels_env"),
+        )
+        self.levels.reload()
+        if self.config.get("log_levels_poll_interval", 2.0) > 0:
+            self.levels.watch(self.config.get("log_levels_poll_interval", 2.0))
+        if self.config.get("log_levels_signal"):
+            self.levels.install_signal(self.config["log_levels_signal"])
+
+        root_logger = logging.getLogger()
+
+        # 기존에 있던 handlers 삭제 (이전에 붙인 파일 핸들러 등은 닫는다)
+        _release_root_handlers(root_logger)
+        self._queue_handler = None
+
+        if self.config.get("lazy"):
+            root_logger.addHandler(_DeferredHandler(lambda: self._attach_handlers(foreign_pre_chain)))
+        else:
+            self._attach_handlers(foreign_pre_chain)
+
+        if self.metrics is not None and self.config.get("metrics_port") is not None:
+            self._metrics_server = self.metrics.serve(
+                self.config["metrics_port"], self.config.get("metrics_host", "127.0.0.1")
+            )
+
+        if self._queued or self._throttler is not None or self._tracebacks is not None or self.derived is not None:
+            atexit.register(self.shutdown)
+
+    def _attach_handlers(self, foreign_pre_chain: list) -> None:
+        """log_dir을 만들고 출력 핸들러를 root logger에 붙인다 (lazy 모드에서는 첫 이벤트 때 호출)."""
+        log_dir = Path(self.config.get("log_dir", "logs"))
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+        handlers = self._build_handlers(log_dir, foreign_pre_chain)
         root_logger = logging.getLogger()
-        root_logger.setLevel(level)
 
-        # 기존에 있던 handlers 삭제
-        root_logger.handlers.clear()
+        if self._queued:
+            import queue
+
+            from .handlers import BackgroundQueueListener, OverflowQueueHandler
+
+            # 호출 스레드는 큐에 넣기만 하고, 렌더링과 디스크 쓰기는 리스너 스레드가 처리한다
+            log_queue: queue.Queue = queue.Queue(maxsize=self.config.get("queue_size", 10000))
+            # asyncio 모드에서 block 정책은 이벤트 루프를 멈추므로 따로 지정하지 않으면 새 이벤트를 버린다
+            overflow = self.config.get("overflow") or ("drop_newest" if self.config.get("asyncio") else "block")
+            self._queue_handler = OverflowQueueHandler(log_queue, overflow=overflow)
+            self._listener = BackgroundQueueListener(log_queue, *handlers, respect_handler_level=True)
+            self._listener.start()
+            self._queue_handler.listener = self._listener
+            root_logger.addHandler(self._queue_handler)
+            _attached_handlers.add(self._queue_handler)
+        else:
+            for handler in handlers:
+                root_logger.addHandler(handler)
+                _attached_handlers.add(handler)
+
+    def _build_handlers(self, log_dir: Path, foreign_pre_chain: list) -> list[logging.Handler]:
+        from .formatting import ContextFragmentRenderer, SharedProcessorFormatter, expand_context
+
+        handlers: list[logging.Handler] = []
+        formatters: dict[str, SharedProcessorFormatter] = {}
+
+        def get_formatter(output_type: str) -> SharedProcessorFormatter:
+            # 출력 형식별로 formatter를 하나만 만들어 같은 형식의 핸들러끼리 렌더링 결과를 공유한다
+            if output_type not in formatters:
+                processors = [structlog.stdlib.ProcessorFormatter.remove_processors_meta]
+                renderer = self._get_renderer(output_type)
+                if self.config.get("context_cache"):
+                    # 컨텍스트 조각은 JSON 렌더러만 재사용하고, 나머지 렌더러 앞에서는 bind_context() 필드를 합친다
+                    if isinstance(renderer, structlog.processors.JSONRenderer):
+                        renderer = ContextFragmentRenderer(renderer)
+                    else:
+                        processors.append(expand_context)
+                if self.metrics is not None:
+                    renderer = self.metrics.timed_renderer(output_type, renderer)
+                formatters[output_type] = SharedProcessorFormatter(
+                    processors=[*processors, renderer], foreign_pre_chain=foreign_pre_chain
+                )
+            return formatters[output_type]
 
         # Console handler
         if "console" in self.config.get("outputs", []):
             console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setFormatter(
-                structlog.stdlib.ProcessorFormatter(
-                    processors=[
-                        structlog.stdlib.ProcessorFormatter.remove_processors_meta,
-                        self._get_renderer("console"),
-                    ],
-                    foreign_pre_chain=shared_processors,
-                )
-            )
-            root_logger.addHandler(console_handler)
+            console_handler.setFormatter(get_formatter("console"))
+            handlers.append(console_handler)
 
         # File handler
         if "file" in self.config.get("outputs", []):
-            file_handler = RotatingFileHandler(
-                log_dir / f"{self.name}.log",
-                maxBytes=self.config.get("max_file_size", 10 * 1024 * 1024),
-                backupCount=self.config.get("backup_count", 10),
-                encoding="utf-8",
-            )
-            file_handler.setFormatter(
-                structlog.stdlib.ProcessorFormatter(
-                    processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, self._get_renderer("file")],
-                    foreign_pre_chain=shared_processors,
-                )
-            )
-            root_logger.addHandler(file_handler)
+            # binary 형식은 Alloy가 수집하는 *.log와 섞이지 않도록 .logb를 쓴다
+            suffix = ".logb" if self.config.get("format") == "binary" else ".log"
+            file_handler = self._file_handler(log_dir / f"{self.name}{suffix}")
+            file_handler.setFormatter(get_formatter("file"))
+            handlers.append(file_handler)
 
             # 에러 로그는 따로 관리
             if self.config.get("error_tracking"):
-                error_handler = RotatingFileHandler(
-                    log_dir / f"{self.name}.error.log",
-                    maxBytes=self.config.get("max_file_size", 10 * 1024 * 1024),
-                    backupCount=self.config.get("backup_count", 10),
-                    encoding="utf-8",
-                )
+                error_handler = self._file_handler(log_dir / f"{self.name}.error{suffix}")
                 error_handler.setLevel(logging.ERROR)
-                error_handler.setFormatter(
-                    structlog.stdlib.ProcessorFormatter(
-                        processors=[
-                            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
-                            self._get_renderer("file"),
-                        ],
-                        foreign_pre_chain=shared_processors,
-                    )
+                # file handler와 같은 formatter를 공유해 ERROR 이벤트를 한 번만 렌더링한다
+                error_handler.setFormatter(get_formatter("file"))
+                if self.recorder is not None:
+                    self.recorder.attach(error_handler)
+                handlers.append(error_handler)
+
+        # Loki handler
+        if "loki" in self.config.get("outputs", []):
+            from .loki import LokiHandler
+
+            loki_handler = LokiHandler(
+                url=self.config.get("loki_url", "http://localhost:3100/loki/api/v1/push"),
+                labels=self.config.get("loki_labels"),
+                batch_size=self.config.get("loki_batch_size", 1000),
+                batch_wait=self.config.get("loki_batch_wait", 1.0),
+                spill_dir=log_dir / f"{self.name}.loki-spill",
+                spill_max_bytes=self.config.get("loki_spill_max_bytes", 50 * 1024 * 1024),
+            )
+            if self.metrics is not None:
+                self.metrics.register(
+                    "loki",
+                    lambda: {
+                        "sent": loki_handler.sent,
+                        "dropped": loki_handler.dropped,
+                        "spilled": loki_handler.spilled,
+                    },
                 )
-                root_logger.addHandler(error_handler)
+            # format=json이면 file handler와 렌더링 결과를 공유한다
+            loki_handler.setFormatter(get_formatter("file" if self.config.get("format") == "json" else "loki"))
+            handlers.append(loki_handler)
+
+        return handlers
+
+    def _file_handler(self, path: Path) -> logging.Handler:
+        from .handlers import BufferedRotatingFileHandler
+
+        mode = self.config.get("multiprocess")
+        options = {
+            "maxBytes": self.config.get("max_file_size", 10 * 1024 * 1024),
+            "backupCount": self.config.get("backup_count", 10),
+            "encoding": "utf-8",
+            "buffer_size": self.config.get("buffer_size", 64 * 1024),
+            "flush_interval": self.config.get("flush_interval", 1.0),
+            "fsync_on_error": self.config.get("fsync_on_error", False),
+            "rotate_interval": self.config.get("rotate_interval", 0),
+            "compression": self.config.get("compression"),
+            "retention_bytes": self.config.get("retention_bytes", 0),
+            "retention_age": self.config.get("retention_age", 0),
+            "metrics": self.metrics,
+            "index_keys": list(self.config.get("index_keys") or ()) if self.config.get("index") else None,
+            # lazy 모드에서는 파일을 첫 쓰기 때 연다 ({name}.error.log는 ERROR가 없으면 만들지 않는다)
+            "delay": bool(self.config.get("lazy")),
+        }
+        if self.config.get("format") == "binary":
+            from .binlog import SegmentEncoder
+
+            options["encoder"] = SegmentEncoder()
+        if mode in ("shard", "central"):
+            from .multiprocess import CentralWriterHandler, ShardedRotatingFileHandler
+
+        if mode == "shard":
+            return ShardedRotatingFileHandler(path, **options)
+        if mode == "central":
+            address = self.config.get("central_address") or path.parent / f"{self.name}.sock"
+            return CentralWriterHandler(
+                path.name,
+                address,
+                # writer에 연결할 수 없을 때만 {name}.{pid}.log를 연다
+                fallback=ShardedRotatingFileHandler(path, **{**options, "delay": True}),
+                buffer_size=options["buffer_size"],
+                flush_interval=options["flush_interval"],
+            )
+        return BufferedRotatingFileHandler(path, **options)
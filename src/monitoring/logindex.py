@@ -0,0 +1,352 @@
+"""로테이션된 JSON 로그 세그먼트의 사이드카 인덱스와 로컬 검색.
+
+Loki 없이도 {name}.log.N 전체를 grep하지 않고 시간 범위와 필드로 이벤트를 찾는다.
+로테이션으로 닫힌 세그먼트마다 {segment}.idx(압축 확장자 제외)를 archiver 스레드가 만든다.
+
+인덱스는 세그먼트를 block_size 바이트 안팎의 줄 단위 블록으로 나누고 블록마다 다음을 기록한다.
+    - 압축을 푼 내용 기준 offset과 길이
+    - timestamp 최소/최대값
+    - level/logger 값별 블록 목록 (postings)
+    - index_keys로 지정한 필드(request_id 등) 값의 bloom filter
+파일은 두 줄의 JSON이다. 첫 줄은 세그먼트 확인용 헤더(크기, 앞부분 CRC), 둘째 줄이 본문이다.
+
+검색은 조건에 맞을 수 있는 블록만 읽는다. 압축하지 않은 세그먼트는 mmap으로 블록을 바로 잘라 읽고,
+압축된 세그먼트는 풀면서 블록 위치로 건너뛴다. 인덱스가 없거나 세그먼트와 맞지 않으면 전체를 읽는다.
+
+Usage:
+    python -m monitoring.logindex logs/app.log --since 2026-10-18T09:00 --level error request_id=req-42
+    python -m monitoring.logindex logs/app.log --build --key request_id
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from .archive import COMPRESSED_SUFFIXES, SegmentArchiver, index_path, open_segment
+from .levels import parse_level
+
+VERSION = 1
+BLOCK_SIZE = 64 * 1024
+
+# 세그먼트가 바뀌었는지 확인할 때 CRC를 계산하는 앞부분 크기
+_HEAD_BYTES = 4096
+# bloom filter: 값 하나당 10비트, 해시 7개 (오탐률 약 1%)
+_BLOOM_BITS_PER_VALUE = 10
+_BLOOM_HASHES = 7
+
+
+def _fingerprint(path: str) -> dict | None:
+    """압축하지 않은 세그먼트의 크기와 앞부분 CRC (압축된 세그먼트는 이름이 고유하므로 None)."""
+    if path.endswith(COMPRESSED_SUFFIXES):
+        return None
+    with open(path, "rb") as f:
+        return {"size": os.fstat(f.fileno()).st_size, "head": zlib.crc32(f.read(_HEAD_BYTES))}
+
+
+def _token(key: str, value: Any) -> str:
+    # CLI에서 받은 "42"와 이벤트의 42가 같게 비교되도록 문자열이 아닌 값은 JSON으로 바꾼다
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return f"{key}\0{text}"
+
+
+def _bloom_positions(token: str, bits: int) -> Iterator[int]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+    for i in range(_BLOOM_HASHES):
+        yield (h1 + i * h2) % bits
+
+
+def _bloom(tokens: set[str]) -> str:
+    bits = max(64, len(tokens) * _BLOOM_BITS_PER_VALUE + 7) // 8 * 8
+    array = bytearray(bits // 8)
+    for token in tokens:
+        for position in _bloom_positions(token, bits):
+            array[position >> 3] |= 1 << (position & 7)
+    return base64.b64encode(array).decode("ascii")
+
+
+def _bloom_contains(bloom: bytes, token: str) -> bool:
+    return all(bloom[p >> 3] & (1 << (p & 7)) for p in _bloom_positions(token, len(bloom) * 8))
+
+
+def build_index(segment: str, keys: Sequence[str] = (), block_size: int = BLOCK_SIZE) -> dict:
+    """세그먼트(압축 포함)를 읽어 인덱스를 만들고 {segment}.idx에 쓴 뒤 본문을 반환한다."""
+    header = {"version": VERSION, **(_fingerprint(segment) or {})}
+    blocks: list[list] = []
+    postings: dict[str, dict[str, list[int]]] = {"level": {}, "logger": {}}
+    blooms: list[str] = []
+
+    tokens: set[str] = set()
+    start = offset = 0
+    low = high = None
+
+    def close_block() -> None:
+        nonlocal low, high
+        blocks.append([start, offset - start, low, high])
+        if keys:
+            blooms.append(_bloom(tokens))
+        tokens.clear()
+        low = high = None
+
+    with open_segment(segment) as stream:
+        for line in stream:
+            event = _parse(line)
+            if event is not None:
+                timestamp = event.get("timestamp")
+                if isinstance(timestamp, str):
+                    low = timestamp if low is None or timestamp < low else low
+                    high = timestamp if high is None or timestamp > high else high
+                for field, values in postings.items():
+                    value = event.get(field)
+                    if isinstance(value, str):
+                        ids = values.setdefault(value, [])
+                        if not ids or ids[-1] != len(blocks):
+                            ids.append(len(blocks))
+                for key in keys:
+                    if key in event:
+                        tokens.add(_token(key, event[key]))
+            offset += len(line)
+            if offset - start >= block_size:
+                close_block()
+                start = offset
+        if offset > start:
+            close_block()
+
+    body = {"block_size": block_size, "keys": list(keys), "blocks": blocks, "postings": postings, "blooms": blooms}
+    target = index_path(segment)
+    tmp = target + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n" + json.dumps(body, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp, target)
+    return body
+
+
+def has_index(segment: str) -> bool:
+    """세그먼트에 내용이 맞는 인덱스가 있는지 헤더만 읽어 확인한다."""
+    return _read_header(segment) is not None
+
+
+def _read_header(segment: str) -> dict | None:
+    try:
+        with open(index_path(segment), encoding="utf-8") as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get("version") != VERSION:
+        return None
+    fingerprint = _fingerprint(segment)
+    if fingerprint is not None and any(header.get(k) != v for k, v in fingerprint.items()):
+        # stdlib 로테이션으로 이름이 밀렸거나 이어 쓴 세그먼트의 인덱스는 쓰지 않는다
+        return None
+    return header
+
+
+def load_index(segment: str) -> dict | None:
+    """세그먼트의 인덱스 본문. 없거나 세그먼트 내용과 맞지 않으면 None."""
+    if _read_header(segment) is None:
+        return None
+    try:
+        with open(index_path(segment), encoding="utf-8") as f:
+            f.readline()
+            return json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def _parse(line: bytes) -> dict | None:
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def _time_bound(value: datetime | str | None) -> str | None:
+    # timestamp는 TimeStamper(fmt="iso", utc=False)의 로컬 시각 문자열이므로 문자열로 비교한다
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value.isoformat()
+    return value
+
+
+def _level_number(name: Any) -> int:
+    number = logging.getLevelName(str(name).upper())
+    return number if isinstance(number, int) else 0
+
+
+class _Query:
+    def __init__(self, since, until, level, logger, fields: dict):
+        self.since = _time_bound(since)
+        self.until = _time_bound(until)
+        self.level = None if level is None else parse_level(level)
+        self.logger = logger
+        self.fields = {key: _token(key, value) for key, value in fields.items()}
+
+    def _logger_matches(self, name: Any) -> bool:
+        # 로거 레벨처럼 하위 로거도 포함한다 (app → app.db)
+        return isinstance(name, str) and (name == self.logger or name.startswith(self.logger + "."))
+
+    def matches(self, event: dict) -> bool:
+        timestamp = event.get("timestamp")
+        if self.since is not None or self.until is not None:
+            if not isinstance(timestamp, str):
+                return False
+            if self.since is not None and timestamp < self.since:
+                return False
+            if self.until is not None and timestamp >= self.until:
+                return False
+        if self.level is not None and _level_number(event.get("level")) < self.level:
+            return False
+        if self.logger is not None and not self._logger_matches(event.get("logger")):
+            return False
+        return all(key in event and _token(key, event[key]) == token for key, token in self.fields.items())
+
+    def blocks(self, index: dict) -> list[list]:
+        """조건에 맞는 이벤트가 있을 수 있는 블록을 파일 순서대로 반환한다."""
+        blocks = index["blocks"]
+        candidates = set(range(len(blocks)))
+        postings = index["postings"]
+        if self.level is not None:
+            candidates &= {
+                i for name, ids in postings["level"].items() if _level_number(name) >= self.level for i in ids
+            }
+        if self.logger is not None:
+            candidates &= {i for name, ids in postings["logger"].items() if self._logger_matches(name) for i in ids}
+        indexed = [token for key, token in self.fields.items() if key in index["keys"]]
+        if indexed:
+            blooms = [base64.b64decode(bloom) for bloom in index["blooms"]]
+            candidates = {i for i in candidates if all(_bloom_contains(blooms[i], token) for token in indexed)}
+        result = []
+        for i in sorted(candidates):
+            _, _, low, high = blocks[i]
+            if self.since is not None and (high is None or high < self.since):
+                continue
+            if self.until is not None and (low is None or low >= self.until):
+                continue
+            result.append(blocks[i])
+        return result
+
+
+def _scan(lines: Iterable[bytes], query: _Query) -> Iterator[dict]:
+    for line in lines:
+        event = _parse(line)
+        if event is not None and query.matches(event):
+            yield event
+
+
+def _read_blocks(segment: str, blocks: list[list]) -> Iterator[bytes]:
+    if segment.endswith(COMPRESSED_SUFFIXES):
+        with open_segment(segment) as stream:
+            for offset, length, _, _ in blocks:
+                # 압축 스트림의 seek은 앞으로 풀면서 건너뛰므로 블록은 offset 순서로 읽는다
+                stream.seek(offset)
+                yield from stream.read(length).splitlines()
+        return
+    with open(segment, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for offset, length, _, _ in blocks:
+            yield from data[offset : offset + length].splitlines()
+
+
+def _read_all(path: str) -> Iterator[bytes]:
+    if path.endswith(COMPRESSED_SUFFIXES):
+        with open_segment(path) as stream:
+            yield from stream
+        return
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # 쓰는 중인 파일의 마지막 줄이 잘려 있으면 _parse에서 걸러진다
+            yield from iter(data.readline, b"")
+
+
+def segments(log_file: str | os.PathLike) -> list[str]:
+    """활성 파일을 제외한 세그먼트 경로를 오래된 것부터 반환한다."""
+    return SegmentArchiver.segments(os.fspath(log_file))[::-1]
+
+
+def search(
+    log_file: str | os.PathLike,
+    /,
+    since: datetime | str | None = None,
+    until: datetime | str | None = None,
+    level: str | int | None = None,
+    logger: str | None = None,
+    include_active: bool = True,
+    **fields: Any,
+) -> Iterator[dict]:
+    """log_file({name}.log)과 로테이션된 세그먼트에서 조건에 맞는 이벤트를 오래된 것부터 하나씩 돌려준다.
+
+    since <= timestamp < until (datetime 또는 ISO 문자열 앞부분, 예: "2026-10-18T09")
+    level: 이 레벨 이상, logger: 이 로거와 하위 로거, fields: 값이 같은 필드 (예: request_id="req-42")
+    include_active=False면 아직 쓰는 중인 log_file은 읽지 않는다.
+    """
+    query = _Query(since, until, level, logger, fields)
+    log_file = os.fspath(log_file)
+    for segment in segments(log_file):
+        index = load_index(segment)
+        if index is None:
+            yield from _scan(_read_all(segment), query)
+        else:
+            yield from _scan(_read_blocks(segment, query.blocks(index)), query)
+    if include_active and os.path.exists(log_file):
+        yield from _scan(_read_all(log_file), query)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="로테이션된 JSON 로그 파일을 인덱스로 검색한다")
+    parser.add_argument("log_file", help="활성 로그 파일 ({name}.log). 로테이션된 세그먼트도 함께 검색한다")
+    parser.add_argument("filters", nargs="*", metavar="KEY=VALUE", help="값이 같은 필드 (예: request_id=req-42)")
+    parser.add_argument("--since", help="이 시각 이후 (ISO 형식, 예: 2026-10-18T09:00)")
+    parser.add_argument("--until", help="이 시각 이전")
+    parser.add_argument("--level", help="이 레벨 이상")
+    parser.add_argument("--logger", help="이 로거와 하위 로거")
+    parser.add_argument("--no-active", action="store_true", help="쓰는 중인 활성 파일은 검색하지 않는다")
+    parser.add_argument("--build", action="store_true", help="인덱스가 없는 세그먼트의 인덱스를 만들고 끝낸다")
+    parser.add_argument("--key", action="append", default=[], help="--build: bloom filter로 인덱싱할 필드")
+    args = parser.parse_args(argv)
+
+    if args.build:
+        for segment in segments(args.log_file):
+            if not has_index(segment):
+                build_index(segment, args.key)
+                print(index_path(segment))
+        return 0
+
+    fields = {}
+    for item in args.filters:
+        key, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"KEY=VALUE 형식이 아닙니다: {item!r}")
+        fields[key] = value
+    results = search(
+        args.log_file,
+        since=args.since,
+        until=args.until,
+        level=args.level,
+        logger=args.logger,
+        include_active=not args.no_active,
+        **fields,
+    )
+    try:
+        for event in results:
+            sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # head 등으로 파이프가 먼저 닫혀도 종료 시 flush에서 다시 오류가 나지 않도록 stdout을 /dev/null로 돌린다
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+import gzip
+import http.client
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import urllib.parse
+from collections import deque
+from pathlib import Path
+
+from .handlers import register_after_fork, unregister_after_fork
+
+# Alloy(config/alloy/config.alloy)가 JSON에서 뽑아 레이블로 쓰는 필드와 같다
+_LABEL_KEYS = ("level", "logger")
+
+# 재시도할 HTTP 상태 코드 (그 밖의 4xx는 다시 보내도 실패하므로 버린다)
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class LokiPushError(Exception):
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LokiHandler(logging.Handler):
+    """이벤트를 Loki /loki/api/v1/push로 직접 보내는 핸들러.
+
+    호출 스레드는 렌더링한 줄을 메모리 버퍼에 넣기만 하고, 백그라운드 스레드가
+    batch_size개가 모이거나 batch_wait초가 지나면 level/logger 레이블별 스트림으로 묶어 gzip으로 전송한다.
+    HTTP 연결은 재사용하며, 실패하면 지수 백오프로 재시도하고 그래도 실패한 배치는
+    spill_dir에 최대 spill_max_bytes까지 저장했다가 다음 전송이 성공할 때 다시 보낸다.
+    flush()와 close()는 호출한 스레드를 붙잡지 않도록 재시도 없이 한 번만 보내고, 실패하면 남은 배치까지 바로 spill한다.
+    """
+
+    def __init__(
+        self,
+        url: str = "http://localhost:3100/loki/api/v1/push",
+        labels: dict[str, str] | None = None,
+        batch_size: int = 1000,
+        batch_wait: float = 1.0,
+        max_buffer: int = 100_000,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        timeout: float = 5.0,
+        spill_dir: str | os.PathLike | None = None,
+        spill_max_bytes: int = 50 * 1024 * 1024,
+    ):
+        super().__init__()
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"Loki URL은 http 또는 https여야 합니다: {url!r}")
+        self.url = url
+        self._scheme = parsed.scheme
+        self._netloc = parsed.netloc
+        self._path = parsed.path or "/loki/api/v1/push"
+        self.labels = dict(labels or {})
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.spill_max_bytes = spill_max_bytes
+
+        self.sent = 0
+        self.dropped = 0
+        self.spilled = 0
+
+        self._buffer: deque[tuple[tuple[str, str], str, str]] = deque(maxlen=max_buffer)
+        self._conn: http.client.HTTPConnection | None = None
+        # 전송 스레드와 flush()/close()가 같은 HTTP 연결을 동시에 쓰지 않도록 한다
+        self._send_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._start_sender()
+
+    def _start_sender(self) -> None:
+        self._sender = threading.Thread(target=self._run, name="loki-push", daemon=True)
+        self._sender.start()
+        register_after_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        # 부모가 보낼 이벤트와 부모의 HTTP 연결은 버리고 자식용 전송 스레드를 새로 띄운다
+        self._buffer.clear()
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        if not self._stopping.is_set():
+            self._start_sender()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            event = record.msg if isinstance(record.msg, dict) else {}
+            stream = (str(event.get("level") or record.levelname.lower()), str(event.get("logger") or record.name))
+            if len(self._buffer) == self._buffer.maxlen:
+                # deque(maxlen)은 가장 오래된 항목을 밀어낸다
+                self.dropped += 1
+            self._buffer.append((stream, str(int(record.created * 1e9)), line))
+            if len(self._buffer) >= self.batch_size:
+                self._wakeup.set()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _take_batch(self) -> list[tuple[tuple[str, str], str, str]]:
+        # _send_lock을 잡은 쪽만 꺼내므로 핸들러 lock은 잡지 않는다. logging.shutdown()은 핸들러 lock을 잡은 채
+        # flush()를 부르므로, 여기서 핸들러 lock을 기다리면 _send_lock을 기다리는 flush()와 교착된다
+        batch = []
+        for _ in range(min(self.batch_size, len(self._buffer))):
+            try:
+                batch.append(self._buffer.popleft())
+            except IndexError:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.batch_wait)
+            self._wakeup.clear()
+            try:
+                self._drain()
+            except Exception:
+                # spill 쓰기 실패 등으로 전송 스레드가 죽지 않도록 stderr에 남기고 계속한다
+                traceback.print_exc(file=sys.stderr)
+
+    def _drain(self, retry: bool = True) -> None:
+        with self._send_lock:
+            self._send_pending(retry)
+
+    def _send_pending(self, retry: bool) -> None:
+        # _send_lock을 잡은 채 호출한다
+        failed = False
+        while self._buffer:
+            batch = self._take_batch()
+            if not batch:
+                return
+            body = self._encode(batch)
+            # retry=False(flush/close)에서 한 번 실패하면 배치마다 timeout초씩 기다리지 않도록 나머지는 보내지 않고 spill한다
+            result = "failed" if failed else self._push_with_retry(body, retry)
+            if result == "sent":
+                self.sent += len(batch)
+                self._replay_spilled()
+            elif result == "rejected":
+                self.dropped += len(batch)
+            else:
+                self._spill(body, len(batch))
+                failed = not retry
+
+    def _encode(self, batch: list[tuple[tuple[str, str], str, str]]) -> bytes:
+        streams: dict[tuple[str, str], list[list[str]]] = {}
+        for stream, ts, line in batch:
+            streams.setdefault(stream, []).append([ts, line])
+        payload = {
+            "streams": [
+                {"stream": {**self.labels, **dict(zip(_LABEL_KEYS, stream, strict=True))}, "values": values}
+                for stream, values in streams.items()
+            ]
+        }
+        return gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"), compresslevel=5)
+
+    def _push(self, body: bytes) -> None:
+        if self._conn is None:
+            conn_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            self._conn = conn_class(self._netloc, timeout=self.timeout)
+        try:
+            self._conn.request(
+                "POST", self._path, body=body, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+            )
+            response = self._conn.getresponse()
+            detail = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self._conn.close()
+            self._conn = None
+            raise LokiPushError(f"Loki 전송 실패: {e}", retryable=True) from e
+
+        if response.status >= 300:
+            raise LokiPushError(
+                f"Loki 응답 {response.status}: {detail[:200]!r}", retryable=response.status in _RETRYABLE_STATUS
+            )
+
+    def _push_with_retry(self, body: bytes, retry: bool = True) -> str:
+        """배치를 전송하고 결과를 sent, rejected(재시도해도 소용없는 4xx), failed 중 하나로 돌려준다.
+
+        retry=False면 한 번만 보낸다. 종료가 시작되면 백오프 대기를 멈추고 failed를 돌려준다.
+        """
+        delay = self.backoff
+        max_retries = self.max_retries if retry else 0
+        for attempt in range(max_retries + 1):
+            try:
+                self._push(body)
+                return "sent"
+            except LokiPushError as e:
+                if not e.retryable:
+                    return "rejected"
+                if attempt == max_retries or self._stopping.wait(delay):
+                    return "failed"
+                delay = min(delay * 2, self.max_backoff)
+        return "failed"
+
+    def _spill(self, body: bytes, count: int) -> None:
+        if self.spill_dir is None:
+            self.dropped += count
+            return
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spill_dir / f"{time.time_ns()}.json.gz"
+        path.write_bytes(body)
+        self.spilled += count
+
+        # 용량을 넘으면 가장 오래된 배치부터 지운다
+        files = sorted(self.spill_dir.glob("*.json.gz"))
+        total = sum(f.stat().st_size for f in files)
+        while files and total > self.spill_max_bytes:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink()
+
+    def _replay_spilled(self) -> None:
+        if self.spill_dir is None or not self.spill_dir.exists():
+            return
+        for path in sorted(self.spill_dir.glob("*.json.gz")):
+            try:
+                self._push(path.read_bytes())
+            except LokiPushError as e:
+                if e.retryable:
+                    return
+            path.unlink()
+
+    def flush(self) -> None:
+        """버퍼에 있는 이벤트를 현재 스레드에서 재시도 없이 한 번 전송하고, 실패하면 남은 배치까지 spill한다.
+
+        logging.shutdown()은 핸들러 lock을 잡은 채 flush()를 부르므로 오래 붙잡지 않는다.
+        전송 스레드가 보내는 중이면 timeout초까지만 기다리고, 남은 이벤트는 전송 스레드에 맡긴다.
+        """
+        if not self._send_lock.acquire(timeout=self.timeout):
+            return
+        try:
+            self._send_pending(retry=False)
+        finally:
+            self._send_lock.release()
+
+    def close(self) -> None:
+        # 종료 중에는 재시도 없이 한 번만 보내고, 실패한 배치는 spill_dir에 남겨 다음 실행에서 다시 보낸다
+        self._stopping.set()
+        self._wakeup.set()
+        unregister_after_fork(self)
+        if self._sender is not threading.current_thread():
+            self._sender.join(timeout=self.timeout + 1)
+        self._drain(retry=False)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        super().close()
@@ -0,0 +1,266 @@
+import bisect
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+# 지연 히스토그램 버킷 상한 (나노초). 1µs ~ 1s
+LATENCY_BUCKETS_NS = (
+    1_000,
+    2_500,
+    5_000,
+    10_000,
+    25_000,
+    50_000,
+    100_000,
+    250_000,
+    500_000,
+    1_000_000,
+    2_500_000,
+    5_000_000,
+    10_000_000,
+    25_000_000,
+    100_000_000,
+    1_000_000_000,
+)
+
+_START_KEY = "_metrics_start_ns"
+
+
+class Histogram:
+    """고정 버킷 히스토그램. 기본값은 나노초 정수로 받아 스냅샷을 초 단위(scale=1e9)로 돌려준다."""
+
+    __slots__ = ("bounds", "count", "counts", "scale", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_NS, scale: float = 1e9):
+        self.bounds = bounds
+        self.scale = scale
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> dict:
+        """{"count", "sum", "buckets": {상한: 누적 개수}} 형태로 반환한다 (sum과 상한은 scale로 나눈 값)."""
+        cumulative, buckets = 0, {}
+        for bound, n in zip((*self.bounds, None), self.counts, strict=True):
+            cumulative += n
+            buckets["+Inf" if bound is None else bound / self.scale] = cumulative
+        return {"count": self.count, "sum": self.total / self.scale, "buckets": buckets}
+
+
+class LoggerMetrics:
+    """로깅 파이프라인 자체의 카운터와 지연 히스토그램.
+
+    events: 로거/레벨별로 processor 체인을 통과한 이벤트 수
+    processor_seconds: structlog processor 체인 처리 시간
+    render_seconds: 출력 형식별 렌더러 처리 시간
+    write_seconds / bytes_written / rotations: 파일별 쓰기 지연, 기록 바이트 수, 로테이션 횟수
+    write_dropped: 쓰기가 계속 실패해 버린 파일별 레코드 수
+
+    register()로 등록한 값(버려진 이벤트 수 등)은 스냅샷을 만들 때 읽는다.
+    이벤트 수는 모두 세지만, 처리 시간은 오버헤드를 줄이기 위해 timing_sample_every개 중 하나만 잰다.
+    """
+
+    def __init__(self, timing_sample_every: int = 16):
+        self.timing_sample_every = max(1, timing_sample_every)
+        # itertools.count의 next()는 GIL 아래에서 원자적이므로 잠금 없이 표본을 고른다
+        self._ticks = itertools.count()
+        self._lock = threading.Lock()
+        self._sources: dict[str, Callable[[], Any]] = {}
+        self._text_sources: list[Callable[[], str]] = []
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.events: dict[tuple[str, str], int] = {}
+            self.processor_seconds = Histogram()
+            self.render_seconds: dict[str, Histogram] = {}
+            self.write_seconds: dict[str, Histogram] = {}
+            self.bytes_written: dict[str, int] = {}
+            self.rotations: dict[str, int] = {}
+            self.write_dropped: dict[str, int] = {}
+
+    def register(self, name: str, read: Callable[[], Any]) -> None:
+        """스냅샷에 name으로 포함할 값을 등록한다. read()는 int 또는 {label: int}를 반환한다."""
+        self._sources[name] = read
+
+    def add_text_source(self, read: Callable[[], str]) -> None:
+        """prometheus_text() 끝에 붙일 Prometheus text를 돌려주는 함수를 등록한다 (log-derived metrics 등)."""
+        self._text_sources.append(read)
+
+    # structlog processor: 체인의 맨 앞과 맨 뒤(wrap_for_formatter 직전)에 둔다
+
+    def _sampled(self) -> bool:
+        return next(self._ticks) % self.timing_sample_every == 0
+
+    def start_timer(self, _, __, event_dict: dict) -> dict:
+        if self._sampled():
+            event_dict[_START_KEY] = time.perf_counter_ns()
+        return event_dict
+
+    def stop_timer(self, _, method_name: str, event_dict: dict) -> dict:
+        start = event_dict.pop(_START_KEY, None)
+        key = (event_dict.get("logger"), event_dict.get("level", method_name))
+        with self._lock:
+            if start is not None:
+                self.processor_seconds.observe(time.perf_counter_ns() - start)
+            self.events[key] = self.events.get(key, 0) + 1
+        return event_dict
+
+    def timed_renderer(self, output: str, renderer: Callable) -> Callable:
+        """renderer 호출 시간을 render_seconds[output]에 기록하는 processor로 감싼다."""
+        with self._lock:
+            histogram = self.render_seconds.setdefault(output, Histogram())
+
+        def render(logger, method_name: str, event_dict: dict):
+            if not self._sampled():
+                return renderer(logger, method_name, event_dict)
+            start = time.perf_counter_ns()
+            rendered = renderer(logger, method_name, event_dict)
+            elapsed = time.perf_counter_ns() - start
+            with self._lock:
+                histogram.observe(elapsed)
+            return rendered
+
+        return render
+
+    def record_write(self, file: str, size: int, elapsed_ns: int) -> None:
+        with self._lock:
+            histogram = self.write_seconds.get(file)
+            if histogram is None:
+                histogram = self.write_seconds[file] = Histogram()
+            histogram.observe(elapsed_ns)
+            self.bytes_written[file] = self.bytes_written.get(file, 0) + size
+
+    def record_write_dropped(self, file: str, records: int) -> None:
+        with self._lock:
+            self.write_dropped[file] = self.write_dropped.get(file, 0) + records
+
+    def record_rotation(self, file: str) -> None:
+        with self._lock:
+            self.rotations[file] = self.rotations.get(file, 0) + 1
+
+    def snapshot(self) -> dict:
+        """현재 값을 dict로 반환한다. 반환값은 이후 기록의 영향을 받지 않는다."""
+        with self._lock:
+            events: dict[str, dict[str, int]] = {}
+            for (logger, level), count in self.events.items():
+                events.setdefault(str(logger), {})[str(level)] = count
+            snapshot = {
+                "events": events,
+                "processor_seconds": self.processor_seconds.snapshot(),
+                "render_seconds": {k: h.snapshot() for k, h in self.render_seconds.items()},
+                "write_seconds": {k: h.snapshot() for k, h in self.write_seconds.items()},
+                "bytes_written": dict(self.bytes_written),
+                "rotations": dict(self.rotations),
+                "write_dropped": dict(self.write_dropped),
+            }
+        for name, read in self._sources.items():
+            snapshot[name] = read()
+        return snapshot
+
+    def prometheus_text(self) -> str:
+        """스냅샷을 Prometheus text exposition 형식으로 변환한다."""
+        snapshot = self.snapshot()
+        lines: list[str] = []
+
+        def counter(name: str, help_text: str, samples: list[tuple[dict[str, str], int]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in samples)
+
+        def histogram(name: str, help_text: str, samples: list[tuple[dict[str, str], dict]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in samples:
+                for le, count in h["buckets"].items():
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': str(le)})} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {h['sum']}")
+                lines.append(f"{name}_count{_labels(labels)} {h['count']}")
+
+        counter(
+            "logging_events_total",
+            "Events that passed the processor chain.",
+            [
+                ({"logger": logger, "level": level}, count)
+                for logger, levels in snapshot["events"].items()
+                for level, count in levels.items()
+            ],
+        )
+        histogram(
+            "logging_processor_duration_seconds",
+            "Time spent in the structlog processor chain.",
+            [({}, snapshot["processor_seconds"])],
+        )
+        histogram(
+            "logging_render_duration_seconds",
+            "Time spent in the renderer.",
+            [({"output": k}, h) for k, h in snapshot["render_seconds"].items()],
+        )
+        histogram(
+            "logging_write_duration_seconds",
+            "Time spent writing buffered lines to a file.",
+            [({"file": k}, h) for k, h in snapshot["write_seconds"].items()],
+        )
+        counter(
+            "logging_written_bytes_total",
+            "Bytes written per file.",
+            [({"file": k}, v) for k, v in snapshot["bytes_written"].items()],
+        )
+        counter(
+            "logging_rotations_total", "File rotations.", [({"file": k}, v) for k, v in snapshot["rotations"].items()]
+        )
+        counter(
+            "logging_write_dropped_records_total",
+            "Records dropped after repeated write failures.",
+            [({"file": k}, v) for k, v in snapshot["write_dropped"].items()],
+        )
+        for name in self._sources:
+            value = snapshot[name]
+            samples = [({"type": k}, v) for k, v in value.items()] if isinstance(value, dict) else [({}, value)]
+            counter(f"logging_{name}_events_total", f"Events counted as {name}.", samples)
+
+        text = "\n".join(lines) + "\n"
+        return text + "".join(read() for read in self._text_sources)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """/metrics에서 prometheus_text()를 제공하는 HTTP 서버를 백그라운드 스레드로 띄운다."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                # 요청 로그가 root logger로 다시 들어가지 않도록 남기지 않는다
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="log-metrics", daemon=True).start()
+        return server
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
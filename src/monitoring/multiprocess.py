@@ -0,0 +1,378 @@
+"""pre-fork 멀티 워커 배포를 위한 파일 출력.
+
+shard: 워커마다 {name}.{pid}.log 파일에 따로 쓴다. 프로세스 간 잠금이 없고 Alloy의 *.log glob에도 그대로 잡힌다.
+central: 워커는 렌더링한 줄을 모아 로컬 Unix 소켓으로 중앙 writer 프로세스에 배치 전송하고,
+         writer 하나만 {name}.log를 쓰고 로테이션한다.
+
+Usage (central):
+    python -m monitoring.multiprocess --log-dir logs --address logs/app.sock
+"""
+
+import argparse
+import logging
+import os
+import re
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+
+from .archive import COMPRESSIONS, SegmentArchiver
+from .handlers import BufferedRotatingFileHandler, PeriodicFlushMixin, encode_line
+
+# 프레임: target 길이(2 bytes) + payload 길이(4 bytes) + target(파일 이름) + payload(개행으로 끝나는 줄들)
+_FRAME_HEADER = struct.Struct("!HI")
+
+
+_SHARD_SUFFIXES = (".error.logb", ".logb", ".error.log", ".log")
+
+
+def shard_path(path: str | os.PathLike, pid: int | None = None) -> str:
+    """{name}.log → {name}.{pid}.log, {name}.error.log → {name}.{pid}.error.log (.logb도 같다)."""
+    path = Path(path)
+    pid = pid or os.getpid()
+    for suffix in _SHARD_SUFFIXES:
+        if path.name.endswith(suffix):
+            return str(path.with_name(f"{path.name[: -len(suffix)]}.{pid}{suffix}"))
+    return f"{path}.{pid}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # Windows의 os.kill(pid, 0)은 존재 확인이 아니라 CTRL_C_EVENT를 보내므로 살아 있다고 본다
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def dead_shards(template: str | os.PathLike) -> list[str]:
+    """template({name}.log 등)의 shard 중 pid 프로세스가 더 이상 없는 활성 파일 경로."""
+    path = Path(template)
+    suffix = next((s for s in _SHARD_SUFFIXES if path.name.endswith(s)), "")
+    pattern = re.compile(rf"{re.escape(path.name[: len(path.name) - len(suffix)])}\.(\d+){re.escape(suffix)}")
+    shards = []
+    for entry in os.scandir(path.parent):
+        match = pattern.fullmatch(entry.name)
+        if match and int(match.group(1)) != os.getpid() and not _pid_alive(int(match.group(1))):
+            shards.append(entry.path)
+    return shards
+
+
+class ShardArchiver(SegmentArchiver):
+    """끝난 워커의 shard 파일도 보존 정책에 넣는 SegmentArchiver.
+
+    pre-fork 매니저가 워커를 재시작할 때마다 {name}.{pid}.log가 새로 생기므로, pid 프로세스가 없는 shard의
+    활성 파일과 세그먼트도 이 워커의 세그먼트와 함께 최신순으로 세어 retention_bytes/retention_age/backup_count를
+    넘는 것부터 지운다. 살아 있는 다른 워커의 파일은 그 워커가 관리한다.
+    """
+
+    def __init__(self, template: str, compression: str | None = None, **options):
+        super().__init__(compression, **options)
+        self.template = template
+
+    def retained_files(self, base_filename: str) -> list[str]:
+        paths = self.segments(base_filename)
+        for shard in dead_shards(self.template):
+            paths.extend([shard, *self.segments(shard)])
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+        return sorted(mtimes, key=mtimes.__getitem__, reverse=True)
+
+
+class ShardedRotatingFileHandler(BufferedRotatingFileHandler):
+    """프로세스마다 {name}.{pid}.log에 쓰는 BufferedRotatingFileHandler.
+
+    fork 전에 만들어진 핸들러는 자식 프로세스에서 자신의 pid 파일로 다시 연다.
+    보존 정책(retention_bytes/retention_age 등)은 끝난 워커가 남긴 shard 파일에도 적용한다 (ShardArchiver).
+    """
+
+    def __init__(self, filename, *args, **kwargs):
+        self.template = os.fspath(filename)
+        super().__init__(shard_path(self.template), *args, **kwargs)
+
+    def _make_archiver(self, compression: str | None, **options) -> ShardArchiver:
+        return ShardArchiver(os.path.abspath(self.template), compression, **options)
+
+    def _after_fork_in_child(self) -> None:
+        super()._after_fork_in_child()
+        # 부모와 같은 파일 핸들을 공유하지 않도록 닫고 자식 pid 파일로 바꾼다
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        self.baseFilename = os.path.abspath(shard_path(self.template))
+
+
+class CentralWriterHandler(PeriodicFlushMixin, logging.Handler):
+    """렌더링한 줄을 모아 중앙 writer에 배치로 전송하는 핸들러.
+
+    포맷은 각 워커에서 병렬로 수행하고 writer는 받은 바이트를 그대로 쓰기만 한다.
+    writer에 연결할 수 없으면 해당 배치를 fallback 파일({name}.{pid}.log)에 기록해 유실을 막는다.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        address: str | os.PathLike,
+        fallback: BufferedRotatingFileHandler | None = None,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        encoding: str = "utf-8",
+        timeout: float = 1.0,
+    ):
+        super().__init__()
+        self.target = target.encode("utf-8")
+        self.address = os.fspath(address)
+        self.fallback = fallback
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval if buffer_size > 0 else 0
+        self.encoding = encoding
+        self.timeout = timeout
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+        self._sock: socket.socket | None = None
+        self._start_flusher()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = encode_line(self.format(record), self.encoding)
+            self._buffer.append(data)
+            self._buffered += len(data)
+            if self._buffered >= self.buffer_size:
+                self._send()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _send(self) -> None:
+        if not self._buffer:
+            return
+        payload = b"".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+
+        try:
+            sock = self._connect()
+            sock.sendall(_FRAME_HEADER.pack(len(self.target), len(payload)) + self.target + payload)
+        except OSError:
+            self._disconnect()
+            if self.fallback is None:
+                raise
+            self.fallback.write_raw(payload)
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        return self._sock
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _discard_pending(self) -> None:
+        self._buffer.clear()
+        self._buffered = 0
+        # 부모의 연결을 공유하면 프레임이 섞이므로 자식은 새로 연결한다
+        self._disconnect()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._send()
+
+    def close(self) -> None:
+        self._stop_flusher_thread()
+        with self.lock:
+            try:
+                self._send()
+            finally:
+                self._disconnect()
+                if self.fallback is not None:
+                    self.fallback.close()
+                super().close()
+
+
+class _FrameRequestHandler(socketserver.StreamRequestHandler):
+    server: "_WriterServer"
+
+    def handle(self) -> None:
+        while True:
+            header = self.rfile.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            target_len, payload_len = _FRAME_HEADER.unpack(header)
+            target = self.rfile.read(target_len).decode("utf-8")
+            payload = self.rfile.read(payload_len)
+            if len(payload) < payload_len:
+                return
+            self.server.writer.write(target, payload)
+
+
+class _WriterServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    writer: "CentralLogWriter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection_threads: list[threading.Thread] = []
+
+    def process_request(self, request, client_address) -> None:
+        # 연결 스레드를 직접 추적해 stop() 때 받은 배치를 모두 쓸 때까지 기다린다
+        thread = threading.Thread(target=self.process_request_thread, args=(request, client_address), daemon=True)
+        self.connection_threads = [t for t in self.connection_threads if t.is_alive()]
+        self.connection_threads.append(thread)
+        thread.start()
+
+
+class CentralLogWriter:
+    """워커들이 보낸 배치를 받아 log_dir의 파일에 쓰는 중앙 writer.
+
+    파일마다 BufferedRotatingFileHandler 하나를 두므로 로테이션은 이 프로세스에서만 일어난다.
+    target은 log_dir 바로 아래의 *.log 파일 이름만 허용한다.
+    """
+
+    def __init__(
+        self,
+        log_dir: str | os.PathLike,
+        address: str | os.PathLike,
+        max_file_size: int = 10 * 1024 * 1024,
+        backup_count: int = 10,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        **archive_options,
+    ):
+        self.log_dir = Path(log_dir)
+        self.address = os.fspath(address)
+        self.max_file_size = max_file_size
+        self.backup_count = backup_count
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        # rotate_interval, compression, retention_bytes, retention_age, index_keys (BufferedRotatingFileHandler 참고)
+        self.archive_options = archive_options
+        self._handlers: dict[str, BufferedRotatingFileHandler] = {}
+        self._handlers_lock = threading.Lock()
+        self._server: _WriterServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def write(self, target: str, payload: bytes) -> None:
+        if Path(target).name != target or not target.endswith(".log"):
+            raise ValueError(f"허용되지 않는 로그 파일 이름입니다: {target!r}")
+
+        handler = self._handlers.get(target)
+        if handler is None:
+            with self._handlers_lock:
+                handler = self._handlers.get(target)
+                if handler is None:
+                    handler = self._handlers[target] = BufferedRotatingFileHandler(
+                        self.log_dir / target,
+                        maxBytes=self.max_file_size,
+                        backupCount=self.backup_count,
+                        buffer_size=self.buffer_size,
+                        flush_interval=self.flush_interval,
+                        **self.archive_options,
+                    )
+        handler.write_raw(payload)
+
+    def _bind(self) -> _WriterServer:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        # 이전 실행이 남긴 소켓 파일이 있으면 지우고 다시 바인드한다
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        server = _WriterServer(self.address, _FrameRequestHandler)
+        server.writer = self
+        self._server = server
+        return server
+
+    def start(self) -> None:
+        """현재 프로세스의 백그라운드 스레드에서 writer를 실행한다 (pre-fork 마스터에서 fork 전에 호출)."""
+        server = self._bind()
+        self._thread = threading.Thread(target=server.serve_forever, name="central-log-writer", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        self._bind().serve_forever()
+
+    def _accept_pending(self) -> None:
+        # serve_forever가 멈춘 뒤에도 backlog에 남은 연결(이미 보낸 배치)을 받아 처리한다
+        self._server.socket.setblocking(False)
+        while True:
+            try:
+                request, client_address = self._server.socket.accept()
+            except OSError:
+                return
+            request.setblocking(True)
+            self._server.process_request(request, client_address)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """새 연결을 그만 받고, 연결이 끊길 때까지(최대 timeout초) 남은 배치를 받아 쓴 뒤 파일을 닫는다."""
+        if self._server is not None:
+            if self._thread is not None:
+                self._server.shutdown()
+                self._thread.join()
+                self._thread = None
+            self._accept_pending()
+            self._server.server_close()
+            for thread in self._server.connection_threads:
+                thread.join(timeout)
+            self._server = None
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+        with self._handlers_lock:
+            handlers, self._handlers = list(self._handlers.values()), {}
+        for handler in handlers:
+            handler.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="워커들의 로그를 받아 파일에 쓰는 중앙 writer")
+    parser.add_argument("--log-dir", default="logs")
+    parser.add_argument("--address", required=True, help="Unix 소켓 경로")
+    parser.add_argument("--max-file-size", type=int, default=10 * 1024 * 1024)
+    parser.add_argument("--backup-count", type=int, default=10)
+    parser.add_argument("--rotate-interval", type=float, default=0, help="시간 기준 로테이션 주기(초)")
+    parser.add_argument("--compression", choices=COMPRESSIONS, help="로테이션된 파일 압축 방식")
+    parser.add_argument("--retention-bytes", type=int, default=0, help="파일별 전체 크기 상한")
+    parser.add_argument("--retention-age", type=float, default=0, help="로테이션된 파일 보존 기간(초)")
+    parser.add_argument("--index", action="store_true", help="로테이션된 파일마다 검색 인덱스를 만든다")
+    parser.add_argument(
+        "--index-key", action="append", default=[], help="검색 인덱스에 추가할 필드 (여러 번 지정 가능)"
+    )
+    args = parser.parse_args(argv)
+
+    writer = CentralLogWriter(
+        args.log_dir,
+        args.address,
+        max_file_size=args.max_file_size,
+        backup_count=args.backup_count,
+        rotate_interval=args.rotate_interval,
+        compression=args.compression,
+        retention_bytes=args.retention_bytes,
+        retention_age=args.retention_age,
+        index_keys=args.index_key if args.index else None,
+    )
+    try:
+        writer.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.stop()
+
+
+if __name__ == "__main__":
+    main()
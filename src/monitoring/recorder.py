@@ -0,0 +1,202 @@
+"""DEBUG 이벤트를 메모리에만 보관했다가 ERROR가 나면 {name}.error.log에 함께 남기는 flight recorder.
+
+평소에는 INFO로 운영하면서도 장애 직전의 DEBUG 맥락을 잃지 않기 위한 기능이다.
+바운드 로거가 level 이상 ERROR 미만 이벤트를 레벨 필터보다 먼저 가로채 렌더링하지 않은 튜플
+(시각, 레벨, event, args, kw, bind()한 컨텍스트, contextvars 스냅샷)로 고정 크기 링 버퍼에 넣는다.
+버퍼는 로거 이름별(key=None) 또는 컨텍스트 값별(key="request_id" 등)로 따로 둔다.
+
+ERROR 레코드가 error 핸들러에 들어오면 같은 키의 버퍼를 꺼내 그때 processor 체인과 렌더러를 거쳐
+ERROR 줄 바로 앞에 기록한다. 이 줄들에는 flight_recorder=true가 붙고 timestamp는 원래 호출 시각이다.
+stdlib 로거로 남긴 이벤트는 기록하지 않는다.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from datetime import datetime
+
+import structlog
+
+from .chain import CONTEXT_KEY, SUMMARY_KEY
+from .context import current_context
+
+_LEVEL_NAMES = {logging.DEBUG: "debug", logging.INFO: "info", logging.WARNING: "warning"}
+
+
+def _buffer_key(value):
+    # dict/list처럼 해시할 수 없는 값은 repr()로 바꿔 버퍼 키로 쓴다 (로깅 호출이 TypeError를 내지 않도록)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class FlightRecorder:
+    """로거 이름 또는 컨텍스트 값별로 최근 capacity개의 이벤트를 보관하는 링 버퍼 모음.
+
+    level: 이 레벨 이상 ERROR 미만 이벤트를 보관한다
+    key: None이면 로거 이름별, 문자열이면 그 이름의 bind()/contextvars/bind_context() 값별로 버퍼를 나눈다
+    max_keys: 버퍼 수 상한. 넘으면 가장 먼저 만든 버퍼부터 버린다 (요청 id처럼 값이 계속 늘어나는 키 대비)
+    """
+
+    def __init__(self, capacity: int, level: int = logging.DEBUG, key: str | None = None, max_keys: int = 1024):
+        if capacity <= 0:
+            raise ValueError(f"flight recorder capacity는 1 이상이어야 합니다: {capacity!r}")
+        self.capacity = capacity
+        self.level = level
+        self.key = key
+        self.max_keys = max_keys
+        self.dumped = 0
+        self._buffers: dict = {}
+        self._lock = threading.Lock()
+        self._processors: Sequence[Callable] = ()
+
+    def set_processors(self, processors: Sequence[Callable]) -> None:
+        """덤프할 때 이벤트에 적용할 processor 체인 (TimeStamper는 원래 시각으로 대신 채운다)."""
+        self._processors = tuple(processors)
+
+    def _key_of(self, bound, kw: dict):
+        if self.key is None:
+            return bound._logger.name
+        if self.key in kw:
+            return kw[self.key]
+        if self.key in bound._context:
+            return bound._context[self.key]
+        contextvars_ = structlog.contextvars.get_contextvars()
+        if self.key in contextvars_:
+            return contextvars_[self.key]
+        context = current_context()
+        return context.fields.get(self.key) if context is not None else None
+
+    def record(self, bound, levelno: int, event, args: tuple, kw: dict) -> None:
+        """바운드 로거 호출을 렌더링하지 않고 버퍼에 넣는다 (호출한 스레드/태스크에서 실행)."""
+        key = _buffer_key(self._key_of(bound, kw))
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._new_buffer(key)
+        # (시각, 레벨, event, args, kw, bind()한 컨텍스트, contextvars 스냅샷)
+        buffer.append((time.time(), levelno, event, args, kw, bound._context, contextvars.copy_context()))
+
+    def _new_buffer(self, key) -> deque:
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                if len(self._buffers) >= self.max_keys:
+                    del self._buffers[next(iter(self._buffers))]
+                buffer = self._buffers[key] = deque(maxlen=self.capacity)
+            return buffer
+
+    def take(self, event_dict: dict, until: float) -> list[tuple]:
+        """ERROR 이벤트와 같은 키의 버퍼에서 until(ERROR 레코드 생성 시각) 이전 항목을 꺼낸다."""
+        if self.key is None:
+            key = event_dict.get("logger")
+        elif self.key in event_dict:
+            key = event_dict[self.key]
+        else:
+            # context_cache=True면 bind_context() 필드는 BoundContext에만 있다
+            context = event_dict.get(CONTEXT_KEY)
+            key = context.fields.get(self.key) if context is not None else None
+        key = _buffer_key(key)
+        with self._lock:
+            buffer = self._buffers.pop(key, None)
+        if not buffer:
+            return []
+        entries = list(buffer)
+        taken = [entry for entry in entries if entry[0] <= until]
+        if len(taken) < len(entries):
+            # async 모드에서는 ERROR가 기록되기 전에 호출한 쪽이 그 뒤 이벤트를 더 넣었을 수 있다
+            self._new_buffer(key).extend(entries[len(taken) :])
+        return taken
+
+    def render(self, logger_name: str, entry: tuple) -> logging.LogRecord:
+        """버퍼 항목을 processor 체인에 통과시켜 ProcessorFormatter가 렌더링할 수 있는 LogRecord로 만든다."""
+        created, levelno, event, args, kw, context, ctx = entry
+        logger = logging.getLogger(logger_name)
+        method_name = _LEVEL_NAMES.get(levelno) or logging.getLevelName(levelno).lower()
+        event_dict = {**context, **kw, "event": event % args if args else event}
+        event_dict = ctx.run(self._process, logger, method_name, event_dict, created)
+        event_dict["flight_recorder"] = True
+
+        record = logging.LogRecord(logger.name, levelno, "", 0, event_dict, (), None)
+        record.created = created
+        record._logger = logger
+        record._name = method_name
+        return record
+
+    def _process(self, logger, method_name: str, event_dict: dict, created: float) -> dict:
+        for processor in self._processors:
+            if isinstance(processor, structlog.processors.TimeStamper):
+                event_dict["timestamp"] = datetime.fromtimestamp(created).isoformat()
+            else:
+                event_dict = processor(logger, method_name, event_dict)
+        return event_dict
+
+    def attach(self, handler: logging.Handler) -> None:
+        """handler(error 핸들러)가 ERROR 레코드를 쓰기 전에 같은 키의 버퍼를 먼저 쓰도록 filter를 붙인다."""
+        handler.addFilter(_DumpBeforeError(self, handler))
+
+
+class _DumpBeforeError(logging.Filter):
+    def __init__(self, recorder: FlightRecorder, handler: logging.Handler):
+        super().__init__()
+        self.recorder = recorder
+        self.handler = handler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # traceback 요약처럼 로거가 직접 남긴 요약 이벤트는 덤프하지 않는다
+        if record.levelno >= logging.ERROR and isinstance(record.msg, dict) and SUMMARY_KEY not in record.msg:
+            entries = self.recorder.take(record.msg, record.created)
+            if entries:
+                with self.handler.lock:
+                    for entry in entries:
+                        self.handler.emit(self.recorder.render(record.name, entry))
+                self.recorder.dumped += len(entries)
+        return True
+
+
+def make_recording_bound_logger(base: type, recorder: FlightRecorder) -> type:
+    """base의 level 이상 ERROR 미만 메서드가 레벨 필터보다 먼저 recorder에 이벤트를 넣도록 한 하위 클래스를 만든다."""
+    namespace = {}
+    record = recorder.record
+
+    def recording(name: str, levelno: int):
+        method = getattr(base, name)
+        amethod = getattr(base, f"a{name}")
+
+        def meth(self, event=None, *args, **kw):
+            record(self, levelno, event, args, kw)
+            return method(self, event, *args, **kw)
+
+        async def ameth(self, event=None, *args, **kw):
+            record(self, levelno, event, args, kw)
+            return await amethod(self, event, *args, **kw)
+
+        return meth, ameth
+
+    for name, levelno in (
+        ("debug", logging.DEBUG),
+        ("info", logging.INFO),
+        ("msg", logging.INFO),
+        ("warning", logging.WARNING),
+        ("warn", logging.WARNING),
+    ):
+        if levelno >= recorder.level:
+            namespace[name], namespace[f"a{name}"] = recording(name, levelno)
+
+    def log(self, level: int, event=None, *args, **kw):
+        if recorder.level <= level < logging.ERROR:
+            record(self, level, event, args, kw)
+        return base.log(self, level, event, *args, **kw)
+
+    async def alog(self, level: int, event=None, *args, **kw):
+        if recorder.level <= level < logging.ERROR:
+            record(self, level, event, args, kw)
+        return await base.alog(self, level, event, *args, **kw)
+
+    namespace["log"] = log
+    namespace["alog"] = alog
+    return type(f"Recording{base.__name__}", (base,), namespace)
@@ -0,0 +1,165 @@
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+
+import structlog
+
+from .chain import SUMMARY_KEY
+
+# 샘플링하지 않는 레벨 (ERROR 이상은 항상 기록한다)
+_NEVER_SAMPLED = frozenset({"error", "exception", "critical", "fatal"})
+
+
+class _KeyState:
+    __slots__ = ("suppressed", "tokens", "updated", "window_start")
+
+    def __init__(self, now: float, tokens: float):
+        self.tokens = tokens
+        self.updated = now
+        self.window_start: float | None = None
+        self.suppressed = 0
+
+
+class EventThrottler:
+    """같은 이벤트가 폭주할 때 기록량을 줄이는 structlog processor.
+
+    이벤트 키는 (logger, level, event)다. 순서대로 다음을 적용하고, 걸러진 이벤트는 DropEvent로 버린다.
+
+    sampling: 레벨별 기록 확률 (예: {"debug": 0.1}). ERROR 이상은 샘플링하지 않는다
+    rate/burst: 키마다 초당 rate개, 최대 burst개까지 허용하는 토큰 버킷
+    collapse_window: 한 창(초) 안에서는 같은 키의 첫 이벤트만 기록하고 나머지는 세기만 한다.
+                     창이 끝나기 전에 같은 이벤트가 다시 오면 repeated=N을 붙여 기록하고,
+                     그렇지 않으면 start()로 띄운 스레드가 창이 끝난 뒤 repeated=N 요약 이벤트를 기록한다
+
+    suppressed에 사유별로 버린 개수를 누적한다. 요약 이벤트(SUMMARY_KEY)는 거르지 않는다.
+    """
+
+    def __init__(
+        self,
+        rate: float = 0,
+        burst: float | None = None,
+        sampling: dict[str, float] | None = None,
+        collapse_window: float = 0,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        sampling = {level.lower(): ratio for level, ratio in (sampling or {}).items()}
+        never = _NEVER_SAMPLED.intersection(sampling)
+        if never:
+            raise ValueError(f"ERROR 이상 레벨은 샘플링할 수 없습니다: {', '.join(sorted(never))}")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.sampling = sampling
+        self.collapse_window = collapse_window
+        self.max_keys = max_keys
+        self.suppressed = {"sampled": 0, "rate_limited": 0, "collapsed": 0}
+        self._clock = clock
+        self._states: dict[tuple, _KeyState] = {}
+        # max_keys 때문에 지운 키의 보고하지 않은 중복 개수 (다음 drain()이 돌려준다)
+        self._evicted: list[tuple[str | None, str, str, int]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rate > 0 or self.sampling or self.collapse_window > 0)
+
+    def __call__(self, _, method_name: str, event_dict: dict) -> dict:
+        if SUMMARY_KEY in event_dict:
+            return event_dict
+        level = event_dict.get("level", method_name)
+
+        ratio = self.sampling.get(level)
+        if ratio is not None and random.random() >= ratio:  # nosec B311 - 보안 용도가 아닌 로그 샘플링
+            with self._lock:
+                self.suppressed["sampled"] += 1
+            raise structlog.DropEvent
+
+        if self.rate <= 0 and self.collapse_window <= 0:
+            return event_dict
+
+        key = (event_dict.get("logger"), level, event_dict.get("event"))
+        now = self._clock()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                if len(self._states) >= self.max_keys:
+                    # 키가 무한히 늘지 않도록 상한에 닿으면 상태를 초기화하고, 보고하지 않은 중복 개수는 요약으로 넘긴다
+                    self._evicted.extend((*k, st.suppressed) for k, st in self._states.items() if st.suppressed)
+                    self._states.clear()
+                state = self._states[key] = _KeyState(now, self.burst)
+
+            if self.rate > 0:
+                state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+                state.updated = now
+                if state.tokens < 1:
+                    self.suppressed["rate_limited"] += 1
+                    raise structlog.DropEvent
+                state.tokens -= 1
+
+            if self.collapse_window > 0:
+                if state.window_start is not None and now - state.window_start < self.collapse_window:
+                    state.suppressed += 1
+                    self.suppressed["collapsed"] += 1
+                    raise structlog.DropEvent
+                if state.suppressed:
+                    event_dict["repeated"] = state.suppressed
+                    state.suppressed = 0
+                state.window_start = now
+
+        return event_dict
+
+    def drain(self, expired_only: bool = False) -> list[tuple[str | None, str, str, int]]:
+        """아직 보고하지 않은 중복 개수를 (logger, level, event, repeated) 목록으로 돌려준다.
+
+        expired_only=False면 모든 상태를 초기화한다 (종료 시). True면 collapse_window가 끝난 키만 보고하고,
+        토큰도 다 찬 키는 새 상태와 같으므로 지운다 (요약 스레드).
+        """
+        now = self._clock()
+        with self._lock:
+            pending, self._evicted = self._evicted, []
+            if not expired_only:
+                pending.extend((*key, state.suppressed) for key, state in self._states.items() if state.suppressed)
+                self._states.clear()
+                return pending
+            for key, state in list(self._states.items()):
+                if state.window_start is None or now - state.window_start < self.collapse_window:
+                    continue
+                if state.suppressed:
+                    pending.append((*key, state.suppressed))
+                    state.suppressed = 0
+                if self.rate <= 0 or state.tokens + (now - state.updated) * self.rate >= self.burst:
+                    del self._states[key]
+        return pending
+
+    def emit_summaries(self, expired_only: bool = False) -> None:
+        """drain() 결과를 repeated=N 요약 이벤트로 기록한다."""
+        for logger_name, level, event, repeated in self.drain(expired_only):
+            levelno = logging.getLevelName(str(level).upper())
+            if not isinstance(levelno, int):
+                levelno = logging.INFO
+            structlog.get_logger(logger_name).log(levelno, event, repeated=repeated, **{SUMMARY_KEY: True})
+
+    def start(self) -> None:
+        """collapse_window가 끝난 키의 요약을 기록하는 데몬 스레드를 띄운다 (최대 1초 간격으로 확인)."""
+        if self._thread is not None or self.collapse_window <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="collapse-summary", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(min(self.collapse_window, 1.0)):
+            self.emit_summaries(expired_only=True)
+
+    def stop(self) -> None:
+        """요약 스레드를 멈추고 남은 요약을 모두 기록한다."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self.emit_summaries()
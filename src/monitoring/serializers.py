@@ -0,0 +1,65 @@
+import json
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+SERIALIZERS = ("json", "orjson", "msgspec", "auto")
+
+Serializer = Callable[..., str | bytes]
+
+
+def get_serializer(name: str = "json") -> Serializer:
+    """JSONRenderer에 넘길 json.dumps 호환 직렬화 함수를 반환한다.
+
+    json: 표준 라이브러리 json.dumps — str 반환
+    orjson: orjson.dumps — UTF-8 bytes 반환
+    msgspec: msgspec.json.Encoder — UTF-8 bytes 반환
+    auto: 설치된 백엔드 중 가장 빠른 것을 고른다 (orjson → msgspec → json)
+
+    모든 백엔드는 한글 등 비 ASCII 문자를 이스케이프하지 않는다.
+    """
+    if name not in SERIALIZERS:
+        raise ValueError(f"지원하지 않는 serializer입니다: {name!r} (허용: {', '.join(SERIALIZERS)})")
+
+    if name == "auto":
+        for candidate in ("orjson", "msgspec"):
+            try:
+                return _BACKENDS[candidate]()
+            except ImportError:
+                continue
+        return _json_serializer()
+
+    return _BACKENDS[name]()
+
+
+def _json_serializer() -> Serializer:
+    return partial(json.dumps, ensure_ascii=False)
+
+
+def _orjson_serializer() -> Serializer:
+    import orjson
+
+    # json.dumps와 마찬가지로 문자열이 아닌 키도 허용한다
+    return partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgspec_serializer() -> Serializer:
+    import msgspec
+
+    encoders: dict[Any, msgspec.json.Encoder] = {}
+
+    def dumps(obj: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+        # JSONRenderer는 매번 같은 default를 넘기므로 Encoder를 한 번만 만들어 재사용한다
+        encoder = encoders.get(default)
+        if encoder is None:
+            encoder = encoders[default] = msgspec.json.Encoder(enc_hook=default)
+        return encoder.encode(obj)
+
+    return dumps
+
+
+_BACKENDS: dict[str, Callable[[], Serializer]] = {
+    "json": _json_serializer,
+    "orjson": _orjson_serializer,
+    "msgspec": _msgspec_serializer,
+}
@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import sys
+import threading
+import time
+from collections.abc import Callable
+
+import structlog
+
+from .chain import SUMMARY_KEY
+
+
+def fingerprint(exc: BaseException) -> str:
+    """예외 타입과 프레임 순서(파일, 함수, 줄 번호)로 만든 12자리 id. 연결된 예외(__cause__/__context__)도 포함한다.
+
+    메시지는 포함하지 않으므로 같은 위치에서 값만 다른 예외는 같은 id가 된다.
+    """
+    parts = []
+    seen = set()
+    current: BaseException | None = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        parts.append(f"{type(current).__module__}.{type(current).__qualname__}")
+        tb = current.__traceback__
+        while tb is not None:
+            code = tb.tb_frame.f_code
+            parts.append(f"{code.co_filename}:{code.co_name}:{tb.tb_lineno}")
+            tb = tb.tb_next
+        current = current.__cause__ or (None if current.__suppress_context__ else current.__context__)
+    return hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def _exception(exc_info) -> BaseException | None:
+    # structlog의 exc_info 규칙과 같다: True면 처리 중인 예외, 튜플이면 (type, value, tb), 예외면 그대로
+    if isinstance(exc_info, BaseException):
+        return exc_info
+    if isinstance(exc_info, tuple):
+        return exc_info[1]
+    if exc_info:
+        return sys.exc_info()[1]
+    return None
+
+
+class _Fingerprint:
+    __slots__ = ("count", "logger", "message", "suppressed", "window_start")
+
+    def __init__(self, now: float, logger: str | None, message: str):
+        self.window_start = now
+        self.count = 1
+        self.suppressed = 0
+        self.logger = logger
+        self.message = message
+
+
+class TracebackDeduplicator:
+    """같은 traceback이 반복될 때 전체 traceback은 창(window초)마다 한 번만 렌더링하는 structlog processor.
+
+    dict_tracebacks 바로 앞에 둔다. 예외가 있는 이벤트에는 exception_id(fingerprint)를 붙이고,
+    창 안에서 두 번째부터는 exc_info를 지워 traceback 수집/직렬화를 건너뛴 뒤
+    exception_count(창 안에서 몇 번째인지)와 exception_message("ValueError: ...")만 남긴다.
+
+    start()는 window초마다 생략한 개수를 요약 이벤트(ERROR, repeated=N)로 기록하는 스레드를 띄운다.
+    요약 이벤트는 SUMMARY_KEY를 달아 속도 제한과 flight recorder 덤프를 건너뛴다.
+    suppressed에 전체 traceback을 생략한 개수를 누적한다.
+    """
+
+    def __init__(self, window: float, max_fingerprints: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self.suppressed = 0
+        self._clock = clock
+        self._states: dict[str, _Fingerprint] = {}
+        # max_fingerprints 때문에 지운 fingerprint의 보고하지 않은 생략 개수 (다음 drain()이 돌려준다)
+        self._evicted: list[tuple[str, str | None, str, int]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __call__(self, _, __, event_dict: dict) -> dict:
+        exc = _exception(event_dict.get("exc_info"))
+        if exc is None:
+            return event_dict
+
+        fp = event_dict["exception_id"] = fingerprint(exc)
+        now = self._clock()
+        with self._lock:
+            state = self._states.get(fp)
+            if state is None or now - state.window_start >= self.window:
+                if state is None and len(self._states) >= self.max_fingerprints:
+                    # fingerprint가 무한히 늘지 않도록 상한에 닿으면 상태를 초기화하고, 보고하지 않은 개수는 요약으로 넘긴다
+                    self._evicted.extend(
+                        (key, st.logger, st.message, st.suppressed) for key, st in self._states.items() if st.suppressed
+                    )
+                    self._states.clear()
+                if state is None:
+                    self._states[fp] = _Fingerprint(now, event_dict.get("logger"), f"{type(exc).__name__}: {exc}")
+                else:
+                    # 새 창의 첫 예외는 다시 전체를 렌더링한다 (앞 창에서 생략한 개수는 요약으로 보고한다)
+                    state.window_start, state.count = now, 1
+                return event_dict
+            state.count += 1
+            state.suppressed += 1
+            count = state.count
+        self.suppressed += 1
+
+        del event_dict["exc_info"]
+        event_dict["exception_count"] = count
+        event_dict["exception_message"] = f"{type(exc).__name__}: {exc}"
+        return event_dict
+
+    def drain(self) -> list[tuple[str, str | None, str, int]]:
+        """아직 보고하지 않은 생략 개수를 (exception_id, logger, exception_message, repeated) 목록으로 돌려준다."""
+        with self._lock:
+            pending, self._evicted = self._evicted, []
+            for fp, state in self._states.items():
+                if state.suppressed:
+                    pending.append((fp, state.logger, state.message, state.suppressed))
+                    state.suppressed = 0
+        return pending
+
+    def emit_summaries(self) -> None:
+        """drain() 결과를 fingerprint별 요약 이벤트로 기록한다 (ERROR 레벨이므로 {name}.error.log에도 남는다)."""
+        for fp, logger_name, message, repeated in self.drain():
+            structlog.get_logger(logger_name).log(
+                logging.ERROR,
+                "exception summary",
+                exception_id=fp,
+                exception_message=message,
+                repeated=repeated,
+                window=self.window,
+                **{SUMMARY_KEY: True},
+            )
+
+    def start(self) -> None:
+        """window초마다 요약을 기록하는 데몬 스레드를 띄운다."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="traceback-summary", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.window):
+            self.emit_summaries()
+
+    def stop(self) -> None:
+        """요약 스레드를 멈추고 남은 요약을 기록한다."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self.emit_summaries()
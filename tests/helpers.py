@@ -0,0 +1,34 @@
+"""핸들러 테스트에서 함께 쓰는 레코드와 formatter."""
+
+import json
+import logging
+
+
+class StaticFormatter(logging.Formatter):
+    """레코드와 관계없이 output을 그대로 돌려주는 formatter."""
+
+    def __init__(self, output: str | bytes):
+        super().__init__()
+        self.output = output
+
+    def format(self, record):
+        return self.output
+
+
+class EventFormatter(logging.Formatter):
+    """structlog 레코드(record.msg가 dict)의 event만 JSON으로 돌려주는 formatter."""
+
+    def format(self, record):
+        return json.dumps({"event": record.msg["event"]}, ensure_ascii=False)
+
+
+def make_record(msg: str = "ignored", level: int = logging.INFO) -> logging.LogRecord:
+    """app 로거 이름으로 만든 stdlib 레코드."""
+    return logging.LogRecord("app", level, __file__, 1, msg, None, None)
+
+
+def event_record(event: str, level: str = "info", logger: str = "svc") -> logging.LogRecord:
+    """structlog가 ProcessorFormatter로 넘기는 것처럼 msg가 event dict인 레코드."""
+    levelno = logging.getLevelName(level.upper())
+    msg = {"event": event, "level": level, "logger": logger}
+    return logging.LogRecord(logger, levelno, __file__, 1, msg, None, None)
@@ -0,0 +1,176 @@
+import gzip
+import os
+import time
+
+import pytest
+
+from monitoring.archive import SegmentArchiver, get_compressor, segment_name
+from monitoring.handlers import BufferedRotatingFileHandler
+
+
+def _touch(path, size: int, age: float = 0) -> None:
+    path.write_bytes(b"x" * size)
+    if age:
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.unit
+def test_unknown_compression_raises():
+    """지원하지 않는 compression 이름을 지정하면 ValueError가 발생한다."""
+    with pytest.raises(ValueError, match="compression"):
+        get_compressor("lz4")
+
+
+@pytest.mark.unit
+def test_auto_compression_prefers_zstd_when_available():
+    """auto는 zstd를 쓸 수 있으면 .zst, 아니면 .gz를 고른다."""
+    suffix, _ = get_compressor("auto")
+    try:
+        get_compressor("zstd")
+    except ImportError:
+        assert suffix == ".gz"
+    else:
+        assert suffix == ".zst"
+
+
+@pytest.mark.unit
+def test_segment_name_avoids_existing_segments(tmp_path):
+    """같은 초에 만든 세그먼트가 이미 있으면(압축된 것 포함) -N을 붙인다."""
+    base = str(tmp_path / "app.log")
+    first = segment_name(base)
+    (tmp_path / f"{os.path.basename(first)}.gz").write_bytes(b"")
+
+    second = segment_name(base)
+    assert second != first
+    assert second.startswith(first)
+
+
+@pytest.mark.unit
+def test_compress_keeps_content_and_mtime(tmp_path):
+    """압축한 세그먼트는 원본과 내용이 같고 원본의 수정 시각을 유지하며, 원본은 지워진다."""
+    segment = tmp_path / "app.log.20260101-000000"
+    segment.write_bytes(b'{"event": "a"}\n' * 100)
+    os.utime(segment, (1_700_000_000, 1_700_000_000))
+
+    target = SegmentArchiver("gzip").compress(str(segment))
+
+    assert target == f"{segment}.gz"
+    assert not segment.exists()
+    assert gzip.decompress((tmp_path / "app.log.20260101-000000.gz").read_bytes()) == b'{"event": "a"}\n' * 100
+    assert os.stat(target).st_mtime == 1_700_000_000
+
+
+@pytest.mark.unit
+def test_process_compresses_only_pending_segments(tmp_path):
+    """process()는 압축되지 않은 타임스탬프 세그먼트만 압축하고 활성 파일과 다른 파일은 건드리지 않는다."""
+    (tmp_path / "app.log").write_bytes(b"active\n")
+    (tmp_path / "app.log.20260101-000000").write_bytes(b"old\n")
+    (tmp_path / "app.log.20260101-000001-1").write_bytes(b"old\n")
+    (tmp_path / "app.log.20251231-000000.gz").write_bytes(gzip.compress(b"done\n"))
+    (tmp_path / "app.error.log.20260101-000000").write_bytes(b"error\n")
+
+    SegmentArchiver("gzip").process(str(tmp_path / "app.log"))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "app.error.log.20260101-000000",
+        "app.log",
+        "app.log.20251231-000000.gz",
+        "app.log.20260101-000000.gz",
+        "app.log.20260101-000001-1.gz",
+    ]
+
+
+@pytest.mark.unit
+def test_retention_bytes_removes_oldest_segments(tmp_path):
+    """활성 파일을 포함한 전체 크기가 retention_bytes를 넘으면 오래된 세그먼트부터 지운다."""
+    _touch(tmp_path / "app.log", 100)
+    _touch(tmp_path / "app.log.3.gz", 100, age=30)
+    _touch(tmp_path / "app.log.2.gz", 100, age=20)
+    _touch(tmp_path / "app.log.1.gz", 100, age=10)
+
+    removed = SegmentArchiver(retention_bytes=300).apply_retention(str(tmp_path / "app.log"))
+
+    assert [os.path.basename(p) for p in removed] == ["app.log.3.gz"]
+    assert (tmp_path / "app.log.1.gz").exists()
+
+
+@pytest.mark.unit
+def test_retention_age_and_count(tmp_path):
+    """retention_age보다 오래된 세그먼트와 backup_count를 넘는 세그먼트를 지운다."""
+    _touch(tmp_path / "app.log.a", 1, age=10)
+    _touch(tmp_path / "app.log.b", 1, age=20)
+    _touch(tmp_path / "app.log.c", 1, age=3600)
+    base = str(tmp_path / "app.log")
+
+    assert [os.path.basename(p) for p in SegmentArchiver(retention_age=60).apply_retention(base)] == ["app.log.c"]
+    assert [os.path.basename(p) for p in SegmentArchiver(backup_count=1).apply_retention(base)] == ["app.log.b"]
+
+
+@pytest.mark.unit
+def test_retention_ignores_temporary_files(tmp_path):
+    """압축 중인 .tmp 파일은 보존 정책 대상이 아니다."""
+    _touch(tmp_path / "app.log.1.gz.tmp", 1000)
+    assert SegmentArchiver(retention_bytes=1).apply_retention(str(tmp_path / "app.log")) == []
+
+
+@pytest.mark.unit
+def test_handler_compresses_rotated_segments_in_background(tmp_path):
+    """compression을 지정하면 로테이션된 세그먼트가 압축되고 활성 파일은 압축되지 않는다."""
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, maxBytes=100, backupCount=10, buffer_size=0, compression="gzip")
+    for i in range(10):
+        handler.write_raw(f'{{"event": "line {i}", "pad": "{"x" * 30}"}}\n'.encode())
+    handler.close()
+
+    segments = sorted(p for p in tmp_path.iterdir() if p.name != "app.log")
+    assert segments
+    assert all(p.name.endswith(".gz") for p in segments)
+    restored = b"".join(gzip.decompress(p.read_bytes()) for p in segments) + path.read_bytes()
+    assert sorted(restored.splitlines()) == sorted(
+        f'{{"event": "line {i}", "pad": "{"x" * 30}"}}'.encode() for i in range(10)
+    )
+
+
+@pytest.mark.unit
+def test_handler_keeps_backup_count_with_compression(tmp_path):
+    """압축 모드에서도 backupCount개의 최신 세그먼트만 남는다."""
+    handler = BufferedRotatingFileHandler(
+        tmp_path / "app.log", maxBytes=10, backupCount=2, buffer_size=0, compression="gzip"
+    )
+    for _ in range(6):
+        handler.write_raw(b"0123456789\n")
+        handler._archiver.join()
+    handler.close()
+
+    assert len([p for p in tmp_path.iterdir() if p.name.endswith(".gz")]) == 2
+
+
+@pytest.mark.unit
+def test_handler_rotates_by_time(tmp_path, mocker):
+    """rotate_interval이 지나면 크기가 작아도 로테이션한다."""
+    path = tmp_path / "app.log"
+    now = time.time()
+    clock = mocker.patch("monitoring.handlers.time.time", return_value=now)
+    handler = BufferedRotatingFileHandler(path, backupCount=3, buffer_size=0, rotate_interval=60)
+    handler.write_raw(b"first\n")
+    clock.return_value = now + 61
+    handler.write_raw(b"second\n")
+    handler.close()
+
+    assert (tmp_path / "app.log.1").read_bytes() == b"first\n"
+    assert path.read_bytes() == b"second\n"
+
+
+@pytest.mark.unit
+def test_retention_removes_index_with_segment(tmp_path):
+    """세그먼트를 지울 때 검색 인덱스도 지우고, 인덱스 파일은 세그먼트로 세지 않는다."""
+    _touch(tmp_path / "app.log.2.gz", 10, age=20)
+    _touch(tmp_path / "app.log.2.idx", 10_000, age=20)
+    _touch(tmp_path / "app.log.1", 10, age=10)
+    _touch(tmp_path / "app.log.1.idx", 10_000, age=10)
+    base = str(tmp_path / "app.log")
+
+    assert [os.path.basename(p) for p in SegmentArchiver.segments(base)] == ["app.log.1", "app.log.2.gz"]
+    assert [os.path.basename(p) for p in SegmentArchiver(backup_count=1).apply_retention(base)] == ["app.log.2.gz"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app.log.1", "app.log.1.idx"]
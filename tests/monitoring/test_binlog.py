@@ -0,0 +1,183 @@
+import enum
+import gzip
+import io
+import json
+import math
+
+import pytest
+import structlog
+
+from monitoring.binlog import SegmentEncoder, SegmentReader, main, read_segment, to_json_lines
+from monitoring.serializers import get_serializer
+
+JSON = structlog.processors.JSONRenderer(serializer=get_serializer("json"))
+
+
+class Color(enum.IntEnum):
+    RED = 1
+
+
+class Tag(str):
+    pass
+
+
+class Custom:
+    def __repr__(self) -> str:
+        return "<Custom>"
+
+
+class WithStructlog:
+    def __structlog__(self):
+        return {"id": 7}
+
+
+EVENTS = [
+    {"event": "서버 시작", "logger": "app", "level": "info", "timestamp": "2026-10-18T09:00:00.123456", "port": 8080},
+    {"event": "서버 시작", "logger": "app", "level": "info", "timestamp": "2026-10-18T09:00:01", "port": 8081},
+    {
+        "event": "mixed",
+        "logger": "app.db",
+        "level": "warning",
+        "timestamp": "2026-10-18T08:59:59.000001",
+        "ints": [0, 127, 128, -1, -32, -33, 2**40, -(2**63), 2**63 - 1, 2**70, -(2**70)],
+        "floats": [0.1, -2.5, 1e300, math.inf, -math.inf],
+        "flags": [True, False, None],
+        "nested": {"a": {"b": [1, "두", {"c": None}]}, 1: "int key", 2.5: "float key", False: "f", None: "n"},
+        "tuple": (1, 2),
+        "long": "x" * 40 + "가" * 100,
+        "longer": "y" * 70000,
+        "many": list(range(20)),
+        "wide": {f"k{i}": i for i in range(20)},
+        "enum": Color.RED,
+        "tag": Tag("sub"),
+        "custom": Custom(),
+        "structlog": WithStructlog(),
+        "empty": "",
+    },
+    # timestamp처럼 보이지만 isoformat()으로 되돌릴 수 없는 값은 문자열로 저장한다
+    {"event": "odd", "timestamp": "2026-10-18T09:00:00.000000"},
+    {"event": "odd", "timestamp": "2026-10-18T09:00:00.12345Z"},
+    {"event": "odd", "timestamp": "2026-10-18 09:00:00"},
+    {"event": "odd", "timestamp": "2026-10-18T09:00:0x"},
+    {"event": "odd", "timestamp": 1234},
+    {"event": 3, "level": None},
+]
+
+
+def _decode(data: bytes) -> list[dict]:
+    return list(SegmentReader(io.BytesIO(data)))
+
+
+@pytest.mark.unit
+def test_round_trip_matches_json_renderer():
+    """디코딩한 이벤트를 json.dumps하면 JSONRenderer가 원본으로 만든 줄과 같다."""
+    encoder = SegmentEncoder()
+    data = b"".join(encoder.encode(event) for event in EVENTS)
+
+    decoded = _decode(data)
+    assert [json.dumps(e, ensure_ascii=False) for e in decoded] == [JSON(None, None, e) for e in EVENTS]
+
+
+@pytest.mark.unit
+def test_repeated_keys_and_fields_are_interned():
+    """같은 키 목록과 logger/level/event 값은 두 번째 이벤트부터 id로만 기록한다."""
+    encoder = SegmentEncoder()
+    event = {"event": "request handled", "logger": "app.http", "level": "info", "path": "/items", "status": 200}
+    first = encoder.encode(event)
+    second = encoder.encode(event)
+
+    assert first.count(b"request handled") == 1
+    assert b"request handled" not in second and b"status" not in second
+    assert len(second) < len(JSON(None, None, event)) / 3
+
+
+@pytest.mark.unit
+def test_timestamps_are_delta_encoded():
+    """가까운 timestamp는 직전 값과의 차이만 기록해 몇 바이트만 차지한다."""
+    encoder = SegmentEncoder()
+    encoder.encode({"timestamp": "2026-10-18T09:00:00.000001"})
+    frame = encoder.encode({"timestamp": "2026-10-18T09:00:00.000501"})
+    assert len(frame) <= 6
+
+
+@pytest.mark.unit
+def test_reset_starts_new_table_with_header():
+    """reset() 후에는 헤더를 다시 쓰고 문자열을 다시 정의하므로 이어 붙인 스트림도 읽힌다."""
+    encoder = SegmentEncoder()
+    event = {"event": "tick", "logger": "app"}
+    data = encoder.encode(event) + encoder.encode(event)
+    encoder.reset()
+    data += encoder.encode(event)
+
+    reader = SegmentReader(io.BytesIO(data))
+    assert list(reader) == [event] * 3
+    assert isinstance(reader.utc_offset, int)
+
+
+@pytest.mark.unit
+def test_failed_encode_resets_table():
+    """인코딩이 실패하면 표를 비우고 다음 프레임에 헤더를 다시 써서 스트림이 어긋나지 않는다."""
+    encoder = SegmentEncoder()
+    data = encoder.encode({"event": "ok", "logger": "app"})
+    with pytest.raises(TypeError):
+        encoder.encode({"event": "bad", "logger": "new", "nested": {(1, 2): "tuple key"}})
+    data += encoder.encode({"event": "ok", "logger": "new"})
+
+    assert _decode(data) == [{"event": "ok", "logger": "app"}, {"event": "ok", "logger": "new"}]
+
+
+@pytest.mark.unit
+def test_table_limits_fall_back_to_inline_values():
+    """문자열/키 목록 표가 가득 차도 값을 그대로 써서 읽을 수 있다."""
+    encoder = SegmentEncoder(max_strings=2, max_shapes=1)
+    events = [{"event": f"e{i}", "logger": "app", f"key{i}": i} for i in range(5)]
+    events.append({1: "non-str top-level key"})
+    data = b"".join(encoder.encode(e) for e in events)
+    assert [json.dumps(e) for e in _decode(data)] == [json.dumps(e) for e in events]
+
+
+@pytest.mark.unit
+def test_truncated_last_frame_is_ignored():
+    """마지막 프레임이 잘려 있으면 그 앞까지만 읽는다."""
+    encoder = SegmentEncoder()
+    data = encoder.encode({"event": "a"}) + encoder.encode({"event": "b", "payload": "x" * 200})
+    assert _decode(data[:-10]) == [{"event": "a"}]
+    assert _decode(data[:-201]) == [{"event": "a"}]
+
+
+@pytest.mark.unit
+def test_invalid_stream_raises():
+    """헤더나 프레임 종류가 올바르지 않으면 ValueError를 던진다."""
+    with pytest.raises(ValueError):
+        _decode(b"\x05\x01XYZ\x01\x00")
+    with pytest.raises(ValueError):
+        _decode(b"\x05\x01SLB\x09\x00")
+    with pytest.raises(ValueError):
+        _decode(b"\x01\x07")
+    with pytest.raises(ValueError):
+        _decode(b"\x03\x02\x00\xc7")
+
+
+@pytest.mark.unit
+def test_cli_converts_plain_and_gzip_segments(tmp_path, capsys):
+    """CLI는 일반/압축 세그먼트를 순서대로 JSON lines로 변환한다."""
+    encoder = SegmentEncoder()
+    (tmp_path / "app.logb.1").write_bytes(encoder.encode({"event": "old"}))
+    with gzip.open(tmp_path / "app.logb.1.gz", "wb") as f:
+        f.write(SegmentEncoder().encode({"event": "older", "n": 1}))
+    encoder.reset()
+    (tmp_path / "app.logb").write_bytes(encoder.encode({"event": "new"}))
+
+    paths = [str(tmp_path / name) for name in ("app.logb.1.gz", "app.logb.1", "app.logb")]
+    assert main(paths) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        '{"event": "older", "n": 1}',
+        '{"event": "old"}',
+        '{"event": "new"}',
+    ]
+
+    out = tmp_path / "out.jsonl"
+    assert main([*paths, "-o", str(out)]) == 0
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 3
+    assert list(read_segment(paths[0])) == [{"event": "older", "n": 1}]
+    assert to_json_lines([], io.StringIO()) == 0
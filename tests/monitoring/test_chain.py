@@ -0,0 +1,124 @@
+import datetime
+import logging
+import sys
+import types
+
+import pytest
+import structlog
+
+from monitoring.chain import FusedProcessor, reference_chain
+from monitoring.context import bind_context, clear_context
+from monitoring.lazy import Lazy, resolve_lazy_fields
+from monitoring.tracebacks import TracebackDeduplicator
+
+# µs가 0인 시각, ns 단위 끝자리가 버려지는 시각, 초가 바뀌기 직전 시각
+NOW_NS = [1_792_300_000_000_000_000, 1_792_300_000_000_000_999, 1_792_300_001_234_567_891, 1_792_300_001_999_999_999]
+
+LOGGER = logging.getLogger("app.chain")
+RENDER = structlog.processors.JSONRenderer()
+
+
+class FrozenDatetime(datetime.datetime):
+    ns = NOW_NS[0]
+
+    @classmethod
+    def now(cls, tz=None):
+        base = datetime.datetime.fromtimestamp(cls.ns // 10**9, tz)
+        return base + datetime.timedelta(microseconds=cls.ns // 1000 % 10**6)
+
+
+def _run(processors, method_name: str, event_dict: dict) -> str:
+    for processor in processors:
+        event_dict = processor(LOGGER, method_name, event_dict)
+    return RENDER(LOGGER, method_name, event_dict)
+
+
+def _render_both(fused: list, reference: list, method_name: str, make_event) -> list[str]:
+    # exc_info=True / exception()은 처리 중인 예외를 기록하고 dict_tracebacks는 이 프레임의 지역 변수도 남기므로,
+    # 두 체인을 지역 변수가 바뀌지 않는 같은 프레임 안에서 실행한다
+    try:
+        {}["in flight"]
+    except KeyError:
+        return list(map(_run, (fused, reference), (method_name, method_name), (make_event(), make_event())))
+    raise AssertionError("예외가 발생하지 않았다")
+
+
+def _failed() -> tuple:
+    try:
+        {}["missing"]
+    except KeyError:
+        return sys.exc_info()
+    raise AssertionError("예외가 발생하지 않았다")
+
+
+def _foreign_record() -> logging.LogRecord:
+    return logging.makeLogRecord({"name": "stdlib.x", "created": FrozenDatetime.ns // 1000 / 1e6})
+
+
+CASES = [
+    ("info", lambda: {"event": "plain"}),
+    ("warn", lambda: {"event": "count=%d", "positional_args": (3,)}),
+    ("debug", lambda: {"event": "%(user)s in", "positional_args": ({"user": "kim"},)}),
+    ("info", lambda: {"event": "empty args", "positional_args": ()}),
+    ("info", lambda: {"event": "none args", "positional_args": None}),
+    ("info", lambda: {"timestamp": "old", "logger": "old", "event": "keys keep their position"}),
+    ("info", lambda: {"event": "stack", "stack_info": True}),
+    ("info", lambda: {"event": "no stack", "stack_info": False}),
+    ("error", lambda: {"event": "tuple", "exc_info": _failed()}),
+    ("error", lambda: {"event": "instance", "exc_info": _failed()[1]}),
+    ("error", lambda: {"event": "no exception", "exc_info": None}),
+    ("exception", lambda: {"event": "exception without exc_info"}),
+    ("exception", lambda: {"event": "exception with exc_info", "exc_info": False}),
+    ("critical", lambda: {"event": "lazy", "value": Lazy(lambda: 42)}),
+    # stdlib 레코드는 레코드를 만든 시각을 timestamp로 쓴다
+    ("info", lambda: {"event": "foreign", "_record": _foreign_record()}),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(("method_name", "make_event"), CASES)
+def test_fused_processor_matches_reference_chain(monkeypatch, method_name, make_event):
+    """같은 시각, 같은 contextvars/bind_context()에서 FusedProcessor와 기준 체인은 바이트 단위로 같은 JSON을 만든다."""
+    monkeypatch.setattr(structlog.processors, "datetime", types.SimpleNamespace(datetime=FrozenDatetime))
+    structlog.contextvars.bind_contextvars(request_id="req-1", event="from context", unbound=1)
+    structlog.contextvars.unbind_contextvars("unbound")
+    bind_context(service="checkout", request_id="from bound context", value="bound")
+    try:
+        for ns in NOW_NS:
+            monkeypatch.setattr(FrozenDatetime, "ns", ns)
+            fused = FusedProcessor([resolve_lazy_fields], clock=lambda ns=ns: ns)
+            actual, expected = _render_both([fused], reference_chain([resolve_lazy_fields]), method_name, make_event)
+            assert actual == expected
+    finally:
+        structlog.contextvars.clear_contextvars()
+        clear_context()
+
+
+@pytest.mark.unit
+def test_exception_hook_runs_between_set_exc_info_and_tracebacks():
+    """exception_hook은 예외가 있는 이벤트에만 dict_tracebacks 앞에서 실행된다 (기준 체인의 삽입 위치와 같다)."""
+    reference = reference_chain()
+    reference.insert(-1, TracebackDeduplicator(60, clock=lambda: 0.0))
+    fused = FusedProcessor(exception_hook=TracebackDeduplicator(60, clock=lambda: 0.0))
+
+    def strip(line: str) -> str:
+        # 두 체인의 호출 시각은 다르므로 timestamp는 비교하지 않는다
+        return line.split('"timestamp": ')[0]
+
+    for _ in range(3):
+        exc_info = _failed()
+        assert strip(_run([fused], "error", {"event": "x", "exc_info": exc_info})) == strip(
+            _run(reference, "error", {"event": "x", "exc_info": exc_info})
+        )
+    assert fused.exception_hook.suppressed == reference[-2].suppressed == 2
+
+
+@pytest.mark.unit
+def test_timestamp_follows_real_clock():
+    """실제 시계로 만든 timestamp는 앞뒤로 잰 datetime.now() 사이에 있다."""
+    fused = FusedProcessor()
+    for _ in range(1000):
+        before = datetime.datetime.now()
+        stamp = fused.timestamp()
+        after = datetime.datetime.now()
+        assert before <= datetime.datetime.fromisoformat(stamp) <= after
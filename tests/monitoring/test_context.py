@@ -0,0 +1,122 @@
+import json
+import logging
+
+import pytest
+import structlog
+
+from monitoring.chain import CONTEXT_KEY, FusedProcessor
+from monitoring.context import (
+    bind_context,
+    bound_context,
+    clear_context,
+    current_context,
+    get_context,
+    reset_context,
+    unbind_context,
+)
+from monitoring.derived import DerivedMetrics
+from monitoring.formatting import ContextFragmentRenderer, expand_context
+from monitoring.lazy import Lazy
+from monitoring.serializers import get_serializer
+
+LOGGER = logging.getLogger("app.context")
+
+
+@pytest.fixture(autouse=True)
+def reset_context_after_test():
+    """각 테스트 후 bind_context()로 묶은 필드를 지운다."""
+    yield
+    clear_context()
+
+
+def _event(mark: bool, method_name: str = "info", **fields) -> dict:
+    # 두 결과를 비교할 수 있도록 시각을 고정한다
+    return FusedProcessor(clock=lambda: 1_792_300_000_123_456_000, mark_context=mark)(
+        LOGGER, method_name, {"event": "request completed", **fields}
+    )
+
+
+@pytest.mark.unit
+def test_bind_unbind_and_reset():
+    """bind_context()는 기존 필드에 더한 새 묶음을 만들고, reset_context()와 bound_context()는 이전 상태로 되돌린다."""
+    assert current_context() is None and get_context() == {}
+    token = bind_context(service="checkout", request_id="a")
+    first = current_context()
+    with bound_context(user_id=7, request_id="b"):
+        assert get_context() == {"service": "checkout", "request_id": "b", "user_id": 7}
+    assert current_context() is first
+
+    unbind_context("request_id")
+    assert get_context() == {"service": "checkout"}
+    unbind_context("service")
+    assert current_context() is None
+
+    bind_context(user_id=1)
+    reset_context(token)
+    assert current_context() is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("serializer", ["json", "orjson"])
+def test_fragment_renderer_matches_plain_renderer(serializer):
+    """조각을 이어 붙인 JSON은 필드를 합쳐 렌더링한 JSON과 키와 값이 같고, 조각은 컨텍스트마다 한 번만 만든다."""
+    renderer = structlog.processors.JSONRenderer(serializer=get_serializer(serializer))
+    cached = ContextFragmentRenderer(renderer)
+    with bound_context(service="checkout", host="web-1", request_id="req-1", user={"id": 7, "role": "관리자"}):
+        for status in (200, 500):
+            marked = _event(True, status=status, duration_ms=1.5)
+            assert marked[CONTEXT_KEY] is current_context() and "service" not in marked
+            line = cached(LOGGER, "info", marked)
+            expected = renderer(LOGGER, "info", _event(False, status=status, duration_ms=1.5))
+            assert json.loads(line) == json.loads(expected)
+            assert CONTEXT_KEY not in marked
+        assert len(current_context()._fragments) == 1
+
+    # 컨텍스트가 없으면 renderer 결과를 그대로 돌려준다
+    assert cached(LOGGER, "info", _event(True, status=200)) == renderer(LOGGER, "info", _event(False, status=200))
+
+
+@pytest.mark.unit
+def test_event_fields_take_precedence_over_context():
+    """이벤트 인자와 이름이 겹치면 조각을 쓰지 않고 합쳐서 이벤트 값을 남긴다."""
+    with bound_context(service="checkout", status="from context"):
+        event_dict = _event(True, status=200)
+    assert CONTEXT_KEY not in event_dict
+    assert (event_dict["service"], event_dict["status"]) == ("checkout", 200)
+
+
+@pytest.mark.unit
+def test_fragment_renderer_merges_fields_added_after_marking():
+    """timestamp처럼 표시 뒤에 더해진 키와 이름이 겹치면 조각을 붙이지 않아 키가 중복되지 않는다."""
+    renderer = structlog.processors.JSONRenderer()
+    with bound_context(timestamp="bound-ts", service="checkout"):
+        marked = _event(True)
+        assert CONTEXT_KEY in marked
+        line = ContextFragmentRenderer(renderer)(LOGGER, "info", marked)
+        expected = renderer(LOGGER, "info", _event(False))
+    assert line.count('"timestamp"') == 1
+    assert json.loads(line) == json.loads(expected)
+    assert json.loads(line)["timestamp"] != "bound-ts"
+
+
+@pytest.mark.unit
+def test_expand_context_merges_resolved_fields():
+    """JSON이 아닌 렌더러 앞에서는 필드를 합치고, Lazy 값은 컨텍스트마다 한 번만 계산한다."""
+    calls = []
+    with bound_context(tenant=Lazy(lambda: calls.append(1) or "acme")):
+        for _ in range(3):
+            event_dict = expand_context(LOGGER, "info", _event(True))
+            assert event_dict["tenant"] == "acme" and CONTEXT_KEY not in event_dict
+    assert calls == [1]
+
+
+@pytest.mark.unit
+def test_derived_metrics_read_context_fields():
+    """지표 규칙의 레이블과 조건은 합쳐지지 않은 bind_context() 필드도 본다."""
+    derived = DerivedMetrics(
+        [{"name": "hits", "event": "request completed", "labels": ["service"], "where": {"region": "kr"}}]
+    )
+    with bound_context(service="checkout", region="kr"):
+        event_dict = derived(LOGGER, "info", _event(True))
+    assert "service" not in event_dict
+    assert derived.snapshot()["hits"] == [{"labels": {"service": "checkout"}, "value": 1}]
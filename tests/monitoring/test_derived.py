@@ -0,0 +1,153 @@
+import logging
+
+import pytest
+import structlog
+from structlog.testing import LogCapture
+
+from monitoring.derived import DerivedMetrics, MetricRule
+
+RULES = [
+    {"name": "http_requests", "event": "request completed", "labels": ["method", "status"], "logger": "app.http"},
+    {
+        "name": "http_request_duration_ms",
+        "type": "histogram",
+        "event": "request completed",
+        "field": "duration_ms",
+        "buckets": [10, 100, 1000],
+    },
+    {"name": "http_errors", "event": "request completed", "where": {"level": "error"}},
+]
+
+
+def _process(derived: DerivedMetrics, logger: str = "app.http", level: str = "info", **fields) -> bool:
+    """derived에 이벤트를 하나 통과시키고 기록 대상으로 남았는지 돌려준다."""
+    event_dict = {"event": "request completed", "logger": logger, "level": level, **fields}
+    try:
+        derived(None, level, event_dict)
+    except structlog.DropEvent:
+        return False
+    return True
+
+
+@pytest.mark.unit
+def test_counters_and_histograms_are_aggregated_per_label():
+    """규칙에 맞는 이벤트를 레이블 조합별 counter와 고정 버킷 histogram으로 집계한다."""
+    derived = DerivedMetrics(RULES)
+    _process(derived, method="GET", status=200, duration_ms=5)
+    _process(derived, method="GET", status=200, duration_ms=50)
+    _process(derived, method="POST", status=500, level="error", duration_ms=5000)
+    _process(derived, logger="app.db", method="GET", status=200, duration_ms="slow")
+    _process(derived, logger="app.httpx", method="GET")
+    derived(None, "info", {"event": "other", "duration_ms": 1})
+
+    snapshot = derived.snapshot()
+    assert snapshot["http_requests"] == [
+        {"labels": {"method": "GET", "status": 200}, "value": 2},
+        {"labels": {"method": "POST", "status": 500}, "value": 1},
+    ]
+    # 숫자가 아닌 duration_ms와 field가 없는 이벤트는 histogram에 넣지 않는다
+    [histogram] = snapshot["http_request_duration_ms"]
+    assert (histogram["count"], histogram["sum"]) == (3, 5055)
+    assert histogram["buckets"] == {10: 1, 100: 2, 1000: 2, "+Inf": 3}
+    assert snapshot["http_errors"] == [{"labels": {}, "value": 1}]
+
+
+@pytest.mark.unit
+def test_sample_downsamples_only_matching_events(monkeypatch):
+    """sample에 따라 맞는 이벤트만 버리고, 버린 이벤트도 지표에는 반영한다."""
+    derived = DerivedMetrics([{"name": "hits", "event": "request completed", "sample": 0}])
+    assert not any(_process(derived) for _ in range(5))
+    assert derived(None, "info", {"event": "other"}) == {"event": "other"}
+    assert derived.snapshot()["hits"] == [{"labels": {}, "value": 5}]
+    assert derived.downsampled == 5
+
+    # 여러 규칙에 맞으면 가장 낮은 비율을 따른다
+    derived = DerivedMetrics(
+        [
+            {"name": "a", "event": "request completed", "sample": 0.5},
+            {"name": "b", "event": "request completed", "sample": 0.1},
+        ]
+    )
+    monkeypatch.setattr("monitoring.derived.random.random", lambda: 0.3)
+    assert not _process(derived)
+    monkeypatch.setattr("monitoring.derived.random.random", lambda: 0.05)
+    assert _process(derived)
+
+
+@pytest.mark.unit
+def test_drain_reports_increments_since_last_drain():
+    """drain()은 직전 drain() 이후 증가분만 돌려주고, 변화가 없는 조합은 뺀다."""
+    derived = DerivedMetrics(RULES)
+    _process(derived, method="GET", status=200, duration_ms=5)
+    _process(derived, method="POST", status=201, duration_ms=500)
+    assert len(derived.drain()) == 3
+
+    _process(derived, method="GET", status=200, duration_ms=50)
+    assert derived.drain() == [
+        ("http_requests", {"method": "GET", "status": 200}, {"value": 1}),
+        ("http_request_duration_ms", {}, {"count": 1, "sum": 50, "buckets": {"10": 0, "100": 1, "1000": 1, "+Inf": 1}}),
+    ]
+    assert derived.drain() == []
+    # 누적값은 drain()과 상관없이 유지된다
+    assert derived.snapshot()["http_requests"][0]["value"] == 2
+
+
+@pytest.mark.unit
+def test_stop_emits_pending_increments():
+    """start()한 뒤 stop()하면 남은 증가분을 "derived metric" 이벤트로 기록한다."""
+    cap = LogCapture()
+    structlog.configure(processors=[cap])
+    derived = DerivedMetrics([{"name": "hits", "event": "request completed", "labels": ["status"]}], interval=3600)
+    derived.start()
+    _process(derived, status=200)
+    _process(derived, status=200)
+    derived.stop()
+
+    assert cap.entries == [
+        {
+            "event": "derived metric",
+            "metric": "hits",
+            "labels": {"status": 200},
+            "interval": 3600,
+            "value": 2,
+            "log_level": logging.getLevelName(logging.INFO).lower(),
+        }
+    ]
+
+
+@pytest.mark.unit
+def test_prometheus_text_and_series_limit():
+    """누적값을 Prometheus text 형식으로 내보내고, 레이블 조합이 max_series를 넘으면 집계하지 않는다."""
+    derived = DerivedMetrics(RULES[:2], max_series=1)
+    _process(derived, method="GET", status=200, duration_ms=5)
+    _process(derived, method="GET", status=404, duration_ms=5)
+    assert derived.overflowed == 1
+
+    text = derived.prometheus_text()
+    assert "# TYPE http_requests_total counter" in text
+    assert 'http_requests_total{method="GET",status="200"} 1' in text
+    assert 'http_request_duration_ms_bucket{le="10.0"} 2' in text
+    assert "http_request_duration_ms_count 2" in text
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "rule",
+    [
+        {"name": "x", "event": "e", "type": "gauge"},
+        {"name": "x", "event": "e", "type": "histogram"},
+        {"name": "x", "event": "e", "sample": 1.5},
+        {"name": "x", "event": "e", "type": "histogram", "field": "ms", "buckets": [10, 5]},
+    ],
+)
+def test_invalid_rules_raise(rule):
+    """잘못된 규칙은 ValueError를 던진다."""
+    with pytest.raises(ValueError):
+        MetricRule(**rule)
+
+
+@pytest.mark.unit
+def test_duplicate_metric_names_raise():
+    """같은 이름의 지표를 두 번 선언하면 ValueError를 던진다."""
+    with pytest.raises(ValueError, match="중복"):
+        DerivedMetrics([{"name": "x", "event": "a"}, {"name": "x", "event": "b"}])
@@ -0,0 +1,92 @@
+import gc
+import logging
+import sys
+import weakref
+
+import pytest
+import structlog
+
+from monitoring.formatting import SharedProcessorFormatter
+
+
+class _CountingRenderer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, _, __, event_dict):
+        self.calls += 1
+        return event_dict["event"]
+
+
+def _record(msg: str) -> logging.LogRecord:
+    return logging.LogRecord("app", logging.ERROR, __file__, 1, msg, None, None)
+
+
+@pytest.mark.unit
+def test_same_record_rendered_once():
+    """같은 레코드를 여러 번 포맷해도 렌더러는 한 번만 호출된다."""
+    renderer = _CountingRenderer()
+    formatter = SharedProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, renderer]
+    )
+    record = _record("boom")
+
+    assert formatter.format(record) == "boom"
+    assert formatter.format(record) == "boom"
+    assert renderer.calls == 1
+
+
+@pytest.mark.unit
+def test_cache_does_not_keep_record_alive():
+    """마지막 레코드를 약한 참조로만 기억하므로 exc_info의 traceback이 다음 레코드까지 남지 않는다."""
+    formatter = SharedProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, _CountingRenderer()]
+    )
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("app", logging.ERROR, __file__, 1, "boom", None, sys.exc_info())
+    formatter.format(record)
+    ref = weakref.ref(record)
+    del record
+    gc.collect()
+
+    assert ref() is None
+
+
+@pytest.mark.unit
+def test_different_records_rendered_separately():
+    """서로 다른 레코드는 각각 렌더링된다."""
+    renderer = _CountingRenderer()
+    formatter = SharedProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, renderer]
+    )
+
+    assert formatter.format(_record("a")) == "a"
+    assert formatter.format(_record("b")) == "b"
+    assert renderer.calls == 2
+
+
+@pytest.mark.unit
+def test_shared_across_handlers_renders_once():
+    """formatter를 공유한 두 핸들러로 같은 레코드를 보내도 렌더링은 한 번만 일어난다."""
+    renderer = _CountingRenderer()
+    formatter = SharedProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, renderer]
+    )
+    outputs: list[str] = []
+
+    class _Handler(logging.Handler):
+        def emit(self, record):
+            outputs.append(self.format(record))
+
+    first, second = _Handler(), _Handler()
+    first.setFormatter(formatter)
+    second.setFormatter(formatter)
+
+    record = _record("boom")
+    first.handle(record)
+    second.handle(record)
+
+    assert outputs == ["boom", "boom"]
+    assert renderer.calls == 1
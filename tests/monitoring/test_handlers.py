@@ -0,0 +1,342 @@
+import logging
+import queue
+import threading
+import time
+
+import pytest
+from tests.helpers import StaticFormatter, make_record
+
+from monitoring.handlers import BackgroundQueueListener, BufferedRotatingFileHandler, OverflowQueueHandler
+
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+# ---------------------------------------------------------------------------
+# OverflowQueueHandler
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_unknown_overflow_policy_raises():
+    """지원하지 않는 overflow 정책을 지정하면 ValueError가 발생한다."""
+    with pytest.raises(ValueError, match="overflow"):
+        OverflowQueueHandler(queue.Queue(maxsize=1), overflow="spill")
+
+
+@pytest.mark.unit
+def test_prepare_does_not_format_record():
+    """prepare()는 레코드를 포맷하지 않고 그대로 큐에 넘긴다."""
+    handler = OverflowQueueHandler(queue.Queue(maxsize=1))
+    record = make_record("hello")
+    assert handler.prepare(record) is record
+    assert record.msg == "hello"
+
+
+@pytest.mark.unit
+def test_drop_newest_discards_incoming_records():
+    """drop_newest 정책은 큐가 가득 차면 새로 들어온 레코드를 버리고 개수를 센다."""
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = OverflowQueueHandler(log_queue, overflow="drop_newest")
+
+    for i in range(5):
+        handler.handle(make_record(f"m{i}"))
+
+    assert handler.dropped == 3
+    assert [log_queue.get_nowait().msg for _ in range(2)] == ["m0", "m1"]
+
+
+@pytest.mark.unit
+def test_drop_oldest_keeps_latest_records():
+    """drop_oldest 정책은 가장 오래된 레코드를 버리고 최신 레코드를 유지한다."""
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = OverflowQueueHandler(log_queue, overflow="drop_oldest")
+
+    for i in range(5):
+        handler.handle(make_record(f"m{i}"))
+
+    assert handler.dropped == 3
+    assert [log_queue.get_nowait().msg for _ in range(2)] == ["m3", "m4"]
+
+
+@pytest.mark.unit
+def test_block_policy_does_not_drop():
+    """block 정책은 레코드를 버리지 않는다."""
+    log_queue: queue.Queue = queue.Queue(maxsize=10)
+    handler = OverflowQueueHandler(log_queue, overflow="block")
+
+    for i in range(3):
+        handler.handle(make_record(f"m{i}"))
+
+    assert handler.dropped == 0
+    assert log_queue.qsize() == 3
+
+
+# ---------------------------------------------------------------------------
+# BackgroundQueueListener
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_listener_drains_queue_on_stop():
+    """stop() 호출 시 큐에 남은 레코드를 모두 핸들러로 전달한 뒤 종료한다."""
+    log_queue: queue.Queue = queue.Queue(maxsize=100)
+    target = _CollectingHandler()
+    listener = BackgroundQueueListener(log_queue, target, respect_handler_level=True)
+    handler = OverflowQueueHandler(log_queue)
+
+    listener.start()
+    for i in range(50):
+        handler.handle(make_record(f"m{i}"))
+    listener.stop()
+
+    assert target.messages == [f"m{i}" for i in range(50)]
+
+
+@pytest.mark.unit
+def test_listener_stops_even_when_queue_is_full():
+    """큐가 가득 찬 상태에서도 종료 신호가 유실되지 않는다."""
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    target = _CollectingHandler()
+    handler = OverflowQueueHandler(log_queue, overflow="drop_oldest")
+    handler.handle(make_record("last"))
+
+    listener = BackgroundQueueListener(log_queue, target)
+    listener.start()
+    listener.stop()
+
+    assert target.messages == ["last"]
+
+
+@pytest.mark.unit
+def test_listener_stops_while_drop_oldest_producers_keep_logging():
+    """drop_oldest 정책으로 계속 로그를 넣는 스레드가 종료 신호를 밀어내도 stop()이 돌아온다."""
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = OverflowQueueHandler(log_queue, overflow="drop_oldest")
+    listener = BackgroundQueueListener(log_queue, _CollectingHandler())
+    done = threading.Event()
+
+    def produce():
+        while not done.is_set():
+            handler.handle(make_record("tick"))
+
+    producers = [threading.Thread(target=produce) for _ in range(4)]
+    listener.start()
+    thread = listener._thread
+    for producer in producers:
+        producer.start()
+    time.sleep(0.05)
+    try:
+        listener.stop(timeout=5)
+        assert not thread.is_alive()
+    finally:
+        done.set()
+        for producer in producers:
+            producer.join()
+
+
+@pytest.mark.unit
+def test_listener_respects_handler_level():
+    """respect_handler_level=True이면 핸들러 레벨보다 낮은 레코드는 전달하지 않는다."""
+    log_queue: queue.Queue = queue.Queue()
+    error_only = _CollectingHandler(level=logging.ERROR)
+    listener = BackgroundQueueListener(log_queue, error_only, respect_handler_level=True)
+
+    listener.start()
+    log_queue.put(make_record("info"))
+    error = make_record("error")
+    error.levelno = logging.ERROR
+    log_queue.put(error)
+    listener.stop()
+
+    assert error_only.messages == ["error"]
+
+
+# ---------------------------------------------------------------------------
+# BufferedRotatingFileHandler
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("output", ['{"event": "한글"}', '{"event": "한글"}'.encode()])
+def test_bytes_handler_writes_str_and_bytes_as_utf8(tmp_path, output):
+    """포맷 결과가 str이든 bytes든 UTF-8로 한 줄씩 기록된다."""
+    handler = BufferedRotatingFileHandler(tmp_path / "app.log", buffer_size=0)
+    handler.setFormatter(StaticFormatter(output))
+
+    handler.handle(make_record("ignored"))
+    handler.close()
+
+    assert (tmp_path / "app.log").read_bytes() == '{"event": "한글"}\n'.encode()
+
+
+@pytest.mark.unit
+def test_bytes_handler_rotates_by_encoded_size(tmp_path):
+    """maxBytes는 인코딩된 바이트 수 기준으로 판단해 로테이션한다."""
+    handler = BufferedRotatingFileHandler(tmp_path / "app.log", maxBytes=25, backupCount=2, buffer_size=0)
+    handler.setFormatter(StaticFormatter("가나다"))  # 9 bytes + 개행
+
+    for _ in range(3):
+        handler.handle(make_record("ignored"))
+    handler.close()
+
+    assert (tmp_path / "app.log").read_bytes() == "가나다\n".encode()
+    assert (tmp_path / "app.log.1").read_bytes() == "가나다\n가나다\n".encode()
+
+
+class _CountingFormatter(StaticFormatter):
+    def __init__(self, output):
+        super().__init__(output)
+        self.calls = 0
+
+    def format(self, record):
+        self.calls += 1
+        return super().format(record)
+
+
+@pytest.mark.unit
+def test_buffered_handler_formats_each_record_once(tmp_path):
+    """로테이션 판단을 위해 레코드를 미리 포맷하지 않으므로 레코드당 format()은 한 번만 호출된다."""
+    formatter = _CountingFormatter("line")
+    handler = BufferedRotatingFileHandler(tmp_path / "app.log", maxBytes=12, backupCount=1, flush_interval=0)
+    handler.setFormatter(formatter)
+
+    for _ in range(5):
+        handler.handle(make_record("ignored"))
+    handler.shouldRollover(make_record("ignored"))
+    handler.close()
+
+    assert formatter.calls == 5
+
+
+@pytest.mark.unit
+def test_buffered_handler_holds_records_until_buffer_size(tmp_path):
+    """buffer_size에 도달하기 전까지는 파일에 쓰지 않고, 도달하면 모아서 한 번에 쓴다."""
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, buffer_size=10, flush_interval=0)
+    handler.setFormatter(StaticFormatter("abcd"))  # 개행 포함 5 bytes
+
+    handler.handle(make_record("ignored"))
+    assert path.read_bytes() == b""
+
+    handler.handle(make_record("ignored"))
+    assert path.read_bytes() == b"abcd\nabcd\n"
+    handler.close()
+
+
+@pytest.mark.unit
+def test_buffered_handler_flush_writes_pending_records(tmp_path):
+    """flush()와 close()는 버퍼에 남은 레코드를 파일에 쓴다."""
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, flush_interval=0)
+    handler.setFormatter(StaticFormatter("pending"))
+
+    handler.handle(make_record("ignored"))
+    handler.flush()
+    assert path.read_bytes() == b"pending\n"
+
+    handler.handle(make_record("ignored"))
+    handler.close()
+    assert path.read_bytes() == b"pending\npending\n"
+
+
+@pytest.mark.unit
+def test_buffered_handler_flushes_on_interval(tmp_path):
+    """flush_interval이 지나면 백그라운드 스레드가 버퍼를 파일에 쓴다."""
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, flush_interval=0.01)
+    handler.setFormatter(StaticFormatter("tick"))
+
+    handler.handle(make_record("ignored"))
+    deadline = time.monotonic() + 2
+    while path.read_bytes() == b"" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    handler.close()
+
+    assert path.read_bytes() == b"tick\n"
+
+
+@pytest.mark.unit
+def test_buffered_handler_fsyncs_error_records(tmp_path, mocker):
+    """fsync_on_error=True면 ERROR 레코드는 버퍼를 비우고 fsync한다."""
+    fsync = mocker.patch("monitoring.handlers.os.fsync")
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, flush_interval=0, fsync_on_error=True)
+    handler.setFormatter(StaticFormatter("line"))
+
+    handler.handle(make_record("info"))
+    fsync.assert_not_called()
+
+    error = make_record("error")
+    error.levelno = logging.ERROR
+    handler.handle(error)
+
+    assert path.read_bytes() == b"line\nline\n"
+    fsync.assert_called_once()
+    handler.close()
+
+
+@pytest.mark.unit
+def test_buffered_handler_rotation_keeps_buffered_records_in_old_segment(tmp_path):
+    """로테이션 직전에 버퍼에 있던 레코드는 백업 파일({name}.log.1)에 기록된다."""
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, maxBytes=13, backupCount=1, flush_interval=0)
+    handler.setFormatter(StaticFormatter("12345"))  # 개행 포함 6 bytes
+
+    for _ in range(3):
+        handler.handle(make_record("ignored"))
+    handler.close()
+
+    assert (tmp_path / "app.log.1").read_bytes() == b"12345\n12345\n"
+    assert path.read_bytes() == b"12345\n"
+
+
+@pytest.mark.unit
+def test_buffered_handler_counts_existing_file_size(tmp_path):
+    """이미 내용이 있는 파일을 열면 기존 크기부터 누적해 로테이션을 판단한다."""
+    path = tmp_path / "app.log"
+    path.write_bytes(b"x" * 10)
+    handler = BufferedRotatingFileHandler(path, maxBytes=12, backupCount=1, buffer_size=0)
+    handler.setFormatter(StaticFormatter("abc"))
+
+    handler.handle(make_record("ignored"))
+    handler.close()
+
+    assert (tmp_path / "app.log.1").read_bytes() == b"x" * 10
+    assert path.read_bytes() == b"abc\n"
+
+
+class _FullDiskStream:
+    def write(self, data):
+        raise OSError(28, "No space left on device")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.unit
+def test_buffered_handler_drops_pending_records_when_writes_keep_failing(tmp_path, monkeypatch):
+    """쓰기가 계속 실패하면 버퍼를 MAX_PENDING_BYTES까지만 붙잡아 두고, 넘으면 버리고 dropped에 센다."""
+    monkeypatch.setattr("monitoring.handlers.MAX_PENDING_BYTES", 20)
+    monkeypatch.setattr(logging, "raiseExceptions", False)
+    handler = BufferedRotatingFileHandler(tmp_path / "app.log", buffer_size=0)
+    handler.setFormatter(StaticFormatter("12345"))  # 개행 포함 6 bytes
+    handler.handle(make_record("ignored"))
+    handler.stream = _FullDiskStream()
+
+    for _ in range(3):
+        handler.handle(make_record("ignored"))
+    assert (len(handler._buffer), handler.dropped) == (3, 0)
+
+    handler.handle(make_record("ignored"))
+    assert (handler._buffer, handler.dropped) == ([], 4)
+    handler.close()
@@ -0,0 +1,97 @@
+import functools
+import threading
+
+import pytest
+
+from monitoring.lazy import Lazy, resolve_lazy_fields
+
+
+@pytest.mark.unit
+def test_lazy_value_is_memoized():
+    """Lazy 값은 처음 읽을 때 한 번만 계산되고 이후에는 저장된 결과를 돌려준다."""
+    calls = []
+
+    def compute(a, b=0):
+        calls.append(1)
+        return a + b
+
+    lazy = Lazy(compute, 1, b=2)
+    assert calls == []
+    assert lazy.value == 3
+    assert lazy.value == 3
+    assert calls == [1]
+
+
+@pytest.mark.unit
+def test_lazy_value_computed_once_across_threads():
+    """여러 스레드가 동시에 읽어도 함수는 한 번만 호출된다."""
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        return "done"
+
+    lazy = Lazy(compute)
+
+    def read():
+        barrier.wait()
+        assert lazy.value == "done"
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+
+
+@pytest.mark.unit
+def test_resolve_lazy_fields_replaces_lazy_and_functions():
+    """Lazy, lambda, 함수, partial 값은 호출 결과로 바뀐다."""
+
+    def snapshot():
+        return {"size": 3}
+
+    event = resolve_lazy_fields(
+        None,
+        "debug",
+        {
+            "event": "state",
+            "a": Lazy(len, [1, 2]),
+            "b": lambda: "lambda",
+            "c": snapshot,
+            "d": functools.partial(max, 1, 5),
+        },
+    )
+    assert event == {"event": "state", "a": 2, "b": "lambda", "c": {"size": 3}, "d": 5}
+
+
+@pytest.mark.unit
+def test_resolve_lazy_fields_keeps_classes_and_callable_objects():
+    """클래스와 __call__을 가진 객체는 호출하지 않고 값 그대로 둔다."""
+
+    class Handler:
+        def __call__(self):
+            raise AssertionError("호출되면 안 된다")
+
+    handler = Handler()
+    event = resolve_lazy_fields(None, "info", {"event": "x", "cls": ValueError, "obj": handler})
+    assert event["cls"] is ValueError
+    assert event["obj"] is handler
+
+
+@pytest.mark.unit
+def test_resolve_lazy_fields_records_failure():
+    """계산 중 예외가 나면 이벤트를 버리지 않고 실패 내용을 값으로 남긴다."""
+    event = resolve_lazy_fields(None, "info", {"event": "x", "v": Lazy(int, "not-a-number")})
+    assert event["v"].startswith("<lazy evaluation failed: ValueError(")
+
+
+@pytest.mark.unit
+def test_lazy_repr():
+    """계산 전에는 함수를, 계산 후에는 결과를 repr로 보여준다."""
+    lazy = Lazy(str.upper, "a")
+    assert repr(lazy).startswith("Lazy(")
+    assert lazy.value == "A"
+    assert repr(lazy) == "'A'"
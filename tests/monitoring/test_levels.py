@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+
+import pytest
+import structlog
+from structlog.testing import LogCapture
+
+from monitoring.levels import LevelCheckedBoundLogger, LevelTable, parse_level, parse_level_spec
+
+NAMES = ("levels_app", "levels_app.db", "levels_other")
+
+
+@pytest.fixture(autouse=True)
+def reset_levels():
+    """테스트가 바꾼 root와 이름별 로거 레벨을 되돌린다."""
+    root_level = logging.getLogger().level
+    yield
+    logging.getLogger().setLevel(root_level)
+    for name in NAMES:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    structlog.reset_defaults()
+
+
+@pytest.mark.unit
+def test_parse_level_accepts_names_and_numbers():
+    """레벨 이름(대소문자 무관)과 정수를 모두 레벨 번호로 바꾼다."""
+    assert parse_level("debug") == logging.DEBUG
+    assert parse_level(" WARNING ") == logging.WARNING
+    assert parse_level(15) == 15
+    with pytest.raises(ValueError):
+        parse_level("LOUD")
+
+
+@pytest.mark.unit
+def test_parse_level_spec():
+    """이름=레벨 목록을 dict로 바꾸고 빈 항목은 건너뛴다."""
+    assert parse_level_spec("app.db=DEBUG, urllib3=warning,") == {"app.db": logging.DEBUG, "urllib3": logging.WARNING}
+    assert parse_level_spec("") == {}
+    with pytest.raises(ValueError):
+        parse_level_spec("app.db")
+
+
+@pytest.mark.unit
+def test_apply_sets_hierarchical_levels():
+    """이름별 레벨은 하위 로거에도 적용되고, 표에서 빠진 로거는 부모 레벨로 돌아간다."""
+    table = LevelTable("INFO", env_var=None)
+    table.apply({"levels_app": logging.DEBUG})
+    assert logging.getLogger().level == logging.INFO
+    assert logging.getLogger("levels_app.db").isEnabledFor(logging.DEBUG)
+    assert not logging.getLogger("levels_other").isEnabledFor(logging.DEBUG)
+
+    table.apply({"root": logging.WARNING})
+    assert logging.getLogger("levels_app").level == logging.NOTSET
+    assert not logging.getLogger("levels_app.db").isEnabledFor(logging.INFO)
+    assert table.levels == {"root": logging.WARNING}
+
+
+@pytest.mark.unit
+def test_new_table_resets_levels_of_previous_table():
+    """표를 새로 만들어 적용해도 이전 표가 지정한 로거는 부모 레벨로 돌아간다 (setup_logging() 재호출)."""
+    LevelTable("INFO", overrides={"levels_app.db": "DEBUG"}, env_var=None).reload()
+    assert logging.getLogger("levels_app.db").level == logging.DEBUG
+
+    LevelTable("INFO", env_var=None).reload()
+    assert logging.getLogger("levels_app.db").level == logging.NOTSET
+
+
+@pytest.mark.unit
+def test_set_level_and_clear():
+    """set_level은 로거 하나만 바꾸고, None이면 지정을 지운다."""
+    table = LevelTable("INFO", overrides={"levels_other": "ERROR"}, env_var=None)
+    table.reload()
+    table.set_level("levels_app", "DEBUG")
+    assert table.levels == {"root": logging.INFO, "levels_other": logging.ERROR, "levels_app": logging.DEBUG}
+
+    table.set_level("levels_app", None)
+    assert "levels_app" not in table.levels
+    assert logging.getLogger("levels_app").getEffectiveLevel() == logging.INFO
+    assert logging.getLogger("levels_other").level == logging.ERROR
+
+
+@pytest.mark.unit
+def test_reload_merges_config_file_and_env(tmp_path, monkeypatch):
+    """config → 파일 → 환경 변수 순서로 합치며 뒤의 것이 우선한다."""
+    file = tmp_path / "levels.json"
+    file.write_text(json.dumps({"root": "WARNING", "levels_app": "INFO"}))
+    monkeypatch.setenv("TEST_LOG_LEVELS", "levels_app=DEBUG")
+    table = LevelTable(
+        "INFO", overrides={"levels_app": "ERROR", "levels_other": "ERROR"}, file=file, env_var="TEST_LOG_LEVELS"
+    )
+
+    assert table.reload() == {"levels_app": logging.DEBUG, "levels_other": logging.ERROR, "root": logging.WARNING}
+    assert logging.getLogger().level == logging.WARNING
+    assert logging.getLogger("levels_app").level == logging.DEBUG
+
+
+@pytest.mark.unit
+def test_invalid_file_raises(tmp_path):
+    """레벨 파일이 JSON 객체가 아니면 ValueError를 던진다."""
+    file = tmp_path / "levels.json"
+    file.write_text("[]")
+    with pytest.raises(ValueError):
+        LevelTable(file=file, env_var=None).reload()
+
+
+@pytest.mark.unit
+def test_watch_reloads_changed_file(tmp_path):
+    """파일 감시 스레드는 수정 시각이 바뀐 레벨 파일을 다시 읽는다."""
+    file = tmp_path / "levels.json"
+    file.write_text(json.dumps({"levels_app": "ERROR"}))
+    table = LevelTable("INFO", file=file, env_var=None)
+    table.reload()
+    table.watch(0.01)
+    try:
+        file.write_text(json.dumps({"levels_app": "DEBUG"}))
+        os.utime(file, (time.time() + 5, time.time() + 5))
+        deadline = time.monotonic() + 5
+        while logging.getLogger("levels_app").level != logging.DEBUG and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert logging.getLogger("levels_app").level == logging.DEBUG
+    finally:
+        table.stop()
+    assert table._watcher is None
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="SIGHUP이 없는 플랫폼")
+def test_signal_triggers_reload(monkeypatch):
+    """등록한 시그널을 받으면 환경 변수를 다시 읽고, stop() 후에는 이전 핸들러로 돌아간다."""
+    previous = signal.getsignal(signal.SIGHUP)
+    table = LevelTable("INFO", env_var="TEST_LOG_LEVELS")
+    table.reload()
+    assert table.install_signal("SIGHUP") is True
+    try:
+        monkeypatch.setenv("TEST_LOG_LEVELS", "levels_other=DEBUG")
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert logging.getLogger("levels_other").level == logging.DEBUG
+    finally:
+        table.stop()
+    assert signal.getsignal(signal.SIGHUP) == previous
+
+
+@pytest.mark.unit
+def test_cached_bound_logger_follows_level_changes():
+    """캐시된 로거도 레벨 변경을 다음 호출부터 바로 따른다."""
+    cap = LogCapture()
+    structlog.configure(
+        processors=[cap],
+        wrapper_class=LevelCheckedBoundLogger,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+    table = LevelTable("INFO", env_var=None)
+    table.reload()
+    log = structlog.get_logger("levels_app.db")
+
+    log.debug("hidden")
+    table.set_level("levels_app", "DEBUG")
+    log.debug("shown")
+    log.log(logging.DEBUG, "shown via log")
+    asyncio.run(log.adebug("shown async"))
+    assert log.is_enabled_for(logging.DEBUG)
+    assert log.get_effective_level() == logging.DEBUG
+
+    table.set_level("levels_app", "ERROR")
+    log.warning("hidden")
+    asyncio.run(log.awarning("hidden async"))
+    log.error("error")
+    assert [e["event"] for e in cap.entries] == ["shown", "shown via log", "shown async", "error"]
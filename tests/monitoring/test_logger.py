@@ -1,11 +1,22 @@
+import gzip
+import json
 import logging
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from logging.handlers import RotatingFileHandler
 
 import pytest
 import structlog
 from structlog.testing import LogCapture, capture_logs
 
+from monitoring.formatting import SharedProcessorFormatter
+from monitoring.handlers import OverflowQueueHandler
+from monitoring.lazy import Lazy
 from monitoring.logger import StructuredLogger
+from monitoring.multiprocess import CentralLogWriter, ShardedRotatingFileHandler
 
 
 @pytest.fixture(autouse=True)
@@ -342,3 +353,1221 @@ def test_error_handler_not_added_when_error_tracking_disabled(tmp_path):
 
     rotating_handlers = [h for h in logging.getLogger().handlers if isinstance(h, RotatingFileHandler)]
     assert len(rotating_handlers) == 1  # file handler만 존재
+
+
+# ---------------------------------------------------------------------------
+# Async (queue) mode
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_async_mode_attaches_only_queue_handler(tmp_path):
+    """async=True이면 root logger에는 OverflowQueueHandler만 붙고 파일 핸들러는 리스너가 가진다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "async": True})
+    try:
+        handlers = logging.getLogger().handlers
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], OverflowQueueHandler)
+        assert not any(isinstance(h, RotatingFileHandler) for h in handlers)
+    finally:
+        logger.shutdown()
+
+
+@pytest.mark.unit
+def test_async_mode_writes_all_events_on_shutdown(tmp_path):
+    """shutdown() 호출 시 큐에 쌓인 이벤트가 모두 파일에 기록된다."""
+    logger = StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "async": True, "error_tracking": True}
+    )
+    log = structlog.get_logger("svc")
+    for i in range(100):
+        log.info("tick", i=i)
+    log.error("failed")
+    logger.shutdown()
+
+    lines = (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()
+    error_lines = (tmp_path / "app.error.log").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 101
+    assert len(error_lines) == 1
+    assert '"event": "failed"' in error_lines[0]
+
+
+@pytest.mark.unit
+def test_async_mode_writes_events_after_shutdown(tmp_path):
+    """shutdown() 뒤의 이벤트는 멈춘 큐에 쌓이지 않고 파일 핸들러가 바로 기록한다 (block 정책에서도 멈추지 않는다)."""
+    logger = StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "async": True, "queue_size": 1}
+    )
+    log = structlog.get_logger("svc")
+    log.info("before")
+    logger.shutdown()
+    assert not any(isinstance(h, OverflowQueueHandler) for h in logging.getLogger().handlers)
+
+    for i in range(5):
+        log.info("after", i=i)
+    logger.shutdown()
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    assert [e["event"] for e in _read_events(tmp_path / "app.log")] == ["before"] + ["after"] * 5
+
+
+@pytest.mark.unit
+def test_async_mode_foreign_records_keep_caller_context(tmp_path):
+    """async 모드에서도 stdlib 로거 레코드는 호출 스레드의 contextvars와 호출 시각으로 기록된다."""
+    import time
+
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "async": True})
+    logger._listener.stop()  # 리스너가 늦게 처리하는 상황을 만든다
+    with structlog.contextvars.bound_contextvars(request_id="req-1"):
+        logging.getLogger("thirdparty").warning("foreign")
+    time.sleep(0.01)
+    structlog.get_logger("svc").info("later")
+    logger._listener.start()
+    logger.shutdown()
+
+    foreign, later = _read_events(tmp_path / "app.log")
+    assert (foreign["event"], foreign["request_id"]) == ("foreign", "req-1")
+    assert "request_id" not in later
+    assert foreign["timestamp"] < later["timestamp"]
+
+
+@pytest.mark.unit
+def test_async_mode_reports_dropped_events(tmp_path):
+    """drop_newest 정책에서 버려진 이벤트 수가 dropped_events로 노출된다."""
+    logger = StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["file"],
+            "async": True,
+            "queue_size": 1,
+            "overflow": "drop_newest",
+        },
+    )
+    logger._listener.stop()  # 리스너를 멈춰 큐가 비워지지 않게 한다
+    logger._listener = None
+
+    log = structlog.get_logger()
+    for _ in range(5):
+        log.info("burst")
+
+    assert logger.dropped_events == 4
+
+
+@pytest.mark.unit
+def test_dropped_events_zero_in_sync_mode(tmp_path):
+    """동기 모드에서는 dropped_events가 항상 0이다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path)})
+    assert logger.dropped_events == 0
+
+
+@pytest.mark.unit
+def test_setup_logging_stops_previous_listener(tmp_path):
+    """async 모드에서 setup_logging()을 다시 호출하면 이전 리스너가 정리된다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "async": True})
+    first = logger._listener
+    logger.setup_logging()
+    try:
+        assert first._thread is None
+        assert logger._listener is not first
+    finally:
+        logger.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("is_async", [False, True])
+def test_replaced_handlers_are_closed(tmp_path, is_async):
+    """StructuredLogger를 다시 만들면 이전 파일 핸들러를 flush하고 닫아 스레드와 fd가 남지 않는다."""
+    config = {"log_dir": str(tmp_path), "outputs": ["file"], "retention_age": 3600, "async": is_async}
+    first = StructuredLogger(name="app", config=config)
+    structlog.get_logger("svc").info("before")
+    threads = threading.active_count()
+    for _ in range(10):
+        StructuredLogger(name="app", config=config)
+    assert threading.active_count() <= threads
+    # 첫 로거가 쓴 이벤트는 교체될 때 flush된다
+    assert [e["event"] for e in _read_events(tmp_path / "app.log")] == ["before"]
+    first.shutdown()
+
+
+@pytest.mark.unit
+def test_file_and_error_handlers_share_formatter(tmp_path):
+    """file handler와 error handler는 같은 SharedProcessorFormatter 인스턴스를 공유한다."""
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "error_tracking": True})
+
+    rotating_handlers = [h for h in logging.getLogger().handlers if isinstance(h, RotatingFileHandler)]
+    assert len(rotating_handlers) == 2
+    assert rotating_handlers[0].formatter is rotating_handlers[1].formatter
+    assert isinstance(rotating_handlers[0].formatter, SharedProcessorFormatter)
+
+
+@pytest.mark.unit
+def test_error_event_written_identically_to_both_files(tmp_path):
+    """ERROR 이벤트는 {name}.log와 {name}.error.log에 동일한 내용으로 기록된다."""
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "error_tracking": True})
+
+    structlog.get_logger("svc").error("db down", host="localhost")
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    main_line = (tmp_path / "app.log").read_text(encoding="utf-8").strip()
+    error_line = (tmp_path / "app.error.log").read_text(encoding="utf-8").strip()
+    assert main_line == error_line
+    assert '"event": "db down"' in error_line
+
+
+# ---------------------------------------------------------------------------
+# Serializer
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_default_serializer_is_stdlib_json(tmp_path):
+    """serializer 기본값은 json이며 렌더러가 str을 반환한다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path)})
+    assert logger.config["serializer"] == "json"
+    assert isinstance(logger._get_renderer("file")(None, None, {"event": "x"}), str)
+
+
+@pytest.mark.unit
+def test_orjson_serializer_writes_korean_bytes_to_file(tmp_path):
+    """serializer=orjson이면 UTF-8 bytes가 그대로 파일에 기록되고 한글이 이스케이프되지 않는다."""
+    pytest.importorskip("orjson")
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "serializer": "orjson"})
+
+    structlog.get_logger("svc").info("한글 테스트", user="홍길동")
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    line = (tmp_path / "app.log").read_text(encoding="utf-8").strip()
+    entry = json.loads(line)
+    assert entry["event"] == "한글 테스트"
+    assert entry["user"] == "홍길동"
+    assert "\\u" not in line
+
+
+# ---------------------------------------------------------------------------
+# Multiprocess
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_unknown_multiprocess_mode_raises(tmp_path):
+    """지원하지 않는 multiprocess 모드를 지정하면 ValueError가 발생한다."""
+    with pytest.raises(ValueError, match="multiprocess"):
+        StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "multiprocess": "fork"})
+
+
+@pytest.mark.unit
+def test_shard_mode_writes_pid_files(tmp_path):
+    """multiprocess=shard이면 {name}.{pid}.log와 {name}.{pid}.error.log에 기록한다."""
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "multiprocess": "shard"})
+
+    handlers = logging.getLogger().handlers
+    assert all(isinstance(h, ShardedRotatingFileHandler) for h in handlers)
+    assert (tmp_path / f"app.{os.getpid()}.log").exists()
+    assert (tmp_path / f"app.{os.getpid()}.error.log").exists()
+
+
+@pytest.mark.unit
+def test_central_mode_sends_to_writer(tmp_path, tmp_path_factory):
+    """multiprocess=central이면 이벤트가 중앙 writer를 거쳐 {name}.log/{name}.error.log에 기록된다."""
+    address = tmp_path_factory.mktemp("s") / "w.sock"
+    writer = CentralLogWriter(tmp_path, address, buffer_size=0, flush_interval=0)
+    writer.start()
+    try:
+        StructuredLogger(
+            name="app",
+            config={
+                "log_dir": str(tmp_path),
+                "outputs": ["file"],
+                "multiprocess": "central",
+                "central_address": str(address),
+            },
+        )
+        log = structlog.get_logger("svc")
+        log.info("hello")
+        log.error("boom")
+        # 워커가 먼저 연결을 닫아야 writer가 남은 배치를 모두 받고 종료한다
+        root = logging.getLogger()
+        for h in root.handlers[:]:
+            h.close()
+            root.removeHandler(h)
+    finally:
+        writer.stop()
+
+    assert [json.loads(line)["event"] for line in (tmp_path / "app.log").read_text().splitlines()] == ["hello", "boom"]
+    assert [json.loads(line)["event"] for line in (tmp_path / "app.error.log").read_text().splitlines()] == ["boom"]
+
+
+# ---------------------------------------------------------------------------
+# Loki output
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_loki_output_pushes_json_lines(tmp_path):
+    """outputs에 loki가 있으면 이벤트를 JSON 줄로 Loki에 직접 전송한다."""
+    received: list[dict] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(gzip.decompress(self.rfile.read(int(self.headers["Content-Length"])))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    try:
+        StructuredLogger(
+            name="app",
+            config={
+                "log_dir": str(tmp_path),
+                "outputs": ["loki"],
+                "format": "text",
+                "loki_url": f"http://127.0.0.1:{server.server_port}/loki/api/v1/push",
+            },
+        )
+        structlog.get_logger("svc").warning("disk low", free_mb=10)
+        root = logging.getLogger()
+        for h in root.handlers[:]:
+            h.close()
+            root.removeHandler(h)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    stream = received[0]["streams"][0]
+    assert stream["stream"] == {"level": "warning", "logger": "svc"}
+    assert json.loads(stream["values"][0][1])["free_mb"] == 10
+
+
+# ---------------------------------------------------------------------------
+# Sampling / rate limit / collapse
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_throttler_not_in_chain_by_default(tmp_path):
+    """sampling/rate_limit/collapse_window를 지정하지 않으면 processor 체인에 throttler가 없다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path)})
+    assert logger._throttler is None
+    assert logger.suppressed_events == {"sampled": 0, "rate_limited": 0, "collapsed": 0}
+
+
+@pytest.mark.unit
+def test_rate_limit_drops_excess_events_before_rendering(tmp_path):
+    """rate_limit을 넘는 같은 이벤트는 기록되지 않고 suppressed_events에 집계된다."""
+    logger = StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "rate_limit": 1, "rate_limit_burst": 3}
+    )
+    log = structlog.get_logger("svc")
+    for _ in range(10):
+        log.info("retrying")
+    log.info("other")
+    logger.shutdown()
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    events = [json.loads(line)["event"] for line in (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()]
+    assert events == ["retrying"] * 3 + ["other"]
+    assert logger.suppressed_events["rate_limited"] == 7
+
+
+@pytest.mark.unit
+def test_collapse_summary_written_on_shutdown(tmp_path):
+    """collapse_window 안의 중복은 첫 줄만 기록되고, shutdown() 때 repeated=N 요약이 남는다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "collapse_window": 60})
+    log = structlog.get_logger("svc")
+    for _ in range(5):
+        log.warning("disk low")
+    logger.shutdown()
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    lines = [json.loads(line) for line in (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()]
+    assert [line.get("repeated") for line in lines] == [None, 4]
+    assert lines[1]["level"] == "warning"
+
+
+@pytest.mark.unit
+def test_collapse_summary_not_sampled(tmp_path, monkeypatch):
+    """요약 이벤트는 레벨 샘플링에 걸리지 않고 기록되며, 내부 표시 키는 렌더링되지 않는다."""
+    logger = StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["file"],
+            "log_level": "DEBUG",
+            "collapse_window": 60,
+            "sampling": {"debug": 0.5},
+        },
+    )
+    log = structlog.get_logger("svc")
+    monkeypatch.setattr("monitoring.sampling.random.random", lambda: 0.0)
+    for _ in range(5):
+        log.debug("cache miss")
+    monkeypatch.setattr("monitoring.sampling.random.random", lambda: 0.9)
+    logger.shutdown()
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    lines = _read_events(tmp_path / "app.log")
+    assert [line.get("repeated") for line in lines] == [None, 4]
+    assert all("_summary" not in line for line in lines)
+
+
+@pytest.mark.unit
+def test_collapse_summary_written_when_window_ends(tmp_path):
+    """shutdown() 전에도 collapse_window가 끝나면 요약 스레드가 repeated=N을 기록한다."""
+    logger = StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "collapse_window": 0.05}
+    )
+    log = structlog.get_logger("svc")
+    for _ in range(5):
+        log.warning("disk low")
+
+    path = tmp_path / "app.log"
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        for h in logging.getLogger().handlers:
+            h.flush()
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        if len(lines) > 1:
+            break
+        time.sleep(0.02)
+    assert [line.get("repeated") for line in lines] == [None, 4]
+    logger.shutdown()
+
+
+@pytest.mark.unit
+def test_sampling_never_drops_errors(tmp_path):
+    """debug 샘플링을 켜도 error 이벤트는 모두 기록된다."""
+    logger = StructuredLogger(
+        name="app",
+        config={"log_dir": str(tmp_path), "outputs": ["file"], "log_level": "DEBUG", "sampling": {"debug": 0}},
+    )
+    log = structlog.get_logger("svc")
+    for _ in range(5):
+        log.debug("noise")
+        log.error("failed")
+    logger.shutdown()
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    events = [json.loads(line)["event"] for line in (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()]
+    assert events == ["failed"] * 5
+    assert logger.suppressed_events["sampled"] == 5
+
+
+# ---------------------------------------------------------------------------
+# Lazy field evaluation
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_lazy_field_not_evaluated_below_log_level(tmp_path):
+    """log_level 아래의 이벤트에 넘긴 Lazy 값과 함수는 호출되지 않는다."""
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "log_level": "INFO"})
+    calls = []
+    structlog.get_logger("svc").debug("state", a=Lazy(calls.append, 1), b=lambda: calls.append(2))
+    assert calls == []
+
+
+@pytest.mark.unit
+def test_lazy_field_not_evaluated_for_sampled_out_event(tmp_path):
+    """샘플링으로 버려진 이벤트의 Lazy 값은 호출되지 않는다."""
+    logger = StructuredLogger(
+        name="app",
+        config={"log_dir": str(tmp_path), "outputs": ["file"], "log_level": "DEBUG", "sampling": {"debug": 0}},
+    )
+    calls = []
+    structlog.get_logger("svc").debug("state", a=Lazy(calls.append, 1))
+    logger.shutdown()
+    assert calls == []
+
+
+@pytest.mark.unit
+def test_lazy_field_evaluated_once_for_file_and_error_handlers(tmp_path):
+    """통과한 이벤트의 Lazy 값은 한 번만 계산되어 file/error 파일에 같은 값으로 기록된다."""
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "error_tracking": True})
+    calls = []
+
+    def snapshot():
+        calls.append(1)
+        return {"items": 3}
+
+    structlog.get_logger("svc").error("failed", snapshot=snapshot)
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    assert calls == [1]
+    for name in ("app.log", "app.error.log"):
+        line = (tmp_path / name).read_text(encoding="utf-8").splitlines()[0]
+        assert json.loads(line)["snapshot"] == {"items": 3}
+
+
+# ---------------------------------------------------------------------------
+# Compression / retention
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_compression_config_compresses_rotated_files(tmp_path):
+    """compression을 지정하면 로테이션된 파일은 .gz로 남고 활성 파일 app.log는 그대로 JSON 줄이다."""
+    StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["file"],
+            "max_file_size": 500,
+            "buffer_size": 0,
+            "compression": "gzip",
+            "retention_bytes": 10 * 1024 * 1024,
+        },
+    )
+    log = structlog.get_logger("svc")
+    for i in range(30):
+        log.info("tick", i=i)
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        h.close()
+        root.removeHandler(h)
+
+    archived = [p for p in tmp_path.iterdir() if p.name.startswith("app.log.")]
+    assert archived
+    assert all(p.name.endswith(".gz") for p in archived)
+    lines = (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1])["i"] == 29
+
+
+# ---------------------------------------------------------------------------
+# Self-instrumentation metrics
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_metrics_disabled_by_default(tmp_path):
+    """metrics를 켜지 않으면 self.metrics는 None이다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path)})
+    assert logger.metrics is None
+
+
+@pytest.mark.unit
+def test_metrics_snapshot_covers_pipeline(tmp_path):
+    """metrics=True면 이벤트 수, 체인/렌더러 시간, 파일 기록 바이트, 버려진 이벤트 수가 스냅샷에 담긴다."""
+    logger = StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["file"],
+            "metrics": True,
+            "buffer_size": 0,
+            "sampling": {"debug": 0},
+            "log_level": "DEBUG",
+        },
+    )
+    log = structlog.get_logger("svc")
+    log.info("hello")
+    log.error("failed")
+    log.debug("noise")
+
+    snapshot = logger.metrics.snapshot()
+    logger.shutdown()
+    assert snapshot["events"] == {"svc": {"info": 1, "error": 1}}
+    assert snapshot["processor_seconds"]["count"] >= 1
+    assert "file" in snapshot["render_seconds"]
+    assert snapshot["bytes_written"]["app.log"] == (tmp_path / "app.log").stat().st_size
+    assert snapshot["suppressed"]["sampled"] == 1
+    assert snapshot["dropped"] == 0
+
+
+@pytest.mark.unit
+def test_metrics_port_serves_prometheus_text(tmp_path):
+    """metrics_port를 지정하면 /metrics 엔드포인트가 열리고 shutdown()에서 닫힌다."""
+    import urllib.request
+
+    logger = StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": [], "metrics": True, "metrics_port": 0}
+    )
+    structlog.get_logger("svc").info("hello")
+    port = logger._metrics_server.server_port
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:  # nosec B310
+        body = response.read().decode("utf-8")
+    logger.shutdown()
+
+    assert 'logging_events_total{logger="svc",level="info"} 1' in body
+    assert logger._metrics_server is None
+
+
+# ---------------------------------------------------------------------------
+# Lazy mode
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_import_monitoring_does_not_import_structlog():
+    """import monitoring만으로는 structlog와 핸들러 모듈을 불러오지 않는다."""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys; import monitoring; "
+        "print(any(m in sys.modules for m in ('structlog', 'monitoring.logger', 'logging.handlers')))"
+    )
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    assert result.stdout.strip() == "False"
+
+
+@pytest.mark.unit
+def test_lazy_mode_defers_directory_and_files(tmp_path):
+    """lazy=True면 생성 시 log_dir과 파일을 만들지 않고 첫 이벤트 때 필요한 파일만 연다."""
+    log_dir = tmp_path / "logs"
+    StructuredLogger(name="app", config={"log_dir": str(log_dir), "outputs": ["file"], "lazy": True})
+    assert not log_dir.exists()
+
+    structlog.get_logger("svc").info("hello")
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    assert sorted(p.name for p in log_dir.iterdir()) == ["app.log"]
+    assert json.loads((log_dir / "app.log").read_text(encoding="utf-8"))["event"] == "hello"
+
+
+@pytest.mark.unit
+def test_lazy_mode_attaches_real_handlers_once(tmp_path):
+    """첫 이벤트 이후에는 대리 핸들러가 빠지고 실제 핸들러가 root logger에 붙으며, error.log는 ERROR 때 생긴다."""
+    StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "error_tracking": True, "lazy": True}
+    )
+    log = structlog.get_logger("svc")
+    log.info("first")
+    handlers = list(logging.getLogger().handlers)
+    assert len(handlers) == 2
+    assert all(isinstance(h, RotatingFileHandler) for h in handlers)
+    assert not (tmp_path / "app.error.log").exists()
+
+    log.error("failed")
+    for h in handlers:
+        h.flush()
+    assert logging.getLogger().handlers == handlers
+    assert len((tmp_path / "app.log").read_text(encoding="utf-8").splitlines()) == 2
+    assert '"event": "failed"' in (tmp_path / "app.error.log").read_text(encoding="utf-8")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("outputs", [["file"], ["console", "file"]])
+def test_lazy_mode_writes_first_event_once(tmp_path, capsys, outputs):
+    """첫 이벤트는 대리 핸들러 자리에 붙은 핸들러와 그 뒤의 핸들러에 한 번씩만 전달된다."""
+    StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": outputs, "error_tracking": True, "lazy": True}
+    )
+    other = logging.StreamHandler(open(os.devnull, "w"))  # noqa: SIM115
+    records = []
+    other.emit = records.append
+    logging.getLogger().addHandler(other)
+
+    structlog.get_logger("svc").error("first")
+    for h in logging.getLogger().handlers:
+        h.flush()
+    logging.getLogger().removeHandler(other)
+    other.stream.close()
+
+    assert len(records) == 1
+    assert capsys.readouterr().out.count("first") == ("console" in outputs)
+    assert len((tmp_path / "app.log").read_text(encoding="utf-8").splitlines()) == 1
+    assert len((tmp_path / "app.error.log").read_text(encoding="utf-8").splitlines()) == 1
+
+
+@pytest.mark.unit
+def test_lazy_mode_concurrent_first_events(tmp_path):
+    """여러 스레드가 동시에 첫 이벤트를 남겨도 모두 실제 핸들러에 한 번씩 기록된다."""
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "lazy": True})
+    placeholder = logging.getLogger().handlers[0]
+    log = structlog.get_logger("svc")
+    barrier = threading.Barrier(8)
+
+    def first(i):
+        barrier.wait()
+        log.info("first", i=i)
+
+    with placeholder.lock:
+        # 대리 핸들러 lock을 잡아 둬 모든 스레드가 교체 전에 그 핸들러까지 들어오게 한다
+        threads = [threading.Thread(target=first, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+    for thread in threads:
+        thread.join()
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    assert sorted(e["i"] for e in _read_events(tmp_path / "app.log")) == list(range(8))
+
+
+@pytest.mark.unit
+def test_lazy_mode_with_async(tmp_path):
+    """lazy 모드와 async 모드를 함께 쓰면 첫 이벤트 때 큐와 리스너가 만들어진다."""
+    logger = StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "lazy": True, "async": True}
+    )
+    assert logger._listener is None
+
+    log = structlog.get_logger("svc")
+    for i in range(10):
+        log.info("tick", i=i)
+    assert logger._listener is not None
+    logger.shutdown()
+
+    assert len((tmp_path / "app.log").read_text(encoding="utf-8").splitlines()) == 10
+
+
+# ---------------------------------------------------------------------------
+# 로거 이름별 레벨
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def clear_named_levels():
+    """테스트가 지정한 이름별 로거 레벨을 지운다."""
+    yield
+    for name in ("svc", "svc.db"):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+
+@pytest.mark.unit
+def test_log_levels_enable_debug_for_one_logger(tmp_path, clear_named_levels, monkeypatch):
+    """log_levels와 LOG_LEVELS 환경 변수로 지정한 로거만 DEBUG를 기록한다."""
+    monkeypatch.setenv("LOG_LEVELS", "svc.db=DEBUG")
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "log_levels": {"svc": "ERROR"}})
+    structlog.get_logger("svc.db").debug("query")
+    structlog.get_logger("svc").debug("hidden")
+    structlog.get_logger("svc").warning("hidden")
+    structlog.get_logger("other").debug("hidden")
+    structlog.get_logger("other").info("shown")
+    for h in logging.getLogger().handlers:
+        h.flush()
+
+    events = [json.loads(line)["event"] for line in (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()]
+    assert events == ["query", "shown"]
+
+
+@pytest.mark.unit
+def test_set_level_at_runtime_keeps_handlers(tmp_path, clear_named_levels, monkeypatch):
+    """set_level로 레벨을 바꿔도 핸들러는 그대로이고 캐시된 로거가 바로 따른다."""
+    monkeypatch.delenv("LOG_LEVELS", raising=False)
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"]})
+    handlers = list(logging.getLogger().handlers)
+    log = structlog.get_logger("svc")
+    log.debug("before")
+
+    logger.set_level("svc", "DEBUG")
+    log.debug("after")
+    logger.set_level("svc", None)
+    log.debug("cleared")
+    for h in handlers:
+        h.flush()
+
+    assert logging.getLogger().handlers == handlers
+    events = [json.loads(line)["event"] for line in (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()]
+    assert events == ["after"]
+
+
+@pytest.mark.unit
+def test_setup_logging_resets_removed_log_levels(tmp_path, clear_named_levels, monkeypatch):
+    """log_levels에서 뺀 로거는 setup_logging()을 다시 부르면 기본 레벨로 돌아간다."""
+    monkeypatch.delenv("LOG_LEVELS", raising=False)
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "log_levels": {"svc.db": "DEBUG"}})
+    assert logging.getLogger("svc.db").isEnabledFor(logging.DEBUG)
+
+    logger.config["log_levels"] = {}
+    logger.setup_logging()
+    assert not logging.getLogger("svc.db").isEnabledFor(logging.DEBUG)
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path), "log_levels": {"svc": "DEBUG"}})
+    StructuredLogger(name="app", config={"log_dir": str(tmp_path)})
+    assert logging.getLogger("svc").level == logging.NOTSET
+
+
+@pytest.mark.unit
+def test_levels_file_reloaded(tmp_path, clear_named_levels, monkeypatch):
+    """log_levels_file을 고친 뒤 reload_levels()를 부르면 새 레벨이 적용된다."""
+    monkeypatch.delenv("LOG_LEVELS", raising=False)
+    levels_file = tmp_path / "levels.json"
+    levels_file.write_text(json.dumps({"svc": "WARNING"}))
+    logger = StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": [],
+            "log_levels_file": str(levels_file),
+            "log_levels_poll_interval": 0,
+        },
+    )
+    assert logging.getLogger("svc").level == logging.WARNING
+
+    levels_file.write_text(json.dumps({"svc": "DEBUG"}))
+    assert logger.reload_levels() == {"svc": logging.DEBUG}
+    assert logging.getLogger("svc").level == logging.DEBUG
+
+
+# ---------------------------------------------------------------------------
+# asyncio 모드
+# ---------------------------------------------------------------------------
+
+
+def _read_events(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.mark.unit
+async def test_asyncio_mode_async_methods_skip_executor(tmp_path, monkeypatch):
+    """asyncio 모드의 ainfo() 등은 run_in_executor를 쓰지 않고 큐에 넣으며, drain()이 기록을 기다린다."""
+    import asyncio
+
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "asyncio": True})
+    loop = asyncio.get_running_loop()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("run_in_executor가 호출되었습니다")
+
+    monkeypatch.setattr(loop, "run_in_executor", fail)
+    log = structlog.get_logger("svc")
+    await log.ainfo("request", path="/health")
+    await log.adebug("hidden")
+    await log.alog(logging.WARNING, "slow", ms=1200)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        await log.aexception("failed")
+    monkeypatch.undo()
+
+    await logger.drain(timeout=5)
+    events = _read_events(tmp_path / "app.log")
+    assert [e["event"] for e in events] == ["request", "slow", "failed"]
+    assert events[1]["level"] == "warning"
+    assert events[2]["exception"][0]["exc_type"] == "ValueError"
+    logger.shutdown()
+
+
+@pytest.mark.unit
+async def test_asyncio_mode_captures_contextvars_per_task(tmp_path):
+    """동시에 실행되는 태스크마다 바인딩한 contextvars가 각자의 이벤트에 들어간다."""
+    import asyncio
+
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "asyncio": True})
+    log = structlog.get_logger("svc")
+
+    async def handle(request_id: str) -> None:
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        for step in range(5):
+            await log.ainfo("step", step=step, expected=request_id)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(handle(f"req-{i}") for i in range(4)))
+    await logger.drain(timeout=5)
+    logger.shutdown()
+
+    events = _read_events(tmp_path / "app.log")
+    assert len(events) == 20
+    assert all(e["request_id"] == e["expected"] for e in events)
+
+
+@pytest.mark.unit
+def test_asyncio_mode_overflow_defaults_to_drop_newest(tmp_path):
+    """asyncio 모드는 overflow를 지정하지 않으면 이벤트 루프를 막지 않도록 drop_newest를 쓴다."""
+    for config, expected in (
+        ({"asyncio": True}, "drop_newest"),
+        ({"asyncio": True, "overflow": "block"}, "block"),
+        ({"async": True}, "block"),
+    ):
+        logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": [], **config})
+        assert logger._queue_handler.overflow == expected
+        logger.shutdown()
+
+
+@pytest.mark.unit
+async def test_drain_flushes_buffered_handlers_without_queue(tmp_path):
+    """큐를 쓰지 않는 모드에서도 drain()은 버퍼에 남은 줄을 파일에 쓴다."""
+    logger = StructuredLogger(name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "flush_interval": 0})
+    structlog.get_logger("svc").info("buffered")
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == ""
+
+    await logger.drain()
+    assert [e["event"] for e in _read_events(tmp_path / "app.log")] == ["buffered"]
+
+
+# ---------------------------------------------------------------------------
+# binary 형식
+# ---------------------------------------------------------------------------
+
+
+def _log_sample_events() -> None:
+    log = structlog.get_logger("svc")
+    structlog.contextvars.bind_contextvars(request_id="req-1")
+    try:
+        log.info("request handled", path="/items", status=200, elapsed=0.25)
+        log.warning("slow query", sql="SELECT 1", rows=[1, 2, 3], extra={"한글": "값"})
+        try:
+            raise ZeroDivisionError("division by zero")
+        except ZeroDivisionError:
+            log.exception("failed")
+    finally:
+        structlog.contextvars.clear_contextvars()
+
+
+@pytest.mark.unit
+def test_binary_format_round_trips_to_json_lines(tmp_path):
+    """format=binary 세그먼트를 변환한 JSON lines는 format=json 파일과 timestamp 외에 같다."""
+    from monitoring.binlog import read_segment
+
+    logs = {}
+    for fmt in ("json", "binary"):
+        log_dir = tmp_path / fmt
+        logger = StructuredLogger(name="app", config={"log_dir": str(log_dir), "outputs": ["file"], "format": fmt})
+        _log_sample_events()
+        logger.shutdown()
+        for h in logging.getLogger().handlers:
+            h.close()
+        logs[fmt] = log_dir
+
+    json_lines = (logs["json"] / "app.log").read_text(encoding="utf-8").splitlines()
+    binary_events = list(read_segment(str(logs["binary"] / "app.logb")))
+    assert not (logs["binary"] / "app.log").exists()
+    assert len(binary_events) == len(json_lines) == 3
+
+    for line, event in zip(json_lines, binary_events, strict=True):
+        expected = json.loads(line)
+        # 실행 시각만 다르다. binary는 timestamp를 같은 ISO 문자열로 되돌린다
+        assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d{6})?", event.pop("timestamp"))
+        expected.pop("timestamp")
+        assert event == expected
+
+    error_events = list(read_segment(str(logs["binary"] / "app.error.logb")))
+    assert [e["event"] for e in error_events] == ["failed"]
+
+
+@pytest.mark.unit
+def test_binary_format_segments_decode_after_rotation(tmp_path):
+    """로테이션·압축된 세그먼트도 각각 헤더부터 시작하므로 따로 읽을 수 있다."""
+    from monitoring.binlog import read_segment
+
+    logger = StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["file"],
+            "format": "binary",
+            "max_file_size": 2048,
+            "buffer_size": 0,
+            "compression": "gzip",
+            "error_tracking": False,
+        },
+    )
+    log = structlog.get_logger("svc")
+    for i in range(200):
+        log.info("tick", i=i, payload="x" * 20)
+    handler = logging.getLogger().handlers[0]
+    handler.close()
+    handler._archiver.stop()
+    logger.shutdown()
+
+    segments = [*tmp_path.glob("app.logb.*.gz"), tmp_path / "app.logb"]
+    assert len(segments) > 2
+    seen = []
+    for path in segments:
+        numbers = [e["i"] for e in read_segment(str(path))]
+        assert numbers == list(range(numbers[0], numbers[0] + len(numbers)))
+        seen += numbers
+    # backup_count만큼만 남으므로 남은 세그먼트의 이벤트는 마지막 이벤트까지 끊김 없이 이어진다
+    assert sorted(seen) == list(range(200 - len(seen), 200))
+
+
+@pytest.mark.unit
+def test_binary_format_rejects_central_mode(tmp_path):
+    """binary 형식은 중앙 writer 모드와 함께 쓸 수 없다."""
+    with pytest.raises(ValueError, match="binary"):
+        StructuredLogger(name="app", config={"log_dir": str(tmp_path), "format": "binary", "multiprocess": "central"})
+
+
+# ---------------------------------------------------------------------------
+# Local index search
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_index_config_makes_rotated_files_searchable(tmp_path):
+    """index=True면 로테이션된 파일마다 인덱스를 만들고, search()로 활성 파일까지 바인딩 필드로 찾는다."""
+    from monitoring.logindex import has_index, search
+
+    logger = StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["file"],
+            "max_file_size": 1024,
+            "buffer_size": 0,
+            "error_tracking": False,
+            "index": True,
+            "index_keys": ["request_id"],
+        },
+    )
+    log = structlog.get_logger("svc")
+    for i in range(40):
+        log.info("tick", i=i, request_id=f"req-{i}")
+    handler = logging.getLogger().handlers[0]
+    handler.close()
+    logger.shutdown()
+
+    segments = [p for p in tmp_path.glob("app.log.*") if p.suffix != ".idx"]
+    assert segments
+    assert all(has_index(str(p)) for p in segments)
+    assert [e["i"] for e in search(tmp_path / "app.log", request_id="req-7")] == [7]
+    assert [e["i"] for e in search(tmp_path / "app.log", request_id="req-39")] == [39]
+
+
+@pytest.mark.unit
+def test_index_requires_json_format(tmp_path):
+    """인덱스는 JSON lines 파일만 읽으므로 다른 format과 함께 쓸 수 없다."""
+    with pytest.raises(ValueError, match="index"):
+        StructuredLogger(name="app", config={"log_dir": str(tmp_path), "format": "text", "index": True})
+
+
+# ---------------------------------------------------------------------------
+# Flight recorder
+# ---------------------------------------------------------------------------
+
+
+def _flight_recorder_logger(tmp_path, **config) -> StructuredLogger:
+    return StructuredLogger(
+        name="app",
+        config={"log_dir": str(tmp_path), "outputs": ["file"], "buffer_size": 0, "flight_recorder": 3, **config},
+    )
+
+
+@pytest.mark.unit
+def test_flight_recorder_writes_recent_events_before_error(tmp_path):
+    """INFO 레벨에서도 최근 DEBUG 이벤트를 보관했다가 ERROR 바로 앞에 error 파일에만 기록한다."""
+    _flight_recorder_logger(tmp_path)
+    log = structlog.get_logger("svc").bind(job="sync")
+    for i in range(5):
+        log.debug("step %d", i, i=i)
+    log.info("halfway")
+    log.error("failed")
+
+    errors = _read_events(tmp_path / "app.error.log")
+    assert [e["event"] for e in errors] == ["step 3", "step 4", "halfway", "failed"]
+    assert [e.get("flight_recorder") for e in errors] == [True, True, True, None]
+    assert errors[0]["job"] == "sync" and errors[0]["level"] == "debug" and errors[0]["logger"] == "svc"
+    assert errors[0]["timestamp"] < errors[-1]["timestamp"]
+    # 주 파일에는 DEBUG가 기록되지 않는다
+    assert [e["event"] for e in _read_events(tmp_path / "app.log")] == ["halfway", "failed"]
+
+    # 덤프한 이벤트는 다시 쓰지 않는다
+    log.error("again")
+    assert [e["event"] for e in _read_events(tmp_path / "app.error.log")][-1:] == ["again"]
+    assert len(_read_events(tmp_path / "app.error.log")) == 5
+
+
+@pytest.mark.unit
+def test_flight_recorder_keeps_buffers_per_context(tmp_path):
+    """flight_recorder_key를 지정하면 그 컨텍스트 값이 같은 이벤트만 ERROR와 함께 기록한다."""
+    _flight_recorder_logger(tmp_path, flight_recorder_key="request_id")
+    log = structlog.get_logger("svc")
+    with structlog.contextvars.bound_contextvars(request_id="a"):
+        log.debug("a1")
+    with structlog.contextvars.bound_contextvars(request_id="b"):
+        log.debug("b1")
+    log.bind(request_id="a").debug("a2")
+    with structlog.contextvars.bound_contextvars(request_id="a"):
+        log.error("a failed")
+
+    errors = _read_events(tmp_path / "app.error.log")
+    assert [(e["event"], e["request_id"]) for e in errors] == [("a1", "a"), ("a2", "a"), ("a failed", "a")]
+
+
+@pytest.mark.unit
+def test_flight_recorder_key_with_unhashable_value(tmp_path):
+    """flight_recorder_key 값이 dict처럼 해시할 수 없어도 로깅 호출은 예외를 내지 않고 같은 값끼리 묶인다."""
+    _flight_recorder_logger(tmp_path, flight_recorder_key="user")
+    log = structlog.get_logger("svc")
+    log.debug("state", user={"id": 1})
+    log.debug("other", user={"id": 2})
+    log.error("failed", user={"id": 1})
+
+    assert [e["event"] for e in _read_events(tmp_path / "app.error.log")] == ["state", "failed"]
+
+
+@pytest.mark.unit
+def test_flight_recorder_in_async_mode(tmp_path):
+    """async 모드에서도 ERROR 이전에 호출한 이벤트만 ERROR 앞에 기록한다."""
+    logger = _flight_recorder_logger(tmp_path, **{"async": True})
+    log = structlog.get_logger("svc")
+    log.debug("before")
+    log.error("failed")
+    logger.shutdown()
+
+    assert [e["event"] for e in _read_events(tmp_path / "app.error.log")] == ["before", "failed"]
+
+
+@pytest.mark.unit
+def test_flight_recorder_requires_error_file(tmp_path):
+    """error 파일이 없으면 보관한 이벤트를 쓸 곳이 없으므로 ValueError를 던진다."""
+    with pytest.raises(ValueError, match="flight_recorder"):
+        _flight_recorder_logger(tmp_path, error_tracking=False)
+    with pytest.raises(ValueError, match="flight_recorder"):
+        _flight_recorder_logger(tmp_path, outputs=["console"])
+
+
+# ---------------------------------------------------------------------------
+# Traceback deduplication
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_traceback_window_deduplicates_exceptions(tmp_path):
+    """traceback_window 안의 같은 예외는 처음만 전체 traceback을 남기고, 종료 시 생략한 개수를 요약한다."""
+    logger = StructuredLogger(
+        name="app", config={"log_dir": str(tmp_path), "outputs": ["file"], "buffer_size": 0, "traceback_window": 60}
+    )
+    log = structlog.get_logger("svc")
+    for i in range(3):
+        try:
+            raise ValueError(f"boom {i}")
+        except ValueError:
+            log.exception("request failed", attempt=i)
+    logger.shutdown()
+
+    first, second, third, summary = _read_events(tmp_path / "app.error.log")
+    assert first["exception"][0]["exc_type"] == "ValueError"
+    assert "exception" not in second and "exception" not in third
+    assert second["exception_id"] == first["exception_id"] == summary["exception_id"]
+    assert third["exception_count"] == 3
+    assert third["exception_message"] == "ValueError: boom 2"
+    assert (summary["event"], summary["repeated"]) == ("exception summary", 2)
+
+
+@pytest.mark.unit
+def test_traceback_summary_does_not_dump_flight_recorder(tmp_path):
+    """traceback 요약(ERROR)은 flight recorder에 보관한 DEBUG 이벤트를 덤프하지 않는다."""
+    logger = _flight_recorder_logger(tmp_path, error_tracking=True, traceback_window=60)
+    log = structlog.get_logger("svc")
+    log.debug("before")
+    for _ in range(2):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("request failed")
+    log.debug("unrelated")
+    logger.shutdown()
+
+    events = [e["event"] for e in _read_events(tmp_path / "app.error.log")]
+    assert events == ["before", "request failed", "request failed", "exception summary"]
+
+
+# ---------------------------------------------------------------------------
+# Log-derived metrics
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_derived_metrics_aggregate_and_downsample(tmp_path):
+    """derived_metrics 규칙은 버려진 이벤트까지 집계하고, /metrics와 종료 시 구간 집계 이벤트로 내보낸다."""
+    logger = StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["file"],
+            "buffer_size": 0,
+            "metrics": True,
+            "derived_metrics": [
+                {"name": "http_requests", "event": "request completed", "labels": ["status"], "sample": 0},
+                {"name": "http_request_duration_ms", "type": "histogram", "event": "request completed", "field": "ms"},
+            ],
+        },
+    )
+    log = structlog.get_logger("app.http")
+    for i in range(10):
+        log.info("request completed", status=200 if i % 5 else 500, ms=i * 20)
+    log.info("request started")
+
+    assert logger.derived.snapshot()["http_requests"] == [
+        {"labels": {"status": 500}, "value": 2},
+        {"labels": {"status": 200}, "value": 8},
+    ]
+    text = logger.metrics.prometheus_text()
+    assert 'http_requests_total{status="200"} 8' in text
+    assert "logging_derived_downsampled_events_total 10" in text
+    logger.shutdown()
+
+    events = _read_events(tmp_path / "app.log")
+    assert [e["event"] for e in events] == ["request started", *["derived metric"] * 3]
+    assert events[-1]["metric"] == "http_request_duration_ms"
+    assert (events[-1]["count"], events[-1]["sum"], events[-1]["buckets"]["100"]) == (10, 900, 6)
+
+
+# ---------------------------------------------------------------------------
+# Bound context cache
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("serializer", ["json", "orjson"])
+def test_context_cache_keeps_json_keys(tmp_path, capsys, serializer):
+    """context_cache를 켜도 JSON 줄의 키와 값은 같고, 콘솔 출력에도 bind_context() 필드가 합쳐진다."""
+    from monitoring.context import bound_context
+
+    StructuredLogger(
+        name="app",
+        config={
+            "log_dir": str(tmp_path),
+            "outputs": ["console", "file"],
+            "buffer_size": 0,
+            "serializer": serializer,
+            "context_cache": True,
+        },
+    )
+    log = structlog.get_logger("app.http")
+    with bound_context(service="checkout", request_id="req-1"):
+        log.info("request completed", status=200)
+        log.info("request completed", request_id="override")
+        logging.getLogger("stdlib").warning("foreign")
+    log.info("outside")
+
+    events = _read_events(tmp_path / "app.log")
+    assert [(e["event"], e.get("service"), e.get("request_id")) for e in events] == [
+        ("request completed", "checkout", "req-1"),
+        ("request completed", "checkout", "override"),
+        ("foreign", "checkout", "req-1"),
+        ("outside", None, None),
+    ]
+    assert events[0]["status"] == 200 and {"logger", "level", "timestamp"} <= events[0].keys()
+    assert not any("_bound_context" in e for e in events)
+    out = capsys.readouterr().out
+    assert "req-1" in out and "checkout" in out and "_bound_context" not in out
+
+
+@pytest.mark.unit
+def test_context_cache_flight_recorder_key(tmp_path):
+    """flight_recorder_key는 bind_context()로 묶은 값으로도 버퍼를 나눈다."""
+    from monitoring.context import bound_context
+
+    _flight_recorder_logger(tmp_path, flight_recorder_key="request_id", context_cache=True)
+    log = structlog.get_logger("svc")
+    with bound_context(request_id="a"):
+        log.debug("a1")
+    with bound_context(request_id="b"):
+        log.debug("b1")
+        log.error("b failed")
+
+    errors = _read_events(tmp_path / "app.error.log")
+    assert [(e["event"], e["request_id"]) for e in errors] == [("b1", "b"), ("b failed", "b")]
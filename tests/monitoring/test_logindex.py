@@ -0,0 +1,147 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from monitoring.archive import SegmentArchiver, index_path
+from monitoring.handlers import BufferedRotatingFileHandler
+from monitoring.logindex import _Query, build_index, has_index, load_index, main, search
+
+LEVELS = ("debug", "info", "info", "warning", "error")
+
+
+def _event(i: int) -> dict:
+    return {
+        "event": f"request {i}",
+        "logger": "app.db" if i % 3 == 0 else "app.http",
+        "level": LEVELS[i % len(LEVELS)],
+        "timestamp": f"2026-10-18T09:{i // 60:02d}:{i % 60:02d}.{i + 1:06d}",
+        "request_id": f"req-{i}",
+        "user_id": i % 7,
+    }
+
+
+def _write(path, events) -> None:
+    path.write_text("".join(json.dumps(e) + "\n" for e in events), encoding="utf-8")
+
+
+@pytest.fixture
+def segment(tmp_path):
+    """이벤트 600개를 담은 로테이션된 세그먼트와 작은 블록으로 만든 인덱스."""
+    path = tmp_path / "app.log.1"
+    _write(path, [_event(i) for i in range(600)])
+    build_index(str(path), ["request_id"], block_size=2048)
+    return path
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "query",
+    [
+        {},
+        {"since": "2026-10-18T09:03", "until": "2026-10-18T09:05:30"},
+        {"level": "warning"},
+        {"logger": "app.db", "level": "ERROR"},
+        {"logger": "app"},
+        {"request_id": "req-421"},
+        {"request_id": "req-none"},
+        {"user_id": "3", "since": "2026-10-18T09:08"},
+    ],
+)
+def test_search_matches_full_scan(tmp_path, segment, query):
+    """인덱스로 찾은 결과는 모든 줄을 읽어 거른 결과와 같다."""
+    events = [_event(i) for i in range(600)]
+    expected = [e for e in events if _Query(**_split(query)).matches(e)]
+    assert list(search(tmp_path / "app.log", **query)) == expected
+
+
+def _split(query: dict) -> dict:
+    names = ("since", "until", "level", "logger")
+    return {name: query.get(name) for name in names} | {"fields": {k: v for k, v in query.items() if k not in names}}
+
+
+@pytest.mark.unit
+def test_query_reads_only_candidate_blocks(segment):
+    """시간 범위, level posting, bloom filter로 읽을 블록을 줄인다."""
+    index = load_index(str(segment))
+    total = len(index["blocks"])
+    assert total > 20
+
+    def blocks(**query):
+        return len(_Query(**_split(query)).blocks(index))
+
+    assert blocks() == total
+    # bloom filter는 오탐이 있을 수 있으므로 대부분의 블록을 건너뛰는지만 확인한다
+    assert blocks(request_id="req-421") < total // 5
+    assert blocks(since="2026-10-18T09:09:59") == 1
+    assert blocks(level="critical") == 0
+
+
+@pytest.mark.unit
+def test_compressed_segment_uses_index(tmp_path):
+    """압축 전에 만든 인덱스를 압축된 세그먼트 검색에도 쓴다."""
+    path = tmp_path / "app.log.20261018-090000"
+    _write(path, [_event(i) for i in range(300)])
+    archiver = SegmentArchiver("gzip", index_keys=["request_id"])
+    archiver.process(str(tmp_path / "app.log"))
+
+    assert (tmp_path / "app.log.20261018-090000.gz").exists()
+    assert has_index(str(tmp_path / "app.log.20261018-090000.gz"))
+    assert list(search(tmp_path / "app.log", request_id="req-123")) == [_event(123)]
+
+
+@pytest.mark.unit
+def test_stale_index_is_ignored(tmp_path, segment):
+    """세그먼트 내용이 인덱스와 달라지면 인덱스를 쓰지 않고 전체를 읽는다."""
+    _write(segment, [_event(i) for i in range(1000, 1010)])
+    assert load_index(str(segment)) is None
+    assert list(search(tmp_path / "app.log", request_id="req-1005")) == [_event(1005)]
+
+
+@pytest.mark.unit
+def test_search_includes_active_file_and_skips_broken_lines(tmp_path, segment):
+    """활성 파일도 검색하고, JSON이 아닌 줄이나 잘린 마지막 줄은 건너뛴다."""
+    (tmp_path / "app.log").write_text(json.dumps(_event(900)) + '\nplain text\n{"event": "cut', encoding="utf-8")
+
+    assert list(search(tmp_path / "app.log", since="2026-10-18T09:14"))[-1] == _event(900)
+    assert list(search(tmp_path / "app.log", include_active=False, since="2026-10-18T09:14")) == []
+
+
+@pytest.mark.unit
+def test_handler_indexes_numbered_segments(tmp_path):
+    """index_keys를 지정한 핸들러는 로테이션된 {name}.log.N마다 맞는 인덱스를 남긴다."""
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, maxBytes=2000, backupCount=5, buffer_size=0, index_keys=["request_id"])
+    for i in range(100):
+        handler.write_raw((json.dumps(_event(i)) + "\n").encode())
+        handler._archiver.join()
+    handler.close()
+
+    segments = [str(p) for p in tmp_path.iterdir() if p.name.startswith("app.log.") and not p.name.endswith(".idx")]
+    assert len(segments) == 5
+    assert all(has_index(s) for s in segments)
+    assert list(search(path, request_id="req-99")) == [_event(99)]
+    assert [e["request_id"] for e in search(path, logger="app.db")][-1] == "req-99"
+
+
+@pytest.mark.unit
+def test_cli_searches_and_builds(tmp_path, capsys):
+    """CLI는 --build로 인덱스를 만들고, KEY=VALUE 조건으로 찾은 이벤트를 JSON lines로 출력한다."""
+    path = tmp_path / "app.log.1"
+    with gzip.open(tmp_path / "app.log.2.gz", "wt", encoding="utf-8") as f:
+        f.writelines(json.dumps(_event(i)) + "\n" for i in range(50))
+    _write(path, [_event(i) for i in range(50, 60)])
+    log_file = str(tmp_path / "app.log")
+
+    assert main([log_file, "--build", "--key", "request_id"]) == 0
+    assert sorted(capsys.readouterr().out.split()) == sorted(
+        [index_path(str(path)), index_path(str(tmp_path / "app.log.2.gz"))]
+    )
+    assert os.path.exists(tmp_path / "app.log.2.idx")
+
+    assert main([log_file, "request_id=req-56", "--level", "info"]) == 0
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == [_event(56)]
+
+    with pytest.raises(SystemExit):
+        main([log_file, "request_id"])
@@ -0,0 +1,258 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from tests.helpers import EventFormatter, event_record
+
+from monitoring.loki import LokiHandler
+
+
+class _FakeLoki:
+    """/loki/api/v1/push를 흉내 내는 로컬 HTTP 서버. statuses 순서대로 응답하고 이후에는 204를 돌려준다."""
+
+    def __init__(self):
+        self.pushes: list[dict] = []
+        self.headers: list[dict] = []
+        self.statuses: list[int] = []
+        self.delay = 0.0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(fake.delay)
+                status = fake.statuses.pop(0) if fake.statuses else 204
+                if status == 204:
+                    fake.headers.append(dict(self.headers))
+                    fake.pushes.append(json.loads(gzip.decompress(body)))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/loki/api/v1/push"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def lines(self) -> list[str]:
+        return [value[1] for push in self.pushes for stream in push["streams"] for value in stream["values"]]
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def loki():
+    server = _FakeLoki()
+    yield server
+    server.stop()
+
+
+def _handler(url: str, **kwargs) -> LokiHandler:
+    kwargs.setdefault("batch_wait", 60)
+    kwargs.setdefault("backoff", 0.001)
+    handler = LokiHandler(url=url, **kwargs)
+    handler.setFormatter(EventFormatter())
+    return handler
+
+
+@pytest.mark.unit
+def test_invalid_url_scheme_raises():
+    """http/https가 아닌 URL을 지정하면 ValueError가 발생한다."""
+    with pytest.raises(ValueError, match="Loki URL"):
+        LokiHandler(url="ftp://localhost/loki/api/v1/push")
+
+
+@pytest.mark.unit
+def test_push_groups_streams_by_level_and_logger(loki):
+    """level/logger 레이블별로 스트림을 묶고, gzip으로 압축해 한 요청으로 보낸다."""
+    handler = _handler(loki.url, labels={"service": "app"})
+    handler.handle(event_record("a", "info", "svc"))
+    handler.handle(event_record("b", "error", "svc"))
+    handler.handle(event_record("c", "info", "svc"))
+    handler.flush()
+    handler.close()
+
+    assert len(loki.pushes) == 1
+    assert loki.headers[0]["Content-Encoding"] == "gzip"
+    streams = {tuple(sorted(s["stream"].items())): [v[1] for v in s["values"]] for s in loki.pushes[0]["streams"]}
+    assert streams == {
+        (("level", "info"), ("logger", "svc"), ("service", "app")): ['{"event": "a"}', '{"event": "c"}'],
+        (("level", "error"), ("logger", "svc"), ("service", "app")): ['{"event": "b"}'],
+    }
+    assert handler.sent == 3
+
+
+@pytest.mark.unit
+def test_batches_split_by_batch_size(loki):
+    """batch_size를 넘는 이벤트는 여러 요청으로 나눠 보낸다."""
+    handler = _handler(loki.url, batch_size=2)
+    for i in range(5):
+        handler.handle(event_record(f"e{i}"))
+    handler.close()
+
+    assert [len(push["streams"][0]["values"]) for push in loki.pushes] == [2, 2, 1]
+    assert loki.lines() == [json.dumps({"event": f"e{i}"}) for i in range(5)]
+
+
+@pytest.mark.unit
+def test_background_thread_pushes_after_batch_wait(loki):
+    """batch_wait초가 지나면 배치가 덜 찼어도 백그라운드 스레드가 전송한다."""
+    handler = _handler(loki.url, batch_wait=0.01)
+    handler.handle(event_record("tick"))
+
+    for _ in range(200):
+        if loki.pushes:
+            break
+        threading.Event().wait(0.01)
+    handler.close()
+
+    assert loki.lines() == ['{"event": "tick"}']
+
+
+@pytest.mark.unit
+def test_retries_retryable_status(loki):
+    """전송 스레드는 429/5xx 응답을 백오프 후 재시도한다."""
+    loki.statuses = [503, 429]
+    handler = _handler(loki.url, batch_wait=0.01)
+    handler.handle(event_record("retry"))
+
+    for _ in range(200):
+        if loki.pushes:
+            break
+        threading.Event().wait(0.01)
+    handler.close()
+
+    assert loki.lines() == ['{"event": "retry"}']
+    assert handler.sent == 1
+
+
+@pytest.mark.unit
+def test_flush_sends_once_without_retry(tmp_path):
+    """flush()는 재시도 없이 한 번만 보내고, 실패한 배치는 바로 spill한다."""
+    handler = _handler("http://127.0.0.1:9/loki/api/v1/push", backoff=10, spill_dir=tmp_path)
+    handler.handle(event_record("unreachable"))
+    started = time.monotonic()
+    handler.flush()
+    handler.close()
+
+    assert time.monotonic() - started < 5
+    assert handler.spilled == 1
+
+
+@pytest.mark.unit
+def test_flush_spills_remaining_batches_after_first_failure(loki, tmp_path):
+    """응답하지 않는 Loki에는 첫 배치만 보내 보고, 실패하면 나머지 배치는 보내지 않고 spill한다."""
+    loki.delay = 1.0
+    handler = _handler(loki.url, batch_size=1, timeout=0.2, spill_dir=tmp_path)
+    for i in range(10):
+        handler.handle(event_record(f"e{i}"))
+    started = time.monotonic()
+    handler.flush()
+
+    assert time.monotonic() - started < 1
+    assert handler.spilled == 10
+    handler.close()
+
+
+@pytest.mark.unit
+def test_flush_under_handler_lock_while_sender_is_busy(loki):
+    """logging.shutdown()처럼 핸들러 lock을 잡고 flush()해도 보내는 중인 전송 스레드와 교착되지 않는다."""
+    loki.delay = 0.02
+    handler = _handler(loki.url, batch_size=10)
+    for i in range(100):
+        handler.handle(event_record(f"e{i}"))
+    for _ in range(200):
+        if handler._send_lock.locked():
+            break
+        threading.Event().wait(0.005)
+
+    def shutdown():
+        handler.acquire()
+        try:
+            handler.flush()
+            handler.close()
+        finally:
+            handler.release()
+
+    thread = threading.Thread(target=shutdown, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert len(loki.lines()) == 100
+
+
+@pytest.mark.unit
+def test_non_retryable_status_drops_batch(loki):
+    """400 같은 응답은 재시도하지 않고 배치를 버린다."""
+    loki.statuses = [400]
+    handler = _handler(loki.url)
+    handler.handle(event_record("bad"))
+    handler.flush()
+    handler.close()
+
+    assert loki.pushes == []
+    assert handler.dropped == 1
+
+
+@pytest.mark.unit
+def test_failed_batches_spill_to_disk_and_replay(loki, tmp_path):
+    """전송에 실패한 배치는 spill_dir에 저장했다가 다음 전송이 성공하면 다시 보낸다."""
+    loki.statuses = [503]
+    handler = _handler(loki.url, max_retries=1, spill_dir=tmp_path / "spill")
+    handler.handle(event_record("spilled"))
+    handler.flush()
+
+    assert handler.spilled == 1
+    assert len(list((tmp_path / "spill").glob("*.json.gz"))) == 1
+
+    handler.handle(event_record("next"))
+    handler.close()
+
+    assert loki.lines() == ['{"event": "next"}', '{"event": "spilled"}']
+    assert list((tmp_path / "spill").glob("*.json.gz")) == []
+
+
+@pytest.mark.unit
+def test_spill_dir_bounded_by_max_bytes(tmp_path):
+    """spill 용량을 넘으면 가장 오래된 배치부터 지운다."""
+    handler = _handler("http://127.0.0.1:9/loki/api/v1/push", max_retries=0, spill_dir=tmp_path, spill_max_bytes=1)
+    handler.handle(event_record("first"))
+    handler.flush()
+    handler.handle(event_record("second"))
+    handler.close()
+
+    assert handler.spilled == 2
+    assert len(list(tmp_path.glob("*.json.gz"))) <= 1
+
+
+@pytest.mark.unit
+def test_failed_batches_without_spill_dir_are_dropped():
+    """spill_dir이 없으면 전송에 실패한 배치는 버려지고 dropped로 집계된다."""
+    handler = _handler("http://127.0.0.1:9/loki/api/v1/push", max_retries=0)
+    handler.handle(event_record("lost"))
+    handler.close()
+
+    assert handler.dropped == 1
+
+
+@pytest.mark.unit
+def test_buffer_overflow_drops_oldest(loki):
+    """메모리 버퍼가 가득 차면 가장 오래된 이벤트를 버린다."""
+    handler = _handler(loki.url, max_buffer=2, batch_size=100)
+    for i in range(4):
+        handler.handle(event_record(f"e{i}"))
+    handler.close()
+
+    assert handler.dropped == 2
+    assert loki.lines() == ['{"event": "e2"}', '{"event": "e3"}']
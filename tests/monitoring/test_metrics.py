@@ -0,0 +1,114 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from monitoring.handlers import BufferedRotatingFileHandler
+from monitoring.metrics import Histogram, LoggerMetrics
+
+
+@pytest.mark.unit
+def test_histogram_snapshot_is_cumulative_in_seconds():
+    """히스토그램 스냅샷은 초 단위 상한별 누적 개수와 합계를 돌려준다."""
+    histogram = Histogram(bounds=(1_000, 10_000))
+    for value in (500, 1_000, 5_000, 50_000):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {"count": 4, "sum": 56_500 / 1e9, "buckets": {1e-06: 2, 1e-05: 3, "+Inf": 4}}
+
+
+@pytest.mark.unit
+def test_timers_count_events_per_logger_and_level():
+    """start_timer/stop_timer는 체인 처리 시간을 기록하고 로거/레벨별 이벤트 수를 센다."""
+    metrics = LoggerMetrics(timing_sample_every=1)
+    for level in ("info", "info", "error"):
+        event = metrics.start_timer(None, level, {"event": "x", "logger": "svc", "level": level})
+        event = metrics.stop_timer(None, level, event)
+        assert "_metrics_start_ns" not in event
+
+    snapshot = metrics.snapshot()
+    assert snapshot["events"] == {"svc": {"info": 2, "error": 1}}
+    assert snapshot["processor_seconds"]["count"] == 3
+
+
+@pytest.mark.unit
+def test_timed_renderer_returns_renderer_output():
+    """timed_renderer로 감싼 렌더러는 결과를 그대로 돌려주고 render_seconds에 시간을 기록한다."""
+    metrics = LoggerMetrics(timing_sample_every=1)
+    render = metrics.timed_renderer("file", lambda _, __, event_dict: event_dict["event"].upper())
+
+    assert render(None, "info", {"event": "ok"}) == "OK"
+    assert metrics.snapshot()["render_seconds"]["file"]["count"] == 1
+
+
+@pytest.mark.unit
+def test_timing_is_sampled_but_events_are_all_counted():
+    """처리 시간은 timing_sample_every개 중 하나만 재고, 이벤트 수는 모두 센다."""
+    metrics = LoggerMetrics(timing_sample_every=4)
+    for _ in range(8):
+        metrics.stop_timer(None, "info", metrics.start_timer(None, "info", {"logger": "svc", "level": "info"}))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["events"] == {"svc": {"info": 8}}
+    assert snapshot["processor_seconds"]["count"] == 2
+
+
+@pytest.mark.unit
+def test_registered_sources_are_read_at_snapshot():
+    """register()로 등록한 값은 스냅샷을 만들 때마다 다시 읽는다."""
+    metrics = LoggerMetrics()
+    counter = {"n": 0}
+    metrics.register("dropped", lambda: counter["n"])
+
+    counter["n"] = 3
+    assert metrics.snapshot()["dropped"] == 3
+
+
+@pytest.mark.unit
+def test_file_handler_records_writes_and_rotations(tmp_path):
+    """파일 핸들러는 metrics에 파일별 기록 바이트 수, 쓰기 지연, 로테이션 횟수를 남긴다."""
+    metrics = LoggerMetrics()
+    handler = BufferedRotatingFileHandler(
+        tmp_path / "app.log", maxBytes=20, backupCount=2, buffer_size=0, metrics=metrics
+    )
+    for _ in range(3):
+        handler.write_raw(b"0123456789\n")
+    handler.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["bytes_written"] == {"app.log": 33}
+    assert snapshot["write_seconds"]["app.log"]["count"] == 3
+    assert snapshot["rotations"] == {"app.log": 2}
+
+
+@pytest.mark.unit
+def test_prometheus_text_format():
+    """prometheus_text()는 카운터와 히스토그램을 Prometheus text 형식으로 내보낸다."""
+    metrics = LoggerMetrics()
+    metrics.register("suppressed", lambda: {"sampled": 2})
+    metrics.stop_timer(None, "info", {"logger": 'a"b', "level": "info", "_metrics_start_ns": 0})
+    metrics.record_write("app.log", 10, 2_000)
+
+    text = metrics.prometheus_text()
+    assert '# TYPE logging_events_total counter\nlogging_events_total{logger="a\\"b",level="info"} 1' in text
+    assert 'logging_write_duration_seconds_bucket{file="app.log",le="2.5e-06"} 1' in text
+    assert 'logging_written_bytes_total{file="app.log"} 10' in text
+    assert 'logging_suppressed_events_total{type="sampled"} 2' in text
+    assert text.endswith("\n")
+
+
+@pytest.mark.unit
+def test_serve_exposes_metrics_endpoint():
+    """serve()로 띄운 서버는 /metrics에서 Prometheus text를 돌려주고 다른 경로는 404다."""
+    metrics = LoggerMetrics()
+    server = metrics.serve(0)
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:  # nosec B310
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert b"logging_events_total" in response.read()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base}/other", timeout=5)  # nosec B310
+    finally:
+        server.shutdown()
+        server.server_close()
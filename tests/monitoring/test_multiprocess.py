@@ -0,0 +1,197 @@
+import json
+import os
+
+import pytest
+from tests.helpers import StaticFormatter, make_record
+
+from monitoring.multiprocess import CentralLogWriter, CentralWriterHandler, ShardedRotatingFileHandler, shard_path
+
+
+@pytest.fixture
+def sock_path(tmp_path_factory):
+    # Unix 소켓 경로 길이 제한(약 108자)을 넘지 않도록 짧은 디렉터리를 쓴다
+    return str(tmp_path_factory.mktemp("s") / "w.sock")
+
+
+@pytest.fixture
+def writer(tmp_path, sock_path):
+    central = CentralLogWriter(tmp_path, sock_path, flush_interval=0, buffer_size=0)
+    central.start()
+    yield central
+    central.stop()
+
+
+# ---------------------------------------------------------------------------
+# shard
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        ("app.log", "app.42.log"),
+        ("app.error.log", "app.42.error.log"),
+        ("my.service.log", "my.service.42.log"),
+        ("app.logb", "app.42.logb"),
+        ("app.error.logb", "app.42.error.logb"),
+    ],
+)
+def test_shard_path_inserts_pid_before_suffix(tmp_path, name, expected):
+    """pid는 .log/.error.log 앞에 들어가므로 Alloy의 *.log glob에 그대로 잡힌다."""
+    assert shard_path(tmp_path / name, pid=42) == str(tmp_path / expected)
+
+
+@pytest.mark.unit
+def test_sharded_handler_writes_to_pid_file(tmp_path):
+    """ShardedRotatingFileHandler는 현재 프로세스의 {name}.{pid}.log에 쓴다."""
+    handler = ShardedRotatingFileHandler(tmp_path / "app.log", buffer_size=0)
+    handler.setFormatter(StaticFormatter("line"))
+    handler.handle(make_record())
+    handler.close()
+
+    assert (tmp_path / f"app.{os.getpid()}.log").read_bytes() == b"line\n"
+    assert not (tmp_path / "app.log").exists()
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork를 지원하지 않는 플랫폼")
+def test_sharded_handler_switches_file_after_fork(tmp_path):
+    """fork 전에 만든 핸들러도 자식 프로세스에서는 자식 pid 파일에 쓰고, 부모의 버퍼는 중복 기록하지 않는다."""
+    handler = ShardedRotatingFileHandler(tmp_path / "app.log", flush_interval=0)
+    handler.setFormatter(StaticFormatter("parent"))
+    handler.handle(make_record())  # 아직 버퍼에만 있는 부모 레코드
+
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - 자식 프로세스
+        try:
+            handler.setFormatter(StaticFormatter("child"))
+            handler.handle(make_record())
+            handler.close()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    handler.close()
+
+    assert (tmp_path / f"app.{os.getpid()}.log").read_bytes() == b"parent\n"
+    assert (tmp_path / f"app.{pid}.log").read_bytes() == b"child\n"
+
+
+def _dead_pid() -> int:
+    import subprocess
+    import sys
+
+    result = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, check=True)
+    return int(result.stdout)
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(os.name != "posix", reason="pid 생존 확인은 POSIX에서만 한다")
+def test_sharded_handler_prunes_shards_of_exited_workers(tmp_path):
+    """retention_age는 끝난 워커가 남긴 shard 파일에도 적용되고, 살아 있는 워커의 파일은 건드리지 않는다."""
+    old = os.stat(tmp_path).st_mtime - 3600
+    dead, recent = _dead_pid(), _dead_pid()
+    files = {
+        "dead": tmp_path / f"app.{dead}.log",
+        "dead_segment": tmp_path / f"app.{dead}.log.1",
+        "dead_error": tmp_path / f"app.{dead}.error.log",
+        "recent": tmp_path / f"app.{recent}.log",
+        "alive": tmp_path / f"app.{os.getppid()}.log",
+    }
+    for name, path in files.items():
+        path.write_bytes(b"line\n")
+        if name != "recent":
+            os.utime(path, (old, old))
+
+    handler = ShardedRotatingFileHandler(tmp_path / "app.log", buffer_size=0, retention_age=60)
+    handler.setFormatter(StaticFormatter("line"))
+    handler.handle(make_record())
+    handler._archiver.join()
+    handler.close()
+
+    assert {name for name, path in files.items() if path.exists()} == {"dead_error", "recent", "alive"}
+    assert (tmp_path / f"app.{os.getpid()}.log").exists()
+
+
+# ---------------------------------------------------------------------------
+# central
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.unit
+def test_central_handler_sends_batches_to_writer(tmp_path, writer):
+    """워커 핸들러가 보낸 배치가 writer의 {name}.log에 기록된다."""
+    handler = CentralWriterHandler("app.log", writer.address, flush_interval=0)
+    handler.setFormatter(StaticFormatter('{"event": "한글"}'))
+
+    for _ in range(3):
+        handler.handle(make_record())
+    handler.close()
+    writer.stop()
+
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == '{"event": "한글"}\n' * 3
+
+
+@pytest.mark.unit
+def test_central_handler_falls_back_to_shard_file_when_writer_is_down(tmp_path, sock_path):
+    """writer에 연결할 수 없으면 배치를 fallback 파일에 기록해 유실을 막는다."""
+    fallback = ShardedRotatingFileHandler(tmp_path / "app.log", delay=True, buffer_size=0)
+    handler = CentralWriterHandler("app.log", sock_path, fallback=fallback, flush_interval=0)
+    handler.setFormatter(StaticFormatter("line"))
+
+    handler.handle(make_record())
+    handler.close()
+
+    assert (tmp_path / f"app.{os.getpid()}.log").read_bytes() == b"line\n"
+
+
+@pytest.mark.unit
+def test_central_handler_without_fallback_reports_error(sock_path, mocker):
+    """fallback이 없으면 전송 실패를 handleError로 알린다."""
+    handler = CentralWriterHandler("app.log", sock_path, buffer_size=0)
+    handler.setFormatter(StaticFormatter("line"))
+    handle_error = mocker.patch.object(handler, "handleError")
+
+    handler.handle(make_record())
+    handler._stop_flusher_thread()
+
+    handle_error.assert_called_once()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("target", ["../escape.log", "app.txt", "sub/app.log"])
+def test_writer_rejects_unsafe_targets(tmp_path, sock_path, target):
+    """writer는 log_dir 바로 아래의 *.log 이름만 허용한다."""
+    central = CentralLogWriter(tmp_path, sock_path)
+    with pytest.raises(ValueError, match="로그 파일 이름"):
+        central.write(target, b"line\n")
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork를 지원하지 않는 플랫폼")
+def test_central_mode_with_forked_workers_loses_no_lines(tmp_path, writer):
+    """여러 워커 프로세스가 동시에 보내도 줄이 섞이거나 유실되지 않는다."""
+    workers, lines_per_worker = 4, 300
+    handler = CentralWriterHandler("app.log", writer.address, buffer_size=512, flush_interval=0)
+
+    pids = []
+    for worker in range(workers):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - 자식 프로세스
+            try:
+                for i in range(lines_per_worker):
+                    handler.setFormatter(StaticFormatter(json.dumps({"worker": worker, "i": i, "pad": "x" * 50})))
+                    handler.handle(make_record())
+                handler.close()
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    handler.close()
+    writer.stop()
+
+    entries = [json.loads(line) for line in (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()]
+    assert len(entries) == workers * lines_per_worker
+    for worker in range(workers):
+        assert [e["i"] for e in entries if e["worker"] == worker] == list(range(lines_per_worker))
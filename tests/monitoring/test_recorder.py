@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+import pytest
+import structlog
+
+from monitoring.levels import LevelCheckedBoundLogger
+from monitoring.recorder import FlightRecorder, make_recording_bound_logger
+
+
+@pytest.fixture
+def recorder():
+    """DEBUG 이벤트를 2개씩 보관하는 recorder와, 그 recorder로 기록하는 바운드 로거 설정."""
+    recorder = FlightRecorder(2, level=logging.DEBUG)
+    structlog.configure(
+        processors=[structlog.testing.LogCapture()],
+        wrapper_class=make_recording_bound_logger(LevelCheckedBoundLogger, recorder),
+        logger_factory=structlog.stdlib.LoggerFactory(),
+    )
+    logging.getLogger("recorder_app").setLevel(logging.INFO)
+    yield recorder
+    logging.getLogger("recorder_app").setLevel(logging.NOTSET)
+    structlog.reset_defaults()
+
+
+def _events(entries: list[tuple]) -> list:
+    return [entry[2] for entry in entries]
+
+
+@pytest.mark.unit
+def test_ring_buffer_keeps_latest_events(recorder):
+    """버퍼는 capacity개까지 최신 이벤트만 남기고 ERROR 이상은 보관하지 않는다."""
+    log = structlog.get_logger("recorder_app")
+    log.debug("one")
+    log.info("two")
+    log.log(logging.WARNING, "three")
+    asyncio.run(log.awarning("four"))
+    log.error("error")
+
+    assert _events(recorder.take({"logger": "recorder_app"}, float("inf"))) == ["three", "four"]
+    assert recorder.take({"logger": "recorder_app"}, float("inf")) == []
+
+
+@pytest.mark.unit
+def test_take_leaves_later_events(recorder):
+    """ERROR 레코드보다 나중에 들어온 이벤트는 다음 ERROR를 위해 버퍼에 남긴다."""
+    log = structlog.get_logger("recorder_app")
+    log.debug("before")
+    until = recorder._buffers["recorder_app"][-1][0]
+    log.debug("after")
+    recorder._buffers["recorder_app"][-1] = (until + 1, *recorder._buffers["recorder_app"][-1][1:])
+
+    assert _events(recorder.take({"logger": "recorder_app"}, until)) == ["before"]
+    assert _events(recorder.take({"logger": "recorder_app"}, until + 1)) == ["after"]
+
+
+@pytest.mark.unit
+def test_render_runs_processors_with_original_time_and_context(recorder):
+    """덤프할 때 기록 당시의 contextvars와 시각으로 processor 체인을 거친다."""
+    recorder.set_processors(
+        [
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=False),
+        ]
+    )
+    with structlog.contextvars.bound_contextvars(request_id="r1"):
+        structlog.get_logger("recorder_app").debug("loaded %s", "cache", size=3)
+    (entry,) = recorder.take({"logger": "recorder_app"}, float("inf"))
+
+    record = recorder.render("recorder_app", entry)
+    assert record.created == entry[0]
+    assert record.levelno == logging.DEBUG
+    assert record.msg == {
+        "size": 3,
+        "event": "loaded cache",
+        "request_id": "r1",
+        "logger": "recorder_app",
+        "level": "debug",
+        "timestamp": record.msg["timestamp"],
+        "flight_recorder": True,
+    }
+
+
+@pytest.mark.unit
+def test_buffers_are_capped_by_max_keys():
+    """키가 max_keys를 넘으면 가장 먼저 만든 버퍼를 버린다."""
+    recorder = FlightRecorder(1, key="request_id", max_keys=2)
+    bound = structlog.get_logger("recorder_app").bind()
+    for request_id in ("a", "b", "c"):
+        recorder.record(bound, logging.DEBUG, "event", (), {"request_id": request_id})
+    assert list(recorder._buffers) == ["b", "c"]
+    with pytest.raises(ValueError):
+        FlightRecorder(0)
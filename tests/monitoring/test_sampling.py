@@ -0,0 +1,176 @@
+import pytest
+import structlog
+from structlog.testing import capture_logs
+
+from monitoring.chain import SUMMARY_KEY
+from monitoring.sampling import EventThrottler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _event(event="tick", level="info", logger="svc") -> dict:
+    return {"event": event, "level": level, "logger": logger}
+
+
+def _passed(throttler: EventThrottler, event_dict: dict) -> bool:
+    try:
+        throttler(None, event_dict["level"], event_dict)
+    except structlog.DropEvent:
+        return False
+    return True
+
+
+@pytest.mark.unit
+def test_sampling_error_level_raises():
+    """ERROR 이상 레벨에 샘플링 비율을 지정하면 ValueError가 발생한다."""
+    with pytest.raises(ValueError, match="error"):
+        EventThrottler(sampling={"debug": 0.1, "ERROR": 0.5})
+
+
+@pytest.mark.unit
+def test_disabled_by_default():
+    """아무 옵션도 주지 않으면 enabled가 False다."""
+    assert not EventThrottler().enabled
+    assert EventThrottler(collapse_window=1).enabled
+
+
+@pytest.mark.unit
+def test_sampling_ratio_zero_drops_and_one_keeps():
+    """비율 0인 레벨은 모두 버리고, 비율 1인 레벨과 지정하지 않은 레벨은 모두 통과한다."""
+    throttler = EventThrottler(sampling={"debug": 0, "info": 1})
+
+    assert not any(_passed(throttler, _event(level="debug")) for _ in range(10))
+    assert all(_passed(throttler, _event(level="info")) for _ in range(10))
+    assert all(_passed(throttler, _event(level="error")) for _ in range(10))
+    assert throttler.suppressed["sampled"] == 10
+
+
+@pytest.mark.unit
+def test_rate_limit_refills_tokens_over_time():
+    """키마다 burst개까지 통과시키고, 이후에는 초당 rate개씩 다시 허용한다."""
+    clock = FakeClock()
+    throttler = EventThrottler(rate=2, burst=3, clock=clock)
+
+    results = [_passed(throttler, _event()) for _ in range(5)]
+    assert results == [True, True, True, False, False]
+
+    clock.now = 1.0  # 1초 동안 토큰 2개가 채워진다
+    results = [_passed(throttler, _event()) for _ in range(3)]
+    assert results == [True, True, False]
+    assert throttler.suppressed["rate_limited"] == 3
+
+
+@pytest.mark.unit
+def test_rate_limit_is_per_event_key():
+    """토큰 버킷은 (logger, level, event) 키별로 따로 관리된다."""
+    throttler = EventThrottler(rate=1, clock=FakeClock())
+
+    assert _passed(throttler, _event("a"))
+    assert not _passed(throttler, _event("a"))
+    assert _passed(throttler, _event("b"))
+    assert _passed(throttler, _event("a", logger="other"))
+
+
+@pytest.mark.unit
+def test_collapse_adds_repeated_to_next_window():
+    """창 안의 중복은 버리고, 창이 끝난 뒤 첫 이벤트에 repeated=N을 붙인다."""
+    clock = FakeClock()
+    throttler = EventThrottler(collapse_window=10, clock=clock)
+
+    first = _event()
+    assert _passed(throttler, first)
+    assert "repeated" not in first
+    for _ in range(4):
+        clock.now += 1
+        assert not _passed(throttler, _event())
+
+    clock.now = 10.0
+    later = _event()
+    assert _passed(throttler, later)
+    assert later["repeated"] == 4
+    assert throttler.suppressed["collapsed"] == 4
+
+
+@pytest.mark.unit
+def test_drain_returns_unreported_repeats():
+    """drain()은 아직 보고하지 않은 중복 개수를 돌려주고 상태를 비운다."""
+    throttler = EventThrottler(collapse_window=10, clock=FakeClock())
+    for _ in range(3):
+        _passed(throttler, _event())
+    _passed(throttler, _event("once"))
+
+    assert throttler.drain() == [("svc", "info", "tick", 2)]
+    assert throttler.drain() == []
+    assert _passed(throttler, _event())  # 상태가 비워졌으므로 다시 기록된다
+
+
+@pytest.mark.unit
+def test_drain_expired_reports_only_finished_windows():
+    """drain(expired_only=True)는 창이 끝난 키만 보고하고, 보고한 개수는 다음 이벤트에 다시 붙지 않는다."""
+    clock = FakeClock()
+    throttler = EventThrottler(collapse_window=10, clock=clock)
+    for _ in range(3):
+        _passed(throttler, _event())
+    clock.now = 5.0
+    _passed(throttler, _event("late"))
+    _passed(throttler, _event("late"))
+
+    clock.now = 11.0
+    assert throttler.drain(expired_only=True) == [("svc", "info", "tick", 2)]
+    assert list(throttler._states) == [("svc", "info", "late")]  # 창이 끝난 키는 지운다
+
+    event_dict = _event()
+    assert _passed(throttler, event_dict) and "repeated" not in event_dict
+    clock.now = 16.0
+    assert throttler.drain(expired_only=True) == [("svc", "info", "late", 1)]
+
+
+@pytest.mark.unit
+def test_max_keys_keeps_unreported_repeats():
+    """max_keys로 상태를 초기화해도 보고하지 않은 중복 개수는 다음 drain()이 돌려준다."""
+    throttler = EventThrottler(collapse_window=10, max_keys=2, clock=FakeClock())
+    for event in ("a", "a", "a", "b", "c"):
+        _passed(throttler, _event(event))
+
+    assert throttler.drain(expired_only=True) == [("svc", "info", "a", 2)]
+
+
+@pytest.mark.unit
+def test_emit_summaries_logs_repeated_event():
+    """emit_summaries()는 중복 요약을 원래 레벨의 repeated=N 이벤트로 기록한다."""
+    throttler = EventThrottler(collapse_window=10, clock=FakeClock())
+    for _ in range(3):
+        _passed(throttler, _event(level="warning"))
+
+    with capture_logs() as logs:
+        throttler.emit_summaries()
+
+    assert logs == [{"event": "tick", "repeated": 2, SUMMARY_KEY: True, "log_level": "warning"}]
+
+
+@pytest.mark.unit
+def test_summary_events_pass_through():
+    """요약 이벤트는 샘플링과 속도 제한에 걸리지 않는다."""
+    throttler = EventThrottler(rate=1, sampling={"debug": 0}, collapse_window=10, clock=FakeClock())
+    assert _passed(throttler, _event(level="warning"))
+    for level in ("debug", "warning"):
+        assert _passed(throttler, {**_event(level=level), "repeated": 3, SUMMARY_KEY: True})
+    assert throttler.suppressed == {"sampled": 0, "rate_limited": 0, "collapsed": 0}
+
+
+@pytest.mark.unit
+def test_max_keys_resets_state():
+    """추적하는 키가 max_keys에 닿으면 상태를 초기화해 메모리가 무한히 늘지 않는다."""
+    throttler = EventThrottler(rate=1, max_keys=2, clock=FakeClock())
+    _passed(throttler, _event("a"))
+    _passed(throttler, _event("b"))
+    _passed(throttler, _event("c"))
+
+    assert len(throttler._states) == 1
+    assert _passed(throttler, _event("a"))  # 초기화로 a의 토큰이 다시 채워졌다
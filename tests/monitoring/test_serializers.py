@@ -0,0 +1,67 @@
+import json
+
+import pytest
+import structlog
+
+from monitoring.serializers import SERIALIZERS, get_serializer
+
+
+@pytest.mark.unit
+def test_unknown_serializer_raises():
+    """지원하지 않는 serializer 이름을 지정하면 ValueError가 발생한다."""
+    with pytest.raises(ValueError, match="serializer"):
+        get_serializer("yaml")
+
+
+@pytest.mark.unit
+def test_json_serializer_returns_str():
+    """json serializer는 표준 라이브러리 json.dumps와 같은 str을 반환한다."""
+    serializer = get_serializer("json")
+    assert serializer({"event": "한글"}) == '{"event": "한글"}'
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+def test_fast_serializers_return_utf8_bytes(name):
+    """orjson/msgspec serializer는 한글을 이스케이프하지 않은 UTF-8 bytes를 반환한다."""
+    pytest.importorskip(name)
+    renderer = structlog.processors.JSONRenderer(serializer=get_serializer(name))
+
+    result = renderer(None, None, {"event": "한글 테스트", "count": 1})
+
+    assert isinstance(result, bytes)
+    assert "한글 테스트".encode() in result
+    assert b"\\u" not in result
+    assert json.loads(result) == {"event": "한글 테스트", "count": 1}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", SERIALIZERS)
+def test_serializers_fall_back_to_repr_for_unknown_types(name):
+    """JSON으로 표현할 수 없는 값은 structlog 기본 fallback(repr)으로 직렬화된다."""
+    if name in ("orjson", "msgspec"):
+        pytest.importorskip(name)
+    renderer = structlog.processors.JSONRenderer(serializer=get_serializer(name))
+
+    class Custom:
+        def __repr__(self):
+            return "<custom>"
+
+    assert json.loads(renderer(None, None, {"value": Custom()})) == {"value": "<custom>"}
+
+
+@pytest.mark.unit
+def test_auto_falls_back_to_stdlib_json(monkeypatch):
+    """auto는 orjson/msgspec이 모두 없으면 표준 라이브러리 json을 사용한다."""
+    import builtins
+
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name in ("orjson", "msgspec"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+
+    assert get_serializer("auto")({"event": "x"}) == '{"event": "x"}'
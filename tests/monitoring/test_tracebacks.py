@@ -0,0 +1,134 @@
+import sys
+
+import pytest
+import structlog
+from structlog.testing import LogCapture
+
+from monitoring.tracebacks import TracebackDeduplicator, fingerprint
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fail(value: int) -> None:
+    raise ValueError(f"bad value {value}")
+
+
+def _fail_other() -> None:
+    raise ValueError("bad value")
+
+
+def _caught(func, *args) -> BaseException:
+    try:
+        func(*args)
+    except ValueError as exc:
+        return exc
+    raise AssertionError("예외가 발생하지 않았다")
+
+
+@pytest.mark.unit
+def test_fingerprint_ignores_message_but_not_location():
+    """메시지가 달라도 같은 위치의 예외는 같은 id이고, 다른 위치나 원인 예외가 다르면 다른 id다."""
+    first, second = _caught(_fail, 1), _caught(_fail, 2)
+    assert fingerprint(first) == fingerprint(second)
+    assert len(fingerprint(first)) == 12
+    assert fingerprint(_caught(_fail_other)) != fingerprint(first)
+
+    try:
+        try:
+            _fail(1)
+        except ValueError as exc:
+            raise RuntimeError("wrapped") from exc
+    except RuntimeError as wrapped:
+        chained = wrapped
+    try:
+        raise RuntimeError("wrapped")
+    except RuntimeError as alone:
+        assert fingerprint(chained) != fingerprint(alone)
+
+
+@pytest.mark.unit
+def test_repeated_traceback_is_rendered_once_per_window():
+    """창 안에서 같은 traceback은 처음만 exc_info를 남기고, 이후는 id와 횟수만 남긴다. 창이 지나면 다시 전체를 남긴다."""
+    clock = Clock()
+    dedup = TracebackDeduplicator(60, clock=clock)
+    events = [dedup(None, "exception", {"event": "failed", "exc_info": _caught(_fail, i)}) for i in range(3)]
+
+    assert "exc_info" in events[0] and "exception_count" not in events[0]
+    assert events[2] == {
+        "event": "failed",
+        "exception_id": events[0]["exception_id"],
+        "exception_count": 3,
+        "exception_message": "ValueError: bad value 2",
+    }
+    assert dedup.suppressed == 2
+
+    clock.now = 61
+    assert "exc_info" in dedup(None, "exception", {"event": "failed", "exc_info": _caught(_fail, 9)})
+    # 예외가 없는 이벤트는 그대로 통과한다
+    assert dedup(None, "info", {"event": "ok"}) == {"event": "ok"}
+    assert dedup(None, "error", {"event": "ok", "exc_info": False}) == {"event": "ok", "exc_info": False}
+
+
+@pytest.mark.unit
+def test_exc_info_true_and_tuple():
+    """exc_info=True(처리 중인 예외)와 (type, value, tb) 튜플도 같은 fingerprint로 인식한다."""
+    dedup = TracebackDeduplicator(60)
+    exc = _caught(_fail, 1)
+    try:
+        raise exc
+    except ValueError:
+        first = dedup(None, "exception", {"exc_info": True})
+        second = dedup(None, "exception", {"exc_info": sys.exc_info()})
+    assert first["exception_id"] == second["exception_id"]
+    assert second["exception_count"] == 2
+
+
+@pytest.mark.unit
+def test_summaries_report_suppressed_counts():
+    """요약은 fingerprint별로 생략한 개수를 ERROR 이벤트로 남기고, 보고한 개수는 다시 보고하지 않는다."""
+    cap = LogCapture()
+    structlog.configure(processors=[cap])
+    try:
+        dedup = TracebackDeduplicator(60)
+        for i in range(4):
+            dedup(None, "exception", {"logger": "app", "exc_info": _caught(_fail, i)})
+        dedup.start()
+        dedup.stop()
+        dedup.emit_summaries()
+    finally:
+        structlog.reset_defaults()
+
+    (summary,) = cap.entries
+    assert summary["log_level"] == "error"
+    assert summary["event"] == "exception summary"
+    assert summary["repeated"] == 3
+    assert summary["exception_message"] == "ValueError: bad value 0"
+    assert summary["window"] == 60
+
+
+@pytest.mark.unit
+def test_fingerprint_table_is_capped():
+    """fingerprint 수가 상한에 닿으면 표를 비우고 새로 센다."""
+    dedup = TracebackDeduplicator(60, max_fingerprints=1)
+    dedup(None, "exception", {"exc_info": _caught(_fail, 1)})
+    dedup(None, "exception", {"exc_info": _caught(_fail_other)})
+    assert len(dedup._states) == 1
+
+
+@pytest.mark.unit
+def test_capped_table_keeps_unreported_counts():
+    """상한 때문에 표를 비워도 보고하지 않은 생략 개수는 다음 drain()이 돌려준다."""
+    dedup = TracebackDeduplicator(60, max_fingerprints=1)
+    for i in range(3):
+        dedup(None, "exception", {"logger": "app", "exc_info": _caught(_fail, i)})
+    dedup(None, "exception", {"logger": "app", "exc_info": _caught(_fail_other)})
+
+    ((_, logger, message, repeated),) = dedup.drain()
+    assert (logger, message, repeated) == ("app", "ValueError: bad value 0", 2)
+    assert dedup.drain() == []